@@ -27,6 +27,10 @@ from .go_board import *
 from .earth_surface_ice import *
 from .demographics import *
 from .boss import *
+from .pdb_atoms import *
+from .railway_routing import *
+from .railway_timetable import *
+from .railway_import import *
 
 __author__ = 'Justin Bois'
 __email__ = 'bois@caltech.edu'
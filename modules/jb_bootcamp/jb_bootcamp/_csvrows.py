@@ -0,0 +1,30 @@
+"""Line-numbered CSV rows shared by the streaming CSV readers.
+
+Readers that process files in chunks still report errors by the line in the
+file, which ``csv.reader`` only exposes through ``line_num`` after each row.
+:func:`numbered_rows` pairs every non-blank row with the line it starts on,
+so blank rows and quoted fields spanning several lines do not shift the
+reported numbers.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, List, Protocol, Tuple
+
+
+class CsvReader(Protocol):
+    """The parts of ``csv.reader`` objects used here."""
+
+    line_num: int
+
+    def __iter__(self) -> Iterator[List[str]]: ...
+
+
+def numbered_rows(reader: CsvReader) -> Iterator[Tuple[int, List[str]]]:
+    """Yield ``(line, row)`` for the non-blank rows left in *reader*."""
+
+    start = reader.line_num + 1
+    for row in reader:
+        if row:
+            yield start, row
+        start = reader.line_num + 1
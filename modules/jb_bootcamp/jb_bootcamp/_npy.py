@@ -0,0 +1,63 @@
+"""Minimal reader and writer for NumPy's ``.npy`` file format.
+
+The package does not depend on NumPy, yet several modules cache large
+numeric tables on disk.  Writing them in the ``.npy`` layout keeps the files
+interchangeable with ``numpy.load`` while only needing the standard library.
+Only version 1.0 headers, C-ordered data and little-endian dtypes are
+produced; the reader rejects anything else so callers can fall back to
+recomputing the data.
+"""
+
+from __future__ import annotations
+
+import ast
+import struct
+from pathlib import Path
+from typing import BinaryIO, Tuple, Union
+
+_MAGIC = b"\x93NUMPY"
+_ALIGNMENT = 64
+
+Descr = Union[str, list]
+
+
+def npy_header(descr: Descr, shape: Tuple[int, ...]) -> bytes:
+    """Return the encoded version 1.0 header for an array of *shape*."""
+
+    header = repr({"descr": descr, "fortran_order": False, "shape": tuple(shape)})
+    prefix_length = len(_MAGIC) + 2 + 2
+    padding = -(prefix_length + len(header) + 1) % _ALIGNMENT
+    encoded = (header + " " * padding + "\n").encode("latin1")
+    return _MAGIC + b"\x01\x00" + struct.pack("<H", len(encoded)) + encoded
+
+
+def write_npy(path: Union[str, Path], descr: Descr, shape: Tuple[int, ...], payload: bytes) -> None:
+    """Write *payload* to *path* as an ``.npy`` array with *descr* and *shape*."""
+
+    with open(path, "wb") as handle:
+        handle.write(npy_header(descr, shape))
+        handle.write(payload)
+
+
+def read_npy_header(handle: BinaryIO) -> Tuple[Descr, Tuple[int, ...], int]:
+    """Parse the header of an open ``.npy`` file.
+
+    Returns the dtype description, the array shape and the byte offset at
+    which the raw data starts.  ``ValueError`` is raised for files that are
+    not version 1.0, C-ordered ``.npy`` arrays.
+    """
+
+    prefix = handle.read(len(_MAGIC) + 4)
+    if len(prefix) != len(_MAGIC) + 4 or not prefix.startswith(_MAGIC):
+        raise ValueError("not an .npy file")
+    if prefix[len(_MAGIC) : len(_MAGIC) + 2] != b"\x01\x00":
+        raise ValueError("only version 1.0 .npy headers are supported")
+    (header_length,) = struct.unpack("<H", prefix[len(_MAGIC) + 2 :])
+    raw_header = handle.read(header_length)
+    try:
+        header = ast.literal_eval(raw_header.decode("latin1"))
+    except (SyntaxError, ValueError) as exc:
+        raise ValueError("malformed .npy header") from exc
+    if not isinstance(header, dict) or header.get("fortran_order", True):
+        raise ValueError("only C-ordered .npy arrays are supported")
+    return header["descr"], tuple(header["shape"]), len(prefix) + header_length
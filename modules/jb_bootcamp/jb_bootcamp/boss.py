@@ -7,40 +7,102 @@ not depend on any external libraries.
 """
 from __future__ import annotations
 
-from collections import defaultdict, deque
-from typing import Dict, Iterable, Mapping, Optional, Set
+from array import array
+from contextlib import contextmanager
+import csv
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from ._csvrows import numbered_rows
 
 __all__ = [
+    "DynamicOrgChart",
+    "OrgChart",
+    "ReportingCycleError",
     "normalize_chart",
+    "validate_chart_file",
     "boss_of",
     "chain_of_command",
     "count_reports",
 ]
 
 
+class ReportingCycleError(ValueError):
+    """Raised when a chart contains one or more reporting cycles.
+
+    ``cycles`` lists every cycle as the names met when following boss
+    pointers around it once, starting from the first name of the cycle that
+    appears in the input.
+    """
+
+    def __init__(self, cycles: Sequence[Sequence[str]]) -> None:
+        self.cycles = [list(cycle) for cycle in cycles]
+        shown = "; ".join(" -> ".join(cycle + [cycle[0]]) for cycle in self.cycles[:3])
+        if len(self.cycles) > 3:
+            shown += "; ..."
+        if len(self.cycles) == 1:
+            message = f"A reporting cycle was detected in the chart: {shown}"
+        else:
+            message = f"{len(self.cycles)} reporting cycles were detected in the chart: {shown}"
+        super().__init__(message)
+
+
 def normalize_chart(pairs: Iterable[tuple[str, Optional[str]]]) -> Dict[str, Optional[str]]:
     """Return a validated boss chart from ``pairs``.
 
     Each element of ``pairs`` is a two-tuple ``(employee, boss)`` where ``boss``
     may be ``None`` for a top-level leader.  The function ensures employees are
     unique, that a person is not listed as their own boss, and that the overall
-    structure is acyclic.  A ``ValueError`` is raised if any rule is violated.
+    structure is acyclic.  A ``ValueError`` is raised if any rule is violated;
+    reporting cycles raise :class:`ReportingCycleError` listing all of them.
     """
 
+    validator = _ChartValidator()
     chart: Dict[str, Optional[str]] = {}
     for employee, boss in pairs:
-        if not employee:
-            raise ValueError("Employee names must be non-empty strings.")
-        if employee == boss:
-            raise ValueError(f"{employee!r} cannot be their own boss.")
-        if employee in chart:
-            raise ValueError(f"{employee!r} is already listed in the chart.")
+        validator.add(employee, boss)
         chart[employee] = boss
 
-    _ensure_acyclic(chart)
+    validator.check_cycles()
     return chart
 
 
+def validate_chart_file(path: Union[str, Path], *, chunk_size: int = 65536) -> int:
+    """Validate the ``(employee, boss)`` pairs stored in a CSV file.
+
+    The file needs a header row naming an ``employee`` and a ``boss``
+    column; an empty boss marks a top-level leader and blank rows are
+    skipped.  Rows are read ``chunk_size`` at a time and bosses are stored as
+    integer IDs, so the ``employee -> boss`` dictionary is never built.  The
+    rules of :func:`normalize_chart` apply, errors in the file name the
+    offending line, and the number of listed employees is returned.
+    """
+
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive.")
+    validator = _ChartValidator()
+    with open(path, newline="", encoding="utf-8") as handle:
+        reader = csv.reader(handle)
+        header = [field.strip() for field in next(reader, [])]
+        if "employee" not in header or "boss" not in header:
+            raise ValueError(f"{path}: expected 'employee' and 'boss' columns.")
+        employee_column, boss_column = header.index("employee"), header.index("boss")
+        width = max(employee_column, boss_column) + 1
+        numbered = numbered_rows(reader)
+        while True:
+            rows = list(islice(numbered, chunk_size))
+            if not rows:
+                break
+            for line, row in rows:
+                if len(row) < width:
+                    raise ValueError(f"{path}:{line}: row has too few fields.")
+                validator.add(row[employee_column].strip(), row[boss_column].strip() or None)
+
+    validator.check_cycles()
+    return validator.listed.count(1)
+
+
 def boss_of(employee: str, chart: Mapping[str, Optional[str]]) -> Optional[str]:
     """Return the ultimate boss for ``employee``.
 
@@ -80,53 +142,538 @@ def count_reports(chart: Mapping[str, Optional[str]]) -> Dict[str, int]:
     """Return a mapping of each boss to the total reports beneath them.
 
     The counts include both direct and indirect reports.  Employees who do not
-    manage anyone will have a count of zero.  The function assumes ``chart`` is
-    acyclic; call :func:`normalize_chart` first if in doubt.
+    manage anyone will have a count of zero.  A ``ValueError`` is raised if
+    ``chart`` contains a reporting cycle.  The counts are computed in a single
+    pass by :class:`OrgChart`.
     """
 
-    children: Dict[str, Set[str]] = defaultdict(set)
-    employees = set(chart)
-    for employee, boss in chart.items():
-        if boss is not None:
-            children[boss].add(employee)
-            employees.add(boss)
+    return OrgChart(chart).report_counts()
+
+
+class OrgChart:
+    """Indexed, read-only view of a boss chart.
+
+    Every person, including bosses that only appear as a value in ``chart``,
+    is given an integer ID: chart keys first in insertion order, then the
+    remaining bosses in order of first appearance.  The hierarchy is walked
+    once in depth-first pre-order, which lists every subtree as a contiguous
+    block.  Person ``i`` occupies position ``entry[i]`` and its subtree the
+    positions ``entry[i]`` up to, but excluding, ``exit[i]``, so subtree
+    sizes, "is X under Y" and "all reports of Y" need no further traversal.
+    Ancestor queries use a jump-pointer table built on first use, so the
+    k-th boss and the lowest common boss take O(log depth) steps.
+
+    Parameters
+    ----------
+    chart:
+        A mapping of employee to boss as returned by :func:`normalize_chart`.
+        A ``ValueError`` is raised if it contains a reporting cycle.
+    """
+
+    def __init__(self, chart: Mapping[str, Optional[str]]) -> None:
+        names = list(chart)
+        ids: Dict[str, int] = {name: position for position, name in enumerate(names)}
+        for boss in chart.values():
+            if boss is not None and boss not in ids:
+                ids[boss] = len(names)
+                names.append(boss)
+
+        size = len(names)
+        parents = array("i", [-1]) * size
+        for employee, boss in chart.items():
+            if boss is not None:
+                parents[ids[employee]] = ids[boss]
+
+        # Children in compressed rows, ordered by ID for a deterministic walk.
+        offsets = array("i", [0]) * (size + 1)
+        for parent in parents:
+            if parent >= 0:
+                offsets[parent + 1] += 1
+        for person in range(size):
+            offsets[person + 1] += offsets[person]
+        cursor = array("i", offsets[:-1]) if size else array("i")
+        children = array("i", [0]) * offsets[-1] if size else array("i")
+        for person, parent in enumerate(parents):
+            if parent >= 0:
+                children[cursor[parent]] = person
+                cursor[parent] += 1
+
+        order = array("i")
+        stack = [person for person in range(size - 1, -1, -1) if parents[person] < 0]
+        while stack:
+            person = stack.pop()
+            order.append(person)
+            stack.extend(reversed(children[offsets[person] : offsets[person + 1]]))
+        if len(order) != size:
+            raise ReportingCycleError(
+                [[names[person] for person in cycle] for cycle in _find_cycles(parents)]
+            )
+
+        # Reverse pre-order visits every report before its boss (post-order
+        # for the purpose of accumulating subtree sizes).
+        sizes = array("i", [1]) * size
+        for person in reversed(order):
+            parent = parents[person]
+            if parent >= 0:
+                sizes[parent] += sizes[person]
+        entry = array("i", [0]) * size
+        depths = array("i", [0]) * size
+        tops = array("i", [0]) * size
+        for position, person in enumerate(order):
+            entry[person] = position
+            parent = parents[person]
+            if parent >= 0:
+                depths[person] = depths[parent] + 1
+                tops[person] = tops[parent]
+            else:
+                tops[person] = person
+
+        self.names: Tuple[str, ...] = tuple(names)
+        self.parents = parents
+        self.sizes = sizes
+        self.entry = entry
+        self.exit = array("i", (start + count for start, count in zip(entry, sizes)))
+        self.order = order
+        self.depths = depths
+        self._tops = tops
+        self._ids = ids
+        self._jumps: Optional[list[array]] = None
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[tuple[str, Optional[str]]]) -> "OrgChart":
+        """Validate ``pairs`` with :func:`normalize_chart` and index the result."""
+
+        return cls(normalize_chart(pairs))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._ids
+
+    def id_of(self, name: str) -> int:
+        """Return the integer ID of ``name``."""
+
+        try:
+            return self._ids[name]
+        except KeyError:
+            raise KeyError(f"Unknown employee: {name!r}") from None
+
+    def ids_of(self, names: Iterable[str]) -> array:
+        """Return the integer IDs of ``names`` as an ``array('i')``."""
+
+        return array("i", map(self.id_of, names))
+
+    def report_count(self, name: str) -> int:
+        """Return the number of direct and indirect reports of ``name``."""
+
+        return self.sizes[self.id_of(name)] - 1
+
+    def report_counts(self) -> Dict[str, int]:
+        """Return :meth:`report_count` for every person in the chart."""
+
+        return {name: count - 1 for name, count in zip(self.names, self.sizes)}
+
+    def is_under(self, employee: str, boss: str) -> bool:
+        """Return ``True`` if ``employee`` reports to ``boss``, directly or not.
+
+        Nobody is under themselves.
+        """
+
+        person, manager = self.id_of(employee), self.id_of(boss)
+        return self.entry[manager] < self.entry[person] < self.exit[manager]
+
+    def reports_of(self, boss: str) -> list[str]:
+        """Return every direct and indirect report of ``boss`` in pre-order."""
+
+        person = self.id_of(boss)
+        names = self.names
+        return [names[report] for report in self.order[self.entry[person] + 1 : self.exit[person]]]
+
+    def depth(self, name: str) -> int:
+        """Return how many bosses are above ``name``."""
+
+        return self.depths[self.id_of(name)]
+
+    def kth_boss(self, name: str, k: int) -> Optional[str]:
+        """Return the boss ``k`` levels above ``name``.
+
+        ``k=0`` returns ``name`` itself and ``k=1`` the direct boss.  ``None``
+        is returned when the chain of command is shorter than ``k``.
+        """
+
+        person = self._lift(self.id_of(name), k)
+        return None if person < 0 else self.names[person]
+
+    def ultimate_boss(self, name: str) -> Optional[str]:
+        """Return the top of the chain above ``name``, like :func:`boss_of`."""
+
+        top = self._tops[self.id_of(name)]
+        return None if self.names[top] == name else self.names[top]
+
+    def lowest_common_boss(self, first: str, second: str) -> Optional[str]:
+        """Return the lowest person both ``first`` and ``second`` are under.
+
+        A person counts as their own boss here, so the lowest common boss of
+        an employee and one of their managers is that manager.  ``None`` is
+        returned when the two belong to separate hierarchies.
+        """
+
+        person = self._common(self.id_of(first), self.id_of(second))
+        return None if person < 0 else self.names[person]
+
+    def depths_of(self, ids: Iterable[int]) -> array:
+        """Return :attr:`depths` for a batch of integer IDs."""
+
+        depths, check = self.depths, self._check_id
+        return array("i", (depths[check(person)] for person in ids))
+
+    def kth_bosses(self, ids: Iterable[int], k: Union[int, Iterable[int]]) -> array:
+        """Batched :meth:`kth_boss` over integer IDs; missing bosses are ``-1``.
+
+        ``k`` is either one distance for every ID or a sequence of distances
+        of the same length as ``ids``.  Any integer sequence is accepted,
+        including NumPy arrays; use :meth:`ids_of` to convert names.
+        """
+
+        ids = list(ids)
+        try:
+            steps = list(k)  # type: ignore[arg-type]
+        except TypeError:
+            steps = [k] * len(ids)
+        if len(steps) != len(ids):
+            raise ValueError("k must be an integer or hold one entry per ID.")
+        return array("i", map(self._lift, ids, steps))
 
-    counts = {person: 0 for person in employees}
-    for person in employees:
-        counts[person] = _subtree_size(person, children) - 1
-    return counts
+    def lowest_common_bosses(self, first: Iterable[int], second: Iterable[int]) -> array:
+        """Batched :meth:`lowest_common_boss` over integer IDs; ``-1`` if none."""
 
+        first, second = list(first), list(second)
+        if len(first) != len(second):
+            raise ValueError("Both ID sequences must have the same length.")
+        return array("i", map(self._common, first, second))
 
-def _ensure_acyclic(chart: Mapping[str, Optional[str]]) -> None:
-    """Raise ``ValueError`` if *chart* contains a reporting loop."""
+    def _jump_table(self) -> list[array]:
+        # jumps[level][person] is the boss 2**level levels above person.
+        if self._jumps is None:
+            jumps = [self.parents]
+            height = max(self.depths, default=0)
+            while 1 << len(jumps) <= height:
+                below = jumps[-1]
+                jumps.append(array("i", (below[up] if up >= 0 else -1 for up in below)))
+            self._jumps = jumps
+        return self._jumps
 
-    visiting: Set[str] = set()
-    visited: Set[str] = set()
+    def _check_id(self, person: int) -> int:
+        if not 0 <= person < len(self.names):
+            raise KeyError(f"Unknown employee ID: {person!r}")
+        return person
 
-    def walk(employee: str) -> None:
-        if employee in visited:
+    def _lift(self, person: int, steps: int) -> int:
+        self._check_id(person)
+        if steps < 0:
+            raise ValueError("k must be non-negative.")
+        if steps > self.depths[person]:
+            return -1
+        jumps = self._jump_table()
+        level = 0
+        while steps:
+            if steps & 1:
+                person = jumps[level][person]
+            steps >>= 1
+            level += 1
+        return person
+
+    def _common(self, first: int, second: int) -> int:
+        self._check_id(first)
+        self._check_id(second)
+        depths = self.depths
+        if self._tops[first] != self._tops[second]:
+            return -1
+        if depths[first] < depths[second]:
+            first, second = second, first
+        first = self._lift(first, depths[first] - depths[second])
+        if first == second:
+            return first
+        for jumps in reversed(self._jump_table()[: depths[first].bit_length()]):
+            if jumps[first] != jumps[second]:
+                first, second = jumps[first], jumps[second]
+        return self.parents[first]
+
+
+class DynamicOrgChart:
+    """Mutable boss chart that keeps report counts up to date.
+
+    Every person stores their boss, their direct reports and the size of
+    their subtree.  :meth:`move`, :meth:`hire` and :meth:`terminate` only
+    touch the people on the chain of command above the change, so each costs
+    O(depth) plus, for :meth:`terminate`, the number of direct reports.
+    Changes made inside :meth:`what_if` are rolled back when the block ends.
+
+    Parameters
+    ----------
+    chart:
+        Initial mapping of employee to boss as returned by
+        :func:`normalize_chart`.  Bosses that are not keys become top-level
+        leaders.
+    """
+
+    def __init__(self, chart: Optional[Mapping[str, Optional[str]]] = None) -> None:
+        indexed = OrgChart(chart or {})
+        names = indexed.names
+        self._bosses: Dict[str, Optional[str]] = {
+            name: names[parent] if parent >= 0 else None
+            for name, parent in zip(names, indexed.parents)
+        }
+        self._reports: Dict[str, Dict[str, None]] = {name: {} for name in names}
+        for name, boss in self._bosses.items():
+            if boss is not None:
+                self._reports[boss][name] = None
+        self._sizes: Dict[str, int] = dict(zip(names, indexed.sizes))
+        self._journal: Optional[List[tuple]] = None
+
+    def __len__(self) -> int:
+        return len(self._bosses)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._bosses
+
+    def boss(self, employee: str) -> Optional[str]:
+        """Return the direct boss of ``employee``."""
+
+        self._check(employee)
+        return self._bosses[employee]
+
+    def direct_reports(self, boss: str) -> list[str]:
+        """Return the people reporting directly to ``boss``."""
+
+        self._check(boss)
+        return list(self._reports[boss])
+
+    def report_count(self, name: str) -> int:
+        """Return the number of direct and indirect reports of ``name``."""
+
+        self._check(name)
+        return self._sizes[name] - 1
+
+    def report_counts(self) -> Dict[str, int]:
+        """Return :meth:`report_count` for every person."""
+
+        return {name: size - 1 for name, size in self._sizes.items()}
+
+    def is_under(self, employee: str, boss: str) -> bool:
+        """Return ``True`` if ``employee`` reports to ``boss``, directly or not."""
+
+        self._check(employee)
+        self._check(boss)
+        current = self._bosses[employee]
+        while current is not None:
+            if current == boss:
+                return True
+            current = self._bosses[current]
+        return False
+
+    def chart(self) -> Dict[str, Optional[str]]:
+        """Return a copy of the current employee-to-boss mapping."""
+
+        return dict(self._bosses)
+
+    def move(self, employee: str, new_boss: Optional[str]) -> None:
+        """Make ``employee`` (with all their reports) report to ``new_boss``.
+
+        ``None`` makes ``employee`` a top-level leader.  A ``ValueError`` is
+        raised if the move would create a reporting cycle.
+        """
+
+        self._check(employee)
+        if new_boss is not None:
+            self._check(new_boss)
+            if new_boss == employee or self.is_under(new_boss, employee):
+                raise ValueError(
+                    f"Moving {employee!r} under {new_boss!r} would create a reporting cycle."
+                )
+        old_boss = self._bosses[employee]
+        if old_boss == new_boss:
             return
-        if employee in visiting:
-            raise ValueError("A reporting cycle was detected in the chart.")
+        self._cut(employee)
+        self._link(employee, new_boss)
+        self._record(("move", employee, old_boss))
 
-        visiting.add(employee)
-        boss = chart.get(employee)
+    def hire(self, employee: str, boss: Optional[str] = None) -> None:
+        """Add ``employee`` reporting to ``boss``."""
+
+        if not employee:
+            raise ValueError("Employee names must be non-empty strings.")
+        if employee in self._bosses:
+            raise ValueError(f"{employee!r} is already listed in the chart.")
         if boss is not None:
-            walk(boss)
-        visiting.remove(employee)
-        visited.add(employee)
+            self._check(boss)
+        self._add(employee)
+        self._link(employee, boss)
+        self._record(("hire", employee))
+
+    def terminate(self, employee: str) -> None:
+        """Remove ``employee``; their direct reports move up to their boss."""
+
+        self._check(employee)
+        boss = self._bosses[employee]
+        reports = list(self._reports[employee])
+        self._remove(employee)
+        self._record(("terminate", employee, boss, reports))
+
+    @contextmanager
+    def what_if(self) -> Iterator["DynamicOrgChart"]:
+        """Context manager that undoes every change made inside it.
 
-    for name in chart:
-        walk(name)
+        Blocks can be nested; each restores the state at its own start, also
+        when the block raises.
+        """
 
+        outer = self._journal
+        self._journal = []
+        try:
+            yield self
+        finally:
+            journal, self._journal = self._journal, outer
+            for entry in reversed(journal):
+                self._undo(entry)
 
-def _subtree_size(root: str, children: Mapping[str, Set[str]]) -> int:
-    """Return the size of the subtree rooted at ``root`` (including root)."""
+    def _check(self, name: str) -> None:
+        if name not in self._bosses:
+            raise KeyError(f"Unknown employee: {name!r}")
+
+    def _record(self, entry: tuple) -> None:
+        if self._journal is not None:
+            self._journal.append(entry)
+
+    def _undo(self, entry: tuple) -> None:
+        action = entry[0]
+        if action == "move":
+            _, employee, old_boss = entry
+            self._cut(employee)
+            self._link(employee, old_boss)
+        elif action == "hire":
+            self._cut(entry[1])
+            self._discard(entry[1])
+        else:
+            _, employee, boss, reports = entry
+            self._add(employee)
+            self._link(employee, boss)
+            for report in reports:
+                # The chain above already counts the reports' subtrees.
+                self._reassign(report, employee)
+                self._sizes[employee] += self._sizes[report]
+
+    def _add(self, name: str) -> None:
+        self._bosses[name] = None
+        self._reports[name] = {}
+        self._sizes[name] = 1
+
+    def _discard(self, name: str) -> None:
+        del self._bosses[name], self._reports[name], self._sizes[name]
+
+    def _link(self, employee: str, boss: Optional[str]) -> None:
+        self._bosses[employee] = boss
+        if boss is not None:
+            self._reports[boss][employee] = None
+            self._adjust(boss, self._sizes[employee])
+
+    def _cut(self, employee: str) -> None:
+        boss = self._bosses[employee]
+        if boss is not None:
+            del self._reports[boss][employee]
+            self._adjust(boss, -self._sizes[employee])
+            self._bosses[employee] = None
+
+    def _remove(self, employee: str) -> None:
+        # The reports keep their subtrees, so only the chain above loses one.
+        boss = self._bosses[employee]
+        for report in list(self._reports[employee]):
+            self._reassign(report, boss)
+        self._sizes[employee] = 1
+        self._cut(employee)
+        self._discard(employee)
+
+    def _reassign(self, employee: str, boss: Optional[str]) -> None:
+        # Change the boss without touching subtree sizes further up.
+        old = self._bosses[employee]
+        if old is not None:
+            del self._reports[old][employee]
+        self._bosses[employee] = boss
+        if boss is not None:
+            self._reports[boss][employee] = None
+
+    def _adjust(self, boss: Optional[str], delta: int) -> None:
+        sizes, bosses = self._sizes, self._bosses
+        while boss is not None:
+            sizes[boss] += delta
+            boss = bosses[boss]
+
+
+class _ChartValidator:
+    """Incremental checks behind :func:`normalize_chart`.
+
+    People are mapped to integer IDs as they appear and only a flat array of
+    boss IDs is kept, so validation needs O(n) memory and time.
+    """
+
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.parents = array("i")
+        self.listed = bytearray()
+
+    def add(self, employee: str, boss: Optional[str]) -> None:
+        if not employee:
+            raise ValueError("Employee names must be non-empty strings.")
+        if employee == boss:
+            raise ValueError(f"{employee!r} cannot be their own boss.")
+        person = self._id(employee)
+        if self.listed[person]:
+            raise ValueError(f"{employee!r} is already listed in the chart.")
+        self.listed[person] = 1
+        if boss is not None:
+            self.parents[person] = self._id(boss)
+
+    def check_cycles(self) -> None:
+        cycles = _find_cycles(self.parents)
+        if cycles:
+            names = self.names
+            raise ReportingCycleError([[names[person] for person in cycle] for cycle in cycles])
+
+    def _id(self, name: str) -> int:
+        person = self.ids.get(name)
+        if person is None:
+            person = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.parents.append(-1)
+            self.listed.append(0)
+        return person
+
+
+def _find_cycles(parents: Sequence[int]) -> List[List[int]]:
+    """Return every cycle of the boss pointers in ``parents`` (``-1`` for none).
+
+    Each person has at most one boss, so walking up from every unvisited
+    person and colouring the path is linear: white people are unvisited,
+    grey ones lie on the current walk and black ones are finished.  Meeting
+    a grey person closes a new cycle; meeting a black one cannot.
+    """
 
-    size = 0
-    queue: deque[str] = deque([root])
-    while queue:
-        current = queue.popleft()
-        size += 1
-        queue.extend(children.get(current, ()))
-    return size
+    white, grey, black = 0, 1, 2
+    colours = bytearray(len(parents))
+    cycles: List[List[int]] = []
+    for start in range(len(parents)):
+        if colours[start] != white:
+            continue
+        path = []
+        person = start
+        while person >= 0 and colours[person] == white:
+            colours[person] = grey
+            path.append(person)
+            person = parents[person]
+        if person >= 0 and colours[person] == grey:
+            cycles.append(path[path.index(person) :])
+        for visited in path:
+            colours[visited] = black
+    return cycles
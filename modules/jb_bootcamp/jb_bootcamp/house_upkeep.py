@@ -8,9 +8,43 @@ test different scenarios or plug the logic into a larger workflow.
 """
 from __future__ import annotations
 
+import argparse
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+import datetime
+import heapq
 import math
-from typing import Dict, Iterable, List, Sequence
+import os
+import random
+import time
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+__all__ = [
+    "VillaProfile",
+    "UpkeepTask",
+    "TaskProjection",
+    "ScheduledTask",
+    "UpkeepPlanner",
+    "PortfolioPlanner",
+    "AssignmentBenchmark",
+    "suggest_upkeep_tasks",
+    "benchmark_assignment",
+    "portfolio_calendar",
+]
 
 
 @dataclass(frozen=True)
@@ -73,6 +107,20 @@ class TaskProjection:
             raise ValueError("total_hours must be positive.")
 
 
+@dataclass(frozen=True)
+class ScheduledTask:
+    """One occurrence of a task on a given day of the plan.
+
+    ``day`` counts from the start of the plan (day 0); ``date`` is set when
+    the calendar was generated with a ``start_date``.
+    """
+
+    day: int
+    villa: str
+    task: UpkeepTask
+    date: Optional[datetime.date] = None
+
+
 def _effort_multiplier(profile: VillaProfile) -> float:
     """Return a multiplier derived from area, floors, and residents."""
 
@@ -82,82 +130,103 @@ def _effort_multiplier(profile: VillaProfile) -> float:
     return area_factor * floor_factor * resident_factor
 
 
+@dataclass(frozen=True)
+class _TaskTemplate:
+    """Task whose duration scales with a villa's effort multiplier.
+
+    ``feature`` names the :class:`VillaProfile` flag the task depends on;
+    ``None`` marks tasks every villa needs.
+    """
+
+    name: str
+    frequency_days: int
+    base_hours: float
+    priority: int
+    zone: str
+    notes: str = ""
+    feature: Optional[str] = None
+
+    def build(self, multiplier: float) -> UpkeepTask:
+        return UpkeepTask(
+            name=self.name,
+            frequency_days=self.frequency_days,
+            duration_hours=round(self.base_hours * multiplier, 2),
+            priority=self.priority,
+            zone=self.zone,
+            notes=self.notes,
+        )
+
+
+# Kept sorted by name, the order in which tasks are suggested.
+_TASK_TEMPLATES: Tuple[_TaskTemplate, ...] = (
+    _TaskTemplate(
+        name="air circulation check",
+        frequency_days=7,
+        base_hours=0.8,
+        priority=1,
+        zone="interior",
+    ),
+    _TaskTemplate(
+        name="garden grooming",
+        frequency_days=3,
+        base_hours=1.5,
+        priority=3,
+        zone="garden",
+        notes="Pruning of courtyards and bamboo screens.",
+        feature="has_garden",
+    ),
+    _TaskTemplate(
+        name="guesthouse refresh",
+        frequency_days=7,
+        base_hours=2.0,
+        priority=2,
+        zone="guest wing",
+        feature="has_guesthouse",
+    ),
+    _TaskTemplate(
+        name="interior detailing",
+        frequency_days=3,
+        base_hours=1.8,
+        priority=3,
+        zone="interior",
+        notes="Deep dusting and vacuuming across all levels.",
+    ),
+    _TaskTemplate(
+        name="laundry and linens",
+        frequency_days=2,
+        base_hours=1.2,
+        priority=2,
+        zone="service wing",
+    ),
+    _TaskTemplate(
+        name="pool care",
+        frequency_days=2,
+        base_hours=1.0,
+        priority=3,
+        zone="spa",
+        notes="Skimming, chemistry check, and pump purge.",
+        feature="has_pool",
+    ),
+    _TaskTemplate(
+        name="security perimeter walk",
+        frequency_days=1,
+        base_hours=0.6,
+        priority=4,
+        zone="exterior",
+    ),
+)
+
+
 def suggest_upkeep_tasks(profile: VillaProfile) -> List[UpkeepTask]:
     """Generate a deterministic task list tailored to *profile*."""
 
     multiplier = _effort_multiplier(profile)
-
-    def hours(base: float) -> float:
-        return round(base * multiplier, 2)
-
-    tasks: List[UpkeepTask] = [
-        UpkeepTask(
-            name="interior detailing",
-            frequency_days=3,
-            duration_hours=hours(1.8),
-            priority=3,
-            zone="interior",
-            notes="Deep dusting and vacuuming across all levels.",
-        ),
-        UpkeepTask(
-            name="laundry and linens",
-            frequency_days=2,
-            duration_hours=hours(1.2),
-            priority=2,
-            zone="service wing",
-        ),
-        UpkeepTask(
-            name="air circulation check",
-            frequency_days=7,
-            duration_hours=hours(0.8),
-            priority=1,
-            zone="interior",
-        ),
-        UpkeepTask(
-            name="security perimeter walk",
-            frequency_days=1,
-            duration_hours=hours(0.6),
-            priority=4,
-            zone="exterior",
-        ),
+    return [
+        template.build(multiplier)
+        for template in _TASK_TEMPLATES
+        if template.feature is None or getattr(profile, template.feature)
     ]
 
-    if profile.has_garden:
-        tasks.append(
-            UpkeepTask(
-                name="garden grooming",
-                frequency_days=3,
-                duration_hours=hours(1.5),
-                priority=3,
-                zone="garden",
-                notes="Pruning of courtyards and bamboo screens.",
-            )
-        )
-    if profile.has_pool:
-        tasks.append(
-            UpkeepTask(
-                name="pool care",
-                frequency_days=2,
-                duration_hours=hours(1.0),
-                priority=3,
-                zone="spa",
-                notes="Skimming, chemistry check, and pump purge.",
-            )
-        )
-    if profile.has_guesthouse:
-        tasks.append(
-            UpkeepTask(
-                name="guesthouse refresh",
-                frequency_days=7,
-                duration_hours=hours(2.0),
-                priority=2,
-                zone="guest wing",
-            )
-        )
-
-    tasks.sort(key=lambda task: task.name)
-    return tasks
-
 
 class UpkeepPlanner:
     """Roll a villa profile and associated tasks into actionable plans."""
@@ -190,10 +259,59 @@ class UpkeepPlanner:
 
         return round(sum(proj.total_hours for proj in self.project_cycle(days)), 2)
 
+    def calendar(
+        self,
+        *,
+        start: int = 0,
+        end: Optional[int] = None,
+        start_date: Optional[datetime.date] = None,
+    ) -> Iterator[ScheduledTask]:
+        """Yield task occurrences from day *start* up to, excluding, *end*.
+
+        A task with frequency ``f`` runs on days ``0, f, 2f, ...``, so the
+        occurrences before day ``days`` match :meth:`project_cycle`.  Tasks
+        are merged through a heap keyed on their next day, giving
+        chronological order (ties in task-name order) while holding one
+        pending occurrence per task; ``end=None`` yields forever.  Windows
+        such as "next week" start directly at the first occurrence on or
+        after *start* instead of expanding the days before it.
+        """
+
+        if start < 0:
+            raise ValueError("start must be non-negative.")
+        if end is not None and end < start:
+            raise ValueError("end cannot precede start.")
+        return self._calendar(start, end, start_date)
+
+    def _calendar(
+        self, start: int, end: Optional[int], start_date: Optional[datetime.date]
+    ) -> Iterator[ScheduledTask]:
+        tasks = sorted(self.tasks, key=lambda task: task.name)
+        heap = [
+            (-(-start // task.frequency_days) * task.frequency_days, order, task)
+            for order, task in enumerate(tasks)
+        ]
+        heapq.heapify(heap)
+        villa = self.profile.name
+        while heap:
+            day, order, task = heap[0]
+            if end is not None and day >= end:
+                return
+            when = start_date + datetime.timedelta(days=day) if start_date is not None else None
+            yield ScheduledTask(day=day, villa=villa, task=task, date=when)
+            heapq.heapreplace(heap, (day + task.frequency_days, order, task))
+
     def assign_staff(
-        self, staff: Sequence[str], days: int
+        self, staff: Sequence[str], days: int, *, improve: bool = False
     ) -> Dict[str, List[TaskProjection]]:
-        """Distribute projected tasks to *staff* balancing total hours."""
+        """Distribute projected tasks to *staff* balancing total hours.
+
+        Projections are handed out longest-processing-time first: by
+        descending priority, then hours, each to the least loaded member,
+        with ties going to the member listed first.  With ``improve=True`` a
+        local search then moves or swaps tasks away from the busiest member
+        while that lowers their load without overloading someone else.
+        """
 
         members = [member for member in staff if member]
         if not members:
@@ -203,14 +321,395 @@ class UpkeepPlanner:
             self.project_cycle(days),
             key=lambda proj: (-proj.task.priority, -proj.total_hours, proj.task.name),
         )
+        assignments, loads = _assign_by_heap(projections, members)
+        if improve:
+            _improve_balance(assignments, loads)
+        return assignments
 
-        assignments: Dict[str, List[TaskProjection]] = {member: [] for member in members}
-        load_tracker: Dict[str, float] = {member: 0.0 for member in members}
 
-        for projection in projections:
-            assignee = min(load_tracker, key=load_tracker.get)
-            assignments[assignee].append(projection)
-            load_tracker[assignee] += projection.total_hours
+def portfolio_calendar(
+    planners: Iterable[UpkeepPlanner],
+    *,
+    start: int = 0,
+    end: Optional[int] = None,
+    start_date: Optional[datetime.date] = None,
+) -> Iterator[ScheduledTask]:
+    """Merge the calendars of several villas into one chronological stream.
+
+    Occurrences on the same day follow the order of *planners*.  Arguments
+    are passed on to :meth:`UpkeepPlanner.calendar`.
+    """
+
+    calendars = [
+        planner.calendar(start=start, end=end, start_date=start_date) for planner in planners
+    ]
+    return heapq.merge(*calendars, key=lambda occurrence: occurrence.day)
+
+
+class PortfolioPlanner:
+    """Plan the upkeep of many villas in one pass.
+
+    The task templates behind :func:`suggest_upkeep_tasks` are evaluated
+    column by column: the effort multipliers of all villas are held in one
+    ``array('d')`` and every template is scaled across the villas that need
+    it, so a cycle projection computes each template's occurrences once for
+    the whole portfolio.  Results match :class:`UpkeepPlanner` run on the
+    suggested tasks of each villa.
+
+    Parameters
+    ----------
+    profiles:
+        Villas to plan; names must be unique.
+    regions:
+        Region of each villa, keyed by villa name.  Villas left out belong to
+        the ``"default"`` region.  Staff are assigned per region.
+    """
+
+    def __init__(
+        self,
+        profiles: Iterable[VillaProfile],
+        *,
+        regions: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.profiles: Tuple[VillaProfile, ...] = tuple(profiles)
+        if not self.profiles:
+            raise ValueError("At least one villa is required to plan upkeep.")
+        self._index: Dict[str, int] = {
+            profile.name: position for position, profile in enumerate(self.profiles)
+        }
+        if len(self._index) != len(self.profiles):
+            raise ValueError("Villa names must be unique.")
+        regions = regions or {}
+        unknown = set(regions) - set(self._index)
+        if unknown:
+            raise KeyError(f"Unknown villas in regions: {sorted(unknown)}.")
+        self.regions: Tuple[str, ...] = tuple(
+            regions.get(profile.name, "default") for profile in self.profiles
+        )
+        self.multipliers = array("d", map(_effort_multiplier, self.profiles))
+
+        # Per template: the villas needing it and their scaled tasks.
+        self._columns: List[Tuple[_TaskTemplate, array, List[UpkeepTask]]] = []
+        for template in _TASK_TEMPLATES:
+            if template.feature is None:
+                villas = array("i", range(len(self.profiles)))
+            else:
+                villas = array(
+                    "i",
+                    (
+                        position
+                        for position, profile in enumerate(self.profiles)
+                        if getattr(profile, template.feature)
+                    ),
+                )
+            tasks = [template.build(self.multipliers[position]) for position in villas]
+            self._columns.append((template, villas, tasks))
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def tasks(self, villa: str) -> List[UpkeepTask]:
+        """Return the suggested tasks of *villa*, sorted by name."""
+
+        position = self._position(villa)
+        return [
+            tasks[index]
+            for _, villas, tasks in self._columns
+            for index in _positions_of(villas, position)
+        ]
+
+    def project_cycles(self, days: int) -> Dict[str, List[TaskProjection]]:
+        """Return the projections of every villa over *days* days, by villa name."""
+
+        if days <= 0:
+            raise ValueError("days must be positive.")
+
+        projections: List[List[TaskProjection]] = [[] for _ in self.profiles]
+        for template, villas, tasks in self._columns:
+            occurrences = math.ceil(days / template.frequency_days)
+            for position, task in zip(villas, tasks):
+                projections[position].append(
+                    TaskProjection(
+                        task=task,
+                        occurrences=occurrences,
+                        total_hours=round(occurrences * task.duration_hours, 2),
+                    )
+                )
+        return {profile.name: projections[i] for i, profile in enumerate(self.profiles)}
+
+    def total_hours(self, days: int) -> Dict[str, float]:
+        """Return the aggregate projected hours of every villa, by villa name."""
+
+        if days <= 0:
+            raise ValueError("days must be positive.")
+
+        totals = array("d", bytes(8 * len(self.profiles)))
+        for template, villas, tasks in self._columns:
+            occurrences = math.ceil(days / template.frequency_days)
+            for position, task in zip(villas, tasks):
+                totals[position] += round(occurrences * task.duration_hours, 2)
+        return {profile.name: round(total, 2) for profile, total in zip(self.profiles, totals)}
+
+    def assign_staff(
+        self,
+        staff: Mapping[str, Sequence[str]],
+        days: int,
+        *,
+        improve: bool = False,
+        processes: Optional[int] = None,
+    ) -> Dict[str, Dict[str, List[Tuple[str, TaskProjection]]]]:
+        """Distribute each region's projections to that region's *staff*.
+
+        Within a region, tasks of all villas are handed out as in
+        :meth:`UpkeepPlanner.assign_staff`, ties in priority and hours going
+        to the villa name.  The result maps region to member to
+        ``(villa, projection)`` pairs.
+
+        Regions are independent and are balanced in *processes* worker
+        processes.  ``None`` uses every CPU once the portfolio has enough
+        projections to repay starting the workers and stays in this process
+        otherwise; ``1`` always stays in this process.
+        Only task hours travel to the workers, and the outcome does not
+        depend on the number of processes.
+        """
+
+        if processes is not None and processes < 1:
+            raise ValueError("processes must be at least 1.")
+
+        work: Dict[str, List[Tuple[str, TaskProjection]]] = {}
+        for villa, projections in self.project_cycles(days).items():
+            region = self.regions[self._index[villa]]
+            work.setdefault(region, []).extend((villa, proj) for proj in projections)
+        if processes is None:
+            total = sum(map(len, work.values()))
+            processes = (os.cpu_count() or 1) if total >= _PARALLEL_MIN_PROJECTIONS else 1
+        regions = sorted(work)
+        teams: List[List[str]] = []
+        for region in regions:
+            members = [member for member in staff.get(region, ()) if member]
+            if not members:
+                raise ValueError(f"At least one staff member must be provided for '{region}'.")
+            teams.append(members)
+            work[region].sort(
+                key=lambda item: (
+                    -item[1].task.priority,
+                    -item[1].total_hours,
+                    item[0],
+                    item[1].task.name,
+                )
+            )
+        hours = [[proj.total_hours for _, proj in work[region]] for region in regions]
+
+        if processes == 1 or len(regions) < 2:
+            shares = list(map(_assign_region, teams, hours, [improve] * len(regions)))
+        else:
+            with ProcessPoolExecutor(max_workers=min(processes, len(regions))) as pool:
+                shares = list(pool.map(_assign_region, teams, hours, [improve] * len(regions)))
+
+        return {
+            region: {
+                member: [work[region][index] for index in indices]
+                for member, indices in share.items()
+            }
+            for region, share in zip(regions, shares)
+        }
+
+    def _position(self, villa: str) -> int:
+        try:
+            return self._index[villa]
+        except KeyError:
+            raise KeyError(f"Unknown villa: {villa!r}.") from None
+
+
+class _Work(NamedTuple):
+    """Hours of one task, as seen by the staff assignment helpers."""
+
+    total_hours: float
+    index: int
+
+
+def _assign_region(members: List[str], hours: List[float], improve: bool) -> Dict[str, List[int]]:
+    items = [_Work(total, index) for index, total in enumerate(hours)]
+    assignments, loads = _assign_by_heap(items, members)
+    if improve:
+        _improve_balance(assignments, loads)
+    return {member: [item.index for item in share] for member, share in assignments.items()}
+
+
+def _positions_of(villas: array, position: int) -> range:
+    """Return the index of *position* in the sorted *villas* as a 0- or 1-long range."""
+
+    index = bisect_left(villas, position)
+    return range(index, index + (index < len(villas) and villas[index] == position))
+
+
+@dataclass(frozen=True)
+class AssignmentBenchmark:
+    """Runtime and balance of one staff assignment strategy."""
+
+    strategy: str
+    seconds: float
+    makespan: float
+    spread: float
+
+
+def benchmark_assignment(
+    projections: Sequence[TaskProjection], staff: Sequence[str]
+) -> List[AssignmentBenchmark]:
+    """Compare staff assignment strategies on the same *projections*.
+
+    ``"linear scan"`` searches every member for the least loaded one,
+    ``"heap"`` is the strategy of :meth:`UpkeepPlanner.assign_staff` and
+    ``"heap + improve"`` adds its local search.  ``makespan`` is the largest
+    and ``spread`` the largest minus the smallest load.
+    """
+
+    ordered = sorted(
+        projections, key=lambda proj: (-proj.task.priority, -proj.total_hours, proj.task.name)
+    )
+    results: List[AssignmentBenchmark] = []
+    for strategy in ("linear scan", "heap", "heap + improve"):
+        start = time.perf_counter()
+        if strategy == "linear scan":
+            _, loads = _assign_by_scan(ordered, staff)
+        else:
+            assignments, loads = _assign_by_heap(ordered, staff)
+            if strategy == "heap + improve":
+                _improve_balance(assignments, loads)
+        seconds = time.perf_counter() - start
+        results.append(
+            AssignmentBenchmark(
+                strategy, seconds, max(loads.values()), max(loads.values()) - min(loads.values())
+            )
+        )
+    return results
+
+
+class _Timed(Protocol):
+    """Anything the assignment helpers can balance: projections or ``_Work``."""
+
+    @property
+    def total_hours(self) -> float: ...
+
+
+_T = TypeVar("_T", bound=_Timed)
+
+
+def _assign_by_heap(
+    projections: Sequence[_T], members: Sequence[str]
+) -> Tuple[Dict[str, List[_T]], Dict[str, float]]:
+    assignments: Dict[str, List[_T]] = {member: [] for member in members}
+    # (load, position) pairs order exactly like ``min`` over the members in
+    # insertion order: the lowest load wins and ties go to the earliest member.
+    order = list(assignments)
+    heap = [(0.0, position) for position in range(len(order))]
+    for projection in projections:
+        load, position = heap[0]
+        assignments[order[position]].append(projection)
+        heapq.heapreplace(heap, (load + projection.total_hours, position))
+    loads = {order[position]: load for load, position in heap}
+    return assignments, {member: loads[member] for member in order}
+
+
+def _assign_by_scan(
+    projections: Sequence[TaskProjection], members: Sequence[str]
+) -> Tuple[Dict[str, List[TaskProjection]], Dict[str, float]]:
+    assignments: Dict[str, List[TaskProjection]] = {member: [] for member in members}
+    loads: Dict[str, float] = {member: 0.0 for member in members}
+    for projection in projections:
+        assignee = min(loads, key=loads.get)  # type: ignore[arg-type]
+        assignments[assignee].append(projection)
+        loads[assignee] += projection.total_hours
+    return assignments, loads
+
+
+# Number of least loaded members tried as partners in each improvement pass.
+_PARTNERS = 8
+# Below this many projections the cost of starting worker processes
+# outweighs balancing the regions in parallel.
+_PARALLEL_MIN_PROJECTIONS = 20000
+
+
+def _improve_balance(
+    assignments: Dict[str, List[_T]],
+    loads: Dict[str, float],
+    max_passes: Optional[int] = None,
+) -> None:
+    """Move or swap tasks off the busiest member while that lowers their load.
+
+    Only the few least loaded members are considered as partners, which
+    keeps each pass cheap on large teams.
+    """
+
+    passes = max_passes if max_passes is not None else sum(map(len, assignments.values()))
+    for _ in range(passes):
+        busiest = max(loads, key=loads.get)  # type: ignore[arg-type]
+        peak = loads[busiest]
+        best: Optional[Tuple[float, str, int, Optional[int]]] = None
+        for other in heapq.nsmallest(_PARTNERS, loads, key=loads.get):  # type: ignore[arg-type]
+            other_load = loads[other]
+            gap = peak - other_load
+            if other == busiest or gap <= 1e-9:
+                continue
+            for i, mine in enumerate(assignments[busiest]):
+                shift = mine.total_hours
+                if shift < gap:
+                    new_peak = max(peak - shift, other_load + shift)
+                    if best is None or new_peak < best[0]:
+                        best = (new_peak, other, i, None)
+                for j, theirs in enumerate(assignments[other]):
+                    shift = mine.total_hours - theirs.total_hours
+                    if 0.0 < shift < gap:
+                        new_peak = max(peak - shift, other_load + shift)
+                        if best is None or new_peak < best[0]:
+                            best = (new_peak, other, i, j)
+        if best is None or best[0] >= peak - 1e-9:
+            return
+
+        _, other, i, j = best
+        mine = assignments[busiest].pop(i)
+        assignments[other].append(mine)
+        loads[busiest] -= mine.total_hours
+        loads[other] += mine.total_hours
+        if j is not None:
+            theirs = assignments[other].pop(j)
+            assignments[busiest].append(theirs)
+            loads[other] -= theirs.total_hours
+            loads[busiest] += theirs.total_hours
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark upkeep staff assignment on a synthetic estate portfolio."
+    )
+    parser.add_argument("--tasks", type=int, default=5000, help="Number of task projections")
+    parser.add_argument("--staff", type=int, default=200, help="Number of caretakers")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    projections = []
+    for index in range(args.tasks):
+        task = UpkeepTask(
+            name=f"task {index}",
+            frequency_days=rng.randint(1, 14),
+            duration_hours=round(rng.uniform(0.5, 4.0), 2),
+            priority=rng.randint(1, 4),
+        )
+        occurrences = math.ceil(28 / task.frequency_days)
+        projections.append(
+            TaskProjection(task, occurrences, round(occurrences * task.duration_hours, 2))
+        )
+    staff = [f"caretaker {index}" for index in range(args.staff)]
+
+    print(f"{args.tasks} projections, {args.staff} caretakers")
+    print(f"{'strategy':<16}{'ms':>10}{'makespan h':>12}{'spread h':>10}")
+    for result in benchmark_assignment(projections, staff):
+        print(
+            f"{result.strategy:<16}{1000 * result.seconds:>10.1f}"
+            f"{result.makespan:>12.2f}{result.spread:>10.2f}"
+        )
 
-        return assignments
 
+if __name__ == "__main__":  # pragma: no cover - exercised via CLI
+    main()
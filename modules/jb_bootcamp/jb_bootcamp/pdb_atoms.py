@@ -0,0 +1,255 @@
+"""Columnar reader for ATOM/HETATM records in Protein Data Bank files.
+
+The bootcamp ships several PDB entries in ``data/`` (``1FAG.pdb`` alone is
+about 1.3 MB).  Building one object per atom is slow and memory hungry, so
+:func:`read_pdb_atoms` slices the fixed-width columns of every coordinate
+record straight into flat ``array`` columns.  The parsed table is cached as
+a structured ``.npy`` file next to the source so that later reads skip
+parsing altogether; the cache can be opened with ``numpy.load`` when NumPy
+is available but is read back here with the standard library only.
+"""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+import struct
+from typing import Iterable, List, Optional, Tuple, Union
+
+from ._npy import read_npy_header, write_npy
+
+__all__ = [
+    "AtomTable",
+    "read_pdb_atoms",
+    "pdb_coordinates",
+]
+
+_CACHE_DESCR = [
+    ("record", "|S6"),
+    ("name", "|S4"),
+    ("resname", "|S3"),
+    ("chain", "|S1"),
+    ("resseq", "<i4"),
+    ("x", "<f8"),
+    ("y", "<f8"),
+    ("z", "<f8"),
+]
+_CACHE_RECORD = struct.Struct("<6s4s3s1si3d")
+
+Coordinate = Tuple[float, float, float]
+
+
+@dataclass(frozen=True)
+class AtomTable:
+    """Column-oriented view of the atoms in a PDB file.
+
+    Every attribute holds one column with an entry per atom.  Coordinates are
+    stored in ``array('d')`` columns in Ångström, exactly as written in the
+    source file.
+    """
+
+    record_types: Tuple[str, ...]
+    atom_names: Tuple[str, ...]
+    residue_names: Tuple[str, ...]
+    chain_ids: Tuple[str, ...]
+    residue_numbers: array
+    x: array
+    y: array
+    z: array
+
+    def __len__(self) -> int:
+        return len(self.atom_names)
+
+    def coordinates(self) -> List[Coordinate]:
+        """Return the atom positions as ``(x, y, z)`` tuples."""
+
+        return list(zip(self.x, self.y, self.z))
+
+    def select(
+        self,
+        *,
+        chains: Optional[Iterable[str]] = None,
+        atom_names: Optional[Iterable[str]] = None,
+    ) -> "AtomTable":
+        """Return the atoms matching *chains* and *atom_names*.
+
+        Both filters are optional; ``None`` keeps every value.  Atom names are
+        compared after stripping the PDB column padding, so ``"CA"`` selects
+        alpha carbons.
+        """
+
+        chain_set = None if chains is None else set(chains)
+        name_set = None if atom_names is None else set(atom_names)
+        if chain_set is None and name_set is None:
+            return self
+
+        keep = [
+            index
+            for index, (chain, name) in enumerate(zip(self.chain_ids, self.atom_names))
+            if (chain_set is None or chain in chain_set)
+            and (name_set is None or name in name_set)
+        ]
+        return AtomTable(
+            record_types=tuple(self.record_types[i] for i in keep),
+            atom_names=tuple(self.atom_names[i] for i in keep),
+            residue_names=tuple(self.residue_names[i] for i in keep),
+            chain_ids=tuple(self.chain_ids[i] for i in keep),
+            residue_numbers=array("l", (self.residue_numbers[i] for i in keep)),
+            x=array("d", (self.x[i] for i in keep)),
+            y=array("d", (self.y[i] for i in keep)),
+            z=array("d", (self.z[i] for i in keep)),
+        )
+
+
+def read_pdb_atoms(
+    path: Union[str, Path],
+    *,
+    chains: Optional[Iterable[str]] = None,
+    atom_names: Optional[Iterable[str]] = None,
+    use_cache: bool = True,
+) -> AtomTable:
+    """Return the ATOM/HETATM records of the PDB file at *path*.
+
+    Parameters
+    ----------
+    path:
+        Location of the ``.pdb`` file.
+    chains, atom_names:
+        Optional filters forwarded to :meth:`AtomTable.select`.
+    use_cache:
+        When ``True`` (the default) a ``.npy`` file with the same stem is
+        read instead of the PDB file if it is at least as new as the source,
+        and written after parsing otherwise.  Cache write failures, for
+        example in read-only directories, are ignored.
+
+    Only the first model of multi-model entries is read, and for atoms with
+    alternate locations only the blank or ``A`` conformer is kept.
+    """
+
+    source = Path(path)
+    cache_path = source.with_suffix(".npy")
+    table = None
+    if use_cache:
+        table = _load_cache(source, cache_path)
+    if table is None:
+        table = _parse_pdb(source)
+        if use_cache:
+            _write_cache(table, cache_path)
+    return table.select(chains=chains, atom_names=atom_names)
+
+
+def pdb_coordinates(
+    path: Union[str, Path],
+    *,
+    chains: Optional[Iterable[str]] = None,
+    atom_names: Optional[Iterable[str]] = None,
+) -> List[Coordinate]:
+    """Convenience wrapper returning only the selected atom positions."""
+
+    return read_pdb_atoms(path, chains=chains, atom_names=atom_names).coordinates()
+
+
+def _parse_pdb(source: Path) -> AtomTable:
+    records: List[str] = []
+    names: List[str] = []
+    residues: List[str] = []
+    chain_ids: List[str] = []
+    numbers = array("l")
+    xs = array("d")
+    ys = array("d")
+    zs = array("d")
+
+    with open(source, "rb") as handle:
+        for line in handle:
+            head = line[:6]
+            if head == b"ENDMDL":
+                break
+            if head != b"ATOM  " and head != b"HETATM":
+                continue
+            if line[16:17] not in (b" ", b"A", b""):
+                continue
+            records.append(head.decode("ascii").strip())
+            names.append(line[12:16].decode("ascii").strip())
+            residues.append(line[17:20].decode("ascii").strip())
+            chain_ids.append(line[21:22].decode("ascii").strip())
+            numbers.append(int(line[22:26]))
+            xs.append(float(line[30:38]))
+            ys.append(float(line[38:46]))
+            zs.append(float(line[46:54]))
+
+    return AtomTable(
+        record_types=tuple(records),
+        atom_names=tuple(names),
+        residue_names=tuple(residues),
+        chain_ids=tuple(chain_ids),
+        residue_numbers=numbers,
+        x=xs,
+        y=ys,
+        z=zs,
+    )
+
+
+def _load_cache(source: Path, cache_path: Path) -> Optional[AtomTable]:
+    try:
+        if cache_path.stat().st_mtime_ns < source.stat().st_mtime_ns:
+            return None
+        with open(cache_path, "rb") as handle:
+            descr, shape, _ = read_npy_header(handle)
+            if descr != _CACHE_DESCR or len(shape) != 1:
+                return None
+            payload = handle.read()
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if len(payload) != shape[0] * _CACHE_RECORD.size:
+        return None
+
+    columns = list(zip(*_CACHE_RECORD.iter_unpack(payload))) or [()] * 8
+    record, name, resname, chain, resseq, x, y, z = columns
+
+    def text(values: Tuple[bytes, ...]) -> Tuple[str, ...]:
+        return tuple(value.rstrip(b"\0").decode("ascii") for value in values)
+
+    return AtomTable(
+        record_types=text(record),
+        atom_names=text(name),
+        residue_names=text(resname),
+        chain_ids=text(chain),
+        residue_numbers=array("l", resseq),
+        x=array("d", x),
+        y=array("d", y),
+        z=array("d", z),
+    )
+
+
+def _write_cache(table: AtomTable, cache_path: Path) -> None:
+    payload = bytearray(len(table) * _CACHE_RECORD.size)
+    for index, row in enumerate(
+        zip(
+            table.record_types,
+            table.atom_names,
+            table.residue_names,
+            table.chain_ids,
+            table.residue_numbers,
+            table.x,
+            table.y,
+            table.z,
+        )
+    ):
+        record, name, resname, chain, resseq, x, y, z = row
+        _CACHE_RECORD.pack_into(
+            payload,
+            index * _CACHE_RECORD.size,
+            record.encode("ascii"),
+            name.encode("ascii"),
+            resname.encode("ascii"),
+            chain.encode("ascii"),
+            resseq,
+            x,
+            y,
+            z,
+        )
+    try:
+        write_npy(cache_path, _CACHE_DESCR, (len(table),), bytes(payload))
+    except OSError:
+        pass
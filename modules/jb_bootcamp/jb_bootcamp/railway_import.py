@@ -0,0 +1,513 @@
+"""Bulk import of railway networks from CSV files and GTFS feeds.
+
+Building a :class:`~jb_bootcamp.tamagawa_network.RailwayNetwork` one
+:class:`~jb_bootcamp.tamagawa_network.Station` and
+:class:`~jb_bootcamp.tamagawa_network.Track` at a time validates every call
+and constructs a frozen dataclass per row, which dominates the load time of
+networks with hundreds of thousands of segments.  The readers here stream
+the files in chunks into flat ``array`` columns, validate each chunk as a
+whole and return a :class:`NetworkColumns` table.  The table compiles
+straight to a :class:`~jb_bootcamp.railway_routing.CompactRailwayGraph`
+without any per-row objects, or can be turned into a full
+:class:`RailwayNetwork` when the object API is needed.
+
+Two inputs are understood:
+
+* a pair of CSV files, one with ``name,x,y[,weight]`` station rows and one
+  with ``origin,destination,length_km,design_speed_kph[,bidirectional]``
+  track rows (:func:`read_network_csv`);
+* the ``stops.txt`` and ``stop_times.txt`` files of a GTFS feed
+  (:func:`read_gtfs`).  Stops are projected onto a local equirectangular
+  grid in kilometres, every pair of consecutive stops of a trip becomes a
+  one-way track whose length is the great-circle distance, and the speed is
+  derived from the scheduled running time.
+"""
+
+from __future__ import annotations
+
+from array import array
+import csv
+from dataclasses import dataclass
+from itertools import islice
+import math
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from ._csvrows import numbered_rows
+from .railway_routing import CompactRailwayGraph
+from .tamagawa_network import RailwayNetwork, Station, Track
+
+__all__ = [
+    "NetworkColumns",
+    "read_network_csv",
+    "read_gtfs",
+]
+
+_EARTH_RADIUS_KM = 6371.0
+_TRUE_VALUES = frozenset({"1", "true", "t", "yes", "y"})
+_FALSE_VALUES = frozenset({"0", "false", "f", "no", "n"})
+
+PathLike = Union[str, Path]
+
+
+@dataclass(frozen=True)
+class NetworkColumns:
+    """Column-oriented railway network.
+
+    Stations are identified by their position in :attr:`names`; the track
+    columns refer to stations by that integer ID.  Lengths are in
+    kilometres and speeds in kilometres per hour, as for
+    :class:`~jb_bootcamp.tamagawa_network.Track`.
+    """
+
+    names: Tuple[str, ...]
+    x: array
+    y: array
+    weights: array
+    origins: array
+    destinations: array
+    lengths_km: array
+    speeds_kph: array
+    bidirectional: bytes
+
+    @property
+    def station_count(self) -> int:
+        return len(self.names)
+
+    @property
+    def track_count(self) -> int:
+        return len(self.origins)
+
+    def compile(self) -> CompactRailwayGraph:
+        """Return the network as a :class:`CompactRailwayGraph`.
+
+        The result is identical to compiling the equivalent
+        :class:`RailwayNetwork`, but no station or track objects are built.
+        """
+
+        def edges() -> Iterator[Tuple[int, int, float]]:
+            for origin, destination, length, speed, both in zip(
+                self.origins,
+                self.destinations,
+                self.lengths_km,
+                self.speeds_kph,
+                self.bidirectional,
+            ):
+                hours = length / speed
+                yield origin, destination, hours
+                if both:
+                    yield destination, origin, hours
+
+        return CompactRailwayGraph.from_edges(
+            self.names,
+            edges(),
+            self.x,
+            self.y,
+            max_speed_kph=max(self.speeds_kph, default=None),
+        )
+
+    def to_network(self, *, cache_size: int = 128) -> RailwayNetwork:
+        """Return a :class:`RailwayNetwork` holding the same stations and tracks.
+
+        The columns were validated when they were read, so the stations and
+        tracks are inserted without the per-call checks of
+        :meth:`RailwayNetwork.add_station` and
+        :meth:`RailwayNetwork.add_track`, and the compiled graph is attached
+        so routing queries do not rebuild it.
+        """
+
+        names = self.names
+        stations = [
+            Station(name, (x, y), weight)
+            for name, x, y, weight in zip(names, self.x, self.y, self.weights)
+        ]
+        tracks = [
+            Track(names[origin], names[destination], length, speed, bool(both))
+            for origin, destination, length, speed, both in zip(
+                self.origins,
+                self.destinations,
+                self.lengths_km,
+                self.speeds_kph,
+                self.bidirectional,
+            )
+        ]
+        network = RailwayNetwork(cache_size=cache_size)
+        network._load_validated(stations, tracks, self.compile())
+        return network
+
+
+def read_network_csv(
+    stations_path: PathLike,
+    tracks_path: PathLike,
+    *,
+    chunk_size: int = 65536,
+) -> NetworkColumns:
+    """Read a network from a station CSV file and a track CSV file.
+
+    Parameters
+    ----------
+    stations_path:
+        CSV file with a header row naming the columns ``name``, ``x`` and
+        ``y`` (kilometres) and optionally ``weight`` (default 1.0).
+    tracks_path:
+        CSV file with the columns ``origin``, ``destination``,
+        ``length_km`` and ``design_speed_kph`` and optionally
+        ``bidirectional`` (``1``/``0``, ``true``/``false`` or
+        ``yes``/``no``; default true).
+    chunk_size:
+        Number of rows parsed and validated together.
+
+    ``ValueError`` is raised for missing columns, malformed numbers,
+    duplicate station names, non-positive lengths or speeds and tracks that
+    start and end at the same station; ``KeyError`` for tracks referencing
+    unknown stations.  Messages give the file and line of the first
+    offending row.
+    """
+
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+    names: List[str] = []
+    index: Dict[str, int] = {}
+    x, y, weights = array("d"), array("d"), array("d")
+    for lines, columns in _read_chunks(
+        stations_path, ("name", "x", "y"), ("weight",), chunk_size
+    ):
+        chunk_names, chunk_x, chunk_y, chunk_weights = columns
+        for offset, name in enumerate(chunk_names):
+            if not name:
+                raise ValueError(f"{stations_path}:{lines[offset]}: empty station name")
+            if name in index:
+                raise ValueError(
+                    f"{stations_path}:{lines[offset]}: station '{name}' already exists"
+                )
+            index[name] = len(names)
+            names.append(name)
+        x.extend(_floats(chunk_x, stations_path, lines, "x"))
+        y.extend(_floats(chunk_y, stations_path, lines, "y"))
+        weights.extend(_floats(chunk_weights, stations_path, lines, "weight", default=1.0))
+
+    origins, destinations = array("i"), array("i")
+    lengths, speeds = array("d"), array("d")
+    bidirectional = bytearray()
+    for lines, columns in _read_chunks(
+        tracks_path,
+        ("origin", "destination", "length_km", "design_speed_kph"),
+        ("bidirectional",),
+        chunk_size,
+    ):
+        chunk_origins, chunk_destinations, chunk_lengths, chunk_speeds, chunk_both = columns
+        origin_ids = _station_ids(chunk_origins, index, tracks_path, lines, "origin")
+        destination_ids = _station_ids(
+            chunk_destinations, index, tracks_path, lines, "destination"
+        )
+        chunk_lengths = _floats(chunk_lengths, tracks_path, lines, "length_km")
+        chunk_speeds = _floats(chunk_speeds, tracks_path, lines, "design_speed_kph")
+        _check_positive(chunk_lengths, tracks_path, lines, "track length")
+        _check_positive(chunk_speeds, tracks_path, lines, "design speed")
+        loops = list(map(int.__eq__, origin_ids, destination_ids))
+        if any(loops):
+            raise ValueError(
+                f"{tracks_path}:{lines[loops.index(True)]}: "
+                "tracks must connect distinct stations"
+            )
+        origins.extend(origin_ids)
+        destinations.extend(destination_ids)
+        lengths.extend(chunk_lengths)
+        speeds.extend(chunk_speeds)
+        bidirectional.extend(_flags(chunk_both, tracks_path, lines))
+
+    return NetworkColumns(
+        names=tuple(names),
+        x=x,
+        y=y,
+        weights=weights,
+        origins=origins,
+        destinations=destinations,
+        lengths_km=lengths,
+        speeds_kph=speeds,
+        bidirectional=bytes(bidirectional),
+    )
+
+
+def read_gtfs(
+    directory: PathLike,
+    *,
+    fallback_speed_kph: float = 200.0,
+    chunk_size: int = 65536,
+) -> NetworkColumns:
+    """Read the stops and scheduled segments of a GTFS feed.
+
+    Parameters
+    ----------
+    directory:
+        Folder containing ``stops.txt`` (``stop_id``, ``stop_lat``,
+        ``stop_lon``) and ``stop_times.txt`` (``trip_id``,
+        ``stop_sequence``, ``stop_id`` and optionally ``arrival_time`` and
+        ``departure_time``).  The rows of each trip must be contiguous in
+        ``stop_times.txt``, as feeds conventionally write them.
+    fallback_speed_kph:
+        Speed used for segments without usable times, i.e. missing times or
+        a zero scheduled running time.
+    chunk_size:
+        Number of rows parsed and validated together.
+
+    Stations are placed on an equirectangular projection centred on the
+    mean stop position, in kilometres.  Every directed pair of consecutive
+    stops becomes one one-way track; when several trips serve the same pair
+    the fastest schedule is kept.  Consecutive calls at co-located stops are
+    skipped, since tracks need a positive length.
+    """
+
+    if fallback_speed_kph <= 0.0:
+        raise ValueError("fallback_speed_kph must be positive")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    folder = Path(directory)
+    stops_path = folder / "stops.txt"
+    stop_times_path = folder / "stop_times.txt"
+
+    names: List[str] = []
+    index: Dict[str, int] = {}
+    latitudes, longitudes = array("d"), array("d")
+    for lines, columns in _read_chunks(
+        stops_path, ("stop_id", "stop_lat", "stop_lon"), (), chunk_size
+    ):
+        chunk_ids, chunk_lat, chunk_lon = columns
+        for offset, name in enumerate(chunk_ids):
+            if not name or name in index:
+                raise ValueError(f"{stops_path}:{lines[offset]}: duplicate or empty stop_id")
+            index[name] = len(names)
+            names.append(name)
+        chunk_lat = _floats(chunk_lat, stops_path, lines, "stop_lat")
+        chunk_lon = _floats(chunk_lon, stops_path, lines, "stop_lon")
+        if chunk_lat and not -90.0 <= min(chunk_lat) <= max(chunk_lat) <= 90.0:
+            raise ValueError(f"{stops_path}: stop_lat must lie within [-90, 90]")
+        latitudes.extend(chunk_lat)
+        longitudes.extend(chunk_lon)
+
+    phi = array("d", map(math.radians, latitudes))
+    lam = array("d", map(math.radians, longitudes))
+    phi0 = math.fsum(phi) / len(phi) if phi else 0.0
+    lam0 = math.fsum(lam) / len(lam) if lam else 0.0
+    scale = _EARTH_RADIUS_KM * math.cos(phi0)
+    x = array("d", (scale * (value - lam0) for value in lam))
+    y = array("d", (_EARTH_RADIUS_KM * (value - phi0) for value in phi))
+
+    fastest: Dict[Tuple[int, int], Tuple[float, float]] = {}
+    finished = set()
+    current: Optional[str] = None
+    calls: List[Tuple[int, int, Optional[float], Optional[float]]] = []
+
+    def close_trip() -> None:
+        calls.sort(key=lambda call: call[0])
+        for previous, following in zip(calls, calls[1:]):
+            if previous[0] == following[0]:
+                raise ValueError(
+                    f"{stop_times_path}: trip '{current}' repeats stop_sequence {previous[0]}"
+                )
+        for (_, start, _, leaves), (_, end, arrives, _) in zip(calls, calls[1:]):
+            if start == end:
+                continue
+            length = _haversine(phi[start], lam[start], phi[end], lam[end])
+            if length <= 0.0:
+                continue
+            if leaves is not None and arrives is not None and arrives > leaves:
+                speed = length / (arrives - leaves)
+            else:
+                speed = fallback_speed_kph
+            key = (start, end)
+            if key not in fastest or speed > fastest[key][1]:
+                fastest[key] = (length, speed)
+        calls.clear()
+
+    for lines, columns in _read_chunks(
+        stop_times_path,
+        ("trip_id", "stop_sequence", "stop_id"),
+        ("arrival_time", "departure_time"),
+        chunk_size,
+    ):
+        trip_ids, sequences, stop_ids, arrivals, departures = columns
+        sequences = _ints(sequences, stop_times_path, lines, "stop_sequence")
+        stations = _station_ids(stop_ids, index, stop_times_path, lines, "stop_id")
+        arrival_hours = _clock_hours(arrivals, stop_times_path, lines)
+        departure_hours = _clock_hours(departures, stop_times_path, lines)
+        for offset, trip_id in enumerate(trip_ids):
+            if trip_id != current:
+                if current is not None:
+                    close_trip()
+                    finished.add(current)
+                if trip_id in finished:
+                    raise ValueError(
+                        f"{stop_times_path}:{lines[offset]}: "
+                        f"rows of trip '{trip_id}' are not contiguous"
+                    )
+                current = trip_id
+            arrival = arrival_hours[offset]
+            departure = departure_hours[offset]
+            calls.append(
+                (
+                    sequences[offset],
+                    stations[offset],
+                    arrival if arrival is not None else departure,
+                    departure if departure is not None else arrival,
+                )
+            )
+    close_trip()
+
+    pairs = sorted(fastest)
+    return NetworkColumns(
+        names=tuple(names),
+        x=x,
+        y=y,
+        weights=array("d", [1.0]) * len(names),
+        origins=array("i", (start for start, _ in pairs)),
+        destinations=array("i", (end for _, end in pairs)),
+        lengths_km=array("d", (fastest[pair][0] for pair in pairs)),
+        speeds_kph=array("d", (fastest[pair][1] for pair in pairs)),
+        bidirectional=bytes(len(pairs)),
+    )
+
+
+def _read_chunks(
+    path: PathLike,
+    required: Sequence[str],
+    optional: Sequence[str],
+    chunk_size: int,
+) -> Iterator[Tuple[array, List[Tuple[str, ...]]]]:
+    """Yield ``(line numbers, columns)`` for chunks of *path*.
+
+    Columns follow the order of *required* then *optional*; absent optional
+    columns are returned as empty strings.  Blank rows are skipped, and the
+    ``array('q')`` of line numbers gives the line each row starts on.
+    """
+
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        reader = csv.reader(handle)
+        header = [field.strip() for field in next(reader, [])]
+        missing = [name for name in required if name not in header]
+        if missing:
+            raise ValueError(f"{path}: missing column(s) {', '.join(missing)}")
+        positions = [header.index(name) for name in required]
+        positions += [header.index(name) if name in header else -1 for name in optional]
+        width = len(header)
+
+        numbered = numbered_rows(reader)
+        while True:
+            batch = list(islice(numbered, chunk_size))
+            if not batch:
+                return
+            lines = array("q", (line for line, _ in batch))
+            rows = [row for _, row in batch]
+            short = [len(row) < width for row in rows]
+            if any(short):
+                raise ValueError(f"{path}:{lines[short.index(True)]}: row has too few fields")
+            columns = list(zip(*rows))
+            yield lines, [
+                tuple(map(str.strip, columns[position])) if position >= 0 else ("",) * len(rows)
+                for position in positions
+            ]
+
+
+def _floats(
+    values: Sequence[str],
+    path: PathLike,
+    lines: Sequence[int],
+    column: str,
+    *,
+    default: Optional[float] = None,
+) -> array:
+    if default is not None:
+        values = [value or str(default) for value in values]
+    try:
+        parsed = array("d", map(float, values))
+    except ValueError:
+        for offset, value in enumerate(values):
+            try:
+                float(value)
+            except ValueError:
+                raise ValueError(
+                    f"{path}:{lines[offset]}: {column} is not a number: {value!r}"
+                ) from None
+        raise AssertionError("unreachable")  # pragma: no cover
+    if not all(map(math.isfinite, parsed)):
+        offset = next(i for i, value in enumerate(parsed) if not math.isfinite(value))
+        raise ValueError(f"{path}:{lines[offset]}: {column} is not finite: {values[offset]!r}")
+    return parsed
+
+
+def _ints(values: Sequence[str], path: PathLike, lines: Sequence[int], column: str) -> array:
+    try:
+        return array("q", map(int, values))
+    except ValueError:
+        pass
+    for offset, value in enumerate(values):
+        try:
+            int(value)
+        except ValueError:
+            raise ValueError(
+                f"{path}:{lines[offset]}: {column} is not an integer: {value!r}"
+            ) from None
+    raise AssertionError("unreachable")  # pragma: no cover
+
+
+def _check_positive(values: array, path: PathLike, lines: Sequence[int], what: str) -> None:
+    if not all(value > 0.0 for value in values):
+        offset = next(i for i, value in enumerate(values) if not value > 0.0)
+        raise ValueError(f"{path}:{lines[offset]}: {what} must be positive")
+
+
+def _station_ids(
+    names: Sequence[str],
+    index: Dict[str, int],
+    path: PathLike,
+    lines: Sequence[int],
+    column: str,
+) -> array:
+    lookup = index.get
+    ids = list(map(lookup, names))
+    if None in ids:
+        offset = ids.index(None)
+        raise KeyError(f"{path}:{lines[offset]}: unknown {column} station '{names[offset]}'")
+    return array("i", ids)
+
+
+def _flags(values: Sequence[str], path: PathLike, lines: Sequence[int]) -> bytes:
+    lowered = [value.lower() for value in values]
+    flags = bytes(value not in _FALSE_VALUES for value in lowered)
+    invalid = [
+        value and value not in _TRUE_VALUES and value not in _FALSE_VALUES for value in lowered
+    ]
+    if any(invalid):
+        offset = invalid.index(True)
+        raise ValueError(
+            f"{path}:{lines[offset]}: bidirectional must be a boolean, got {values[offset]!r}"
+        )
+    return flags
+
+
+def _clock_hours(values: Sequence[str], path: PathLike, lines: Sequence[int]) -> List[Optional[float]]:
+    hours: List[Optional[float]] = []
+    for offset, value in enumerate(values):
+        if not value:
+            hours.append(None)
+            continue
+        parts = value.split(":")
+        try:
+            if len(parts) != 3:
+                raise ValueError
+            h, m, s = map(int, parts)
+        except ValueError:
+            raise ValueError(
+                f"{path}:{lines[offset]}: times must be written as H:MM:SS, got {value!r}"
+            ) from None
+        hours.append(h + m / 60.0 + s / 3600.0)
+    return hours
+
+
+def _haversine(phi0: float, lam0: float, phi1: float, lam1: float) -> float:
+    a = (
+        math.sin((phi1 - phi0) / 2.0) ** 2
+        + math.cos(phi0) * math.cos(phi1) * math.sin((lam1 - lam0) / 2.0) ** 2
+    )
+    return 2.0 * _EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
@@ -0,0 +1,778 @@
+"""Compact routing kernels for large railway networks.
+
+:class:`~jb_bootcamp.tamagawa_network.RailwayNetwork` keeps its topology in
+dictionaries keyed by station name, which is convenient while a network is
+being assembled but costs hundreds of bytes per track and a string hash per
+edge relaxation.  :class:`CompactRailwayGraph` is the frozen counterpart: the
+stations are numbered ``0 .. n - 1`` and the directed tracks are stored in
+compressed sparse row (CSR) form, i.e. three flat arrays holding the offset
+of every station's first outgoing track, the target station of every track
+and its travel time in hours.  The search routines below work on those
+arrays only.
+"""
+
+from __future__ import annotations
+
+import argparse
+from array import array
+from dataclasses import dataclass
+import heapq
+import json
+import math
+from pathlib import Path
+import random
+import struct
+import sys
+import time
+from typing import Dict, Iterable, List, Literal, Optional, Sequence, Tuple, Union
+import zlib
+
+__all__ = [
+    "ROUTING_METHODS",
+    "RouteSearch",
+    "RoutingBenchmark",
+    "CompactRailwayGraph",
+    "ContractionHierarchy",
+    "benchmark_routing",
+]
+
+RoutingMethod = Literal["dijkstra", "astar", "bidirectional"]
+ROUTING_METHODS: Tuple[RoutingMethod, ...] = ("dijkstra", "astar", "bidirectional")
+
+
+@dataclass(frozen=True)
+class RouteSearch:
+    """Outcome of a single point-to-point search."""
+
+    travel_time: float
+    expanded: int
+
+
+@dataclass(frozen=True)
+class RoutingBenchmark:
+    """Aggregate cost of answering a batch of queries with one method."""
+
+    method: str
+    queries: int
+    expanded: int
+    seconds: float
+
+    @property
+    def mean_expanded(self) -> float:
+        return self.expanded / self.queries if self.queries else 0.0
+
+    @property
+    def mean_milliseconds(self) -> float:
+        return 1000.0 * self.seconds / self.queries if self.queries else 0.0
+
+
+class CompactRailwayGraph:
+    """Immutable CSR representation of a railway network.
+
+    Parameters
+    ----------
+    names:
+        Station names; a station's position is its integer ID.
+    offsets:
+        ``len(names) + 1`` non-decreasing indices into *targets* and
+        *weights*.  The tracks leaving station ``i`` occupy positions
+        ``offsets[i]`` up to ``offsets[i + 1]``.
+    targets, weights:
+        Destination station ID and travel time in hours of every directed
+        track.
+    x, y:
+        Station coordinates in kilometres, used by :meth:`astar`.
+    max_speed_kph:
+        Fastest design speed in the network.  The A* heuristic divides the
+        straight-line distance to the goal by the larger of this value and
+        the fastest straight-line speed implied by any single track, which
+        keeps the heuristic admissible even when track lengths are shorter
+        than the distance between their end points.
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        offsets: Sequence[int],
+        targets: Sequence[int],
+        weights: Sequence[float],
+        x: Sequence[float],
+        y: Sequence[float],
+        *,
+        max_speed_kph: Optional[float] = None,
+    ) -> None:
+        size = len(names)
+        self.names: Tuple[str, ...] = tuple(names)
+        self.offsets = array("q", offsets)
+        self.targets = array("i", targets)
+        self.weights = array("d", weights)
+        self.x = array("d", x)
+        self.y = array("d", y)
+
+        if len(self.offsets) != size + 1 or (size and self.offsets[0] != 0):
+            raise ValueError("offsets must start at 0 and hold one entry per station plus one")
+        if self.offsets[-1] != len(self.targets) or len(self.targets) != len(self.weights):
+            raise ValueError("targets and weights must hold one entry per track")
+        if len(self.x) != size or len(self.y) != size:
+            raise ValueError("coordinates must hold one entry per station")
+        if any(low > high for low, high in zip(self.offsets, self.offsets[1:])):
+            raise ValueError("offsets must be non-decreasing")
+        if self.targets and not 0 <= min(self.targets) <= max(self.targets) < size:
+            raise ValueError("track targets must be valid station IDs")
+        if self.weights and min(self.weights) <= 0.0:
+            raise ValueError("track travel times must be positive")
+
+        self._index: Dict[str, int] = {name: station for station, name in enumerate(self.names)}
+        if len(self._index) != size:
+            raise ValueError("station names must be unique")
+        self.speed_bound = self._speed_bound(max_speed_kph or 0.0)
+        self._reverse_csr: Optional[Tuple[array, array, array]] = None
+
+    @classmethod
+    def from_edges(
+        cls,
+        names: Sequence[str],
+        edges: Iterable[Tuple[int, int, float]],
+        x: Sequence[float],
+        y: Sequence[float],
+        *,
+        max_speed_kph: Optional[float] = None,
+    ) -> "CompactRailwayGraph":
+        """Build a graph from ``(origin, target, hours)`` triples of station IDs."""
+
+        origins = array("i")
+        unsorted_targets = array("i")
+        unsorted_weights = array("d")
+        for origin, target, hours in edges:
+            origins.append(origin)
+            unsorted_targets.append(target)
+            unsorted_weights.append(hours)
+
+        # Counting sort by origin keeps the per-station order of the input.
+        offsets = array("q", [0]) * (len(names) + 1)
+        for origin in origins:
+            offsets[origin + 1] += 1
+        for station in range(len(names)):
+            offsets[station + 1] += offsets[station]
+        cursor = array("q", offsets[:-1]) if names else array("q")
+        targets = array("i", [0]) * len(origins)
+        weights = array("d", [0.0]) * len(origins)
+        for origin, target, hours in zip(origins, unsorted_targets, unsorted_weights):
+            position = cursor[origin]
+            targets[position] = target
+            weights[position] = hours
+            cursor[origin] = position + 1
+        return cls(names, offsets, targets, weights, x, y, max_speed_kph=max_speed_kph)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def track_count(self) -> int:
+        """Number of directed tracks."""
+
+        return len(self.targets)
+
+    def station_id(self, name: str) -> int:
+        """Return the integer ID of station *name*."""
+
+        try:
+            return self._index[name]
+        except KeyError:
+            raise KeyError(f"unknown station '{name}'") from None
+
+    def fingerprint(self) -> int:
+        """Return a CRC-32 checksum of the station names and CSR arrays.
+
+        Used to verify that a saved :class:`ContractionHierarchy` was built
+        for this exact graph.
+        """
+
+        checksum = zlib.crc32("\0".join(self.names).encode("utf-8"))
+        for column in (self.offsets, self.targets, self.weights):
+            checksum = zlib.crc32(column.tobytes(), checksum)
+        return checksum
+
+    def neighbours(self, station: int) -> List[Tuple[int, float]]:
+        """Return ``(target, hours)`` for every track leaving *station*."""
+
+        start, end = self.offsets[station], self.offsets[station + 1]
+        return list(zip(self.targets[start:end], self.weights[start:end]))
+
+    def shortest_times(self, source: int) -> array:
+        """Return the travel time from *source* to every station.
+
+        Unreachable stations hold ``math.inf``.
+        """
+
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        times = array("d", [math.inf]) * len(self.names)
+        settled = bytearray(len(self.names))
+        times[source] = 0.0
+        queue: List[Tuple[float, int]] = [(0.0, source)]
+        while queue:
+            current, station = heapq.heappop(queue)
+            if settled[station]:
+                continue
+            settled[station] = 1
+            for edge in range(offsets[station], offsets[station + 1]):
+                neighbour = targets[edge]
+                candidate = current + weights[edge]
+                if candidate < times[neighbour]:
+                    times[neighbour] = candidate
+                    heapq.heappush(queue, (candidate, neighbour))
+        return times
+
+    def dijkstra(self, source: int, target: int) -> float:
+        """Return the shortest travel time from *source* to *target*.
+
+        The search stops as soon as *target* is settled.  ``math.inf`` is
+        returned when no route exists.
+        """
+
+        return self._search(source, target, use_heuristic=False).travel_time
+
+    def astar(self, source: int, target: int) -> float:
+        """Return the shortest travel time using the straight-line heuristic.
+
+        The heuristic is the straight-line distance to *target* divided by
+        :attr:`speed_bound`; it never overestimates and is consistent, so
+        every station is expanded at most once.
+        """
+
+        return self._search(source, target, use_heuristic=True).travel_time
+
+    def bidirectional_astar(self, source: int, target: int) -> float:
+        """Return the shortest travel time searching from both ends.
+
+        The forward and backward searches share the average potential
+        ``(h_target(v) - h_source(v)) / 2``, which keeps the reduced track
+        costs non-negative in both directions and lets the search stop as
+        soon as the two frontiers can no longer improve the best meeting
+        point.
+        """
+
+        return self._bidirectional(source, target).travel_time
+
+    def search(self, source: int, target: int, method: RoutingMethod = "dijkstra") -> RouteSearch:
+        """Run *method* and report the travel time with the stations expanded."""
+
+        if method == "dijkstra":
+            return self._search(source, target, use_heuristic=False)
+        if method == "astar":
+            return self._search(source, target, use_heuristic=True)
+        if method == "bidirectional":
+            return self._bidirectional(source, target)
+        raise ValueError(f"unknown routing method '{method}'")
+
+    def _search(self, source: int, target: int, *, use_heuristic: bool) -> RouteSearch:
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        xs, ys = self.x, self.y
+        goal_x, goal_y = xs[target], ys[target]
+        inverse_speed = 1.0 / self.speed_bound if use_heuristic and self.speed_bound else 0.0
+
+        times: Dict[int, float] = {source: 0.0}
+        settled = bytearray(len(self.names))
+        queue: List[Tuple[float, int]] = [(0.0, source)]
+        expanded = 0
+        while queue:
+            _, station = heapq.heappop(queue)
+            if settled[station]:
+                continue
+            if station == target:
+                return RouteSearch(times[station], expanded)
+            settled[station] = 1
+            expanded += 1
+            current = times[station]
+            for edge in range(offsets[station], offsets[station + 1]):
+                neighbour = targets[edge]
+                candidate = current + weights[edge]
+                if candidate < times.get(neighbour, math.inf):
+                    times[neighbour] = candidate
+                    estimate = candidate
+                    if inverse_speed:
+                        estimate += (
+                            math.hypot(xs[neighbour] - goal_x, ys[neighbour] - goal_y)
+                            * inverse_speed
+                        )
+                    heapq.heappush(queue, (estimate, neighbour))
+        return RouteSearch(math.inf, expanded)
+
+    def _bidirectional(self, source: int, target: int) -> RouteSearch:
+        if source == target:
+            return RouteSearch(0.0, 0)
+
+        xs, ys = self.x, self.y
+        source_x, source_y = xs[source], ys[source]
+        target_x, target_y = xs[target], ys[target]
+        half_inverse_speed = 0.5 / self.speed_bound if self.speed_bound else 0.0
+
+        def potential(station: int) -> float:
+            x, y = xs[station], ys[station]
+            return half_inverse_speed * (
+                math.hypot(x - target_x, y - target_y) - math.hypot(x - source_x, y - source_y)
+            )
+
+        graphs = ((self.offsets, self.targets, self.weights), self._reverse())
+        signs = (1.0, -1.0)
+        times: Tuple[Dict[int, float], Dict[int, float]] = ({source: 0.0}, {target: 0.0})
+        settled = (bytearray(len(self.names)), bytearray(len(self.names)))
+        queues: Tuple[List[Tuple[float, int]], List[Tuple[float, int]]] = (
+            [(potential(source), source)],
+            [(-potential(target), target)],
+        )
+        best = math.inf
+        expanded = 0
+
+        while queues[0] and queues[1]:
+            if queues[0][0][0] + queues[1][0][0] >= best:
+                break
+            side = 0 if len(queues[0]) <= len(queues[1]) else 1
+            _, station = heapq.heappop(queues[side])
+            if settled[side][station]:
+                continue
+            settled[side][station] = 1
+            expanded += 1
+
+            offsets, targets, weights = graphs[side]
+            own, other = times[side], times[1 - side]
+            sign = signs[side]
+            current = own[station]
+            for edge in range(offsets[station], offsets[station + 1]):
+                neighbour = targets[edge]
+                candidate = current + weights[edge]
+                if candidate < own.get(neighbour, math.inf):
+                    own[neighbour] = candidate
+                    estimate = candidate + sign * potential(neighbour)
+                    heapq.heappush(queues[side], (estimate, neighbour))
+                if neighbour in other:
+                    best = min(best, candidate + other[neighbour])
+        return RouteSearch(best, expanded)
+
+    def _reverse(self) -> Tuple[array, array, array]:
+        """Return the CSR arrays of the graph with every track reversed."""
+
+        reverse = self._reverse_csr
+        if reverse is None:
+            reversed_graph = CompactRailwayGraph.from_edges(
+                self.names,
+                (
+                    (self.targets[edge], station, self.weights[edge])
+                    for station in range(len(self.names))
+                    for edge in range(self.offsets[station], self.offsets[station + 1])
+                ),
+                self.x,
+                self.y,
+                max_speed_kph=self.speed_bound,
+            )
+            reverse = (reversed_graph.offsets, reversed_graph.targets, reversed_graph.weights)
+            self._reverse_csr = reverse
+        return reverse
+
+    def _speed_bound(self, max_speed_kph: float) -> float:
+        bound = max_speed_kph
+        xs, ys, targets, weights = self.x, self.y, self.targets, self.weights
+        for station in range(len(self.names)):
+            for edge in range(self.offsets[station], self.offsets[station + 1]):
+                target = targets[edge]
+                distance = math.hypot(xs[station] - xs[target], ys[station] - ys[target])
+                bound = max(bound, distance / weights[edge])
+        return bound
+
+
+_HIERARCHY_MAGIC = b"JBRAILCH"
+
+
+class ContractionHierarchy:
+    """Contraction hierarchy for fast point-to-point queries on a static graph.
+
+    :meth:`build` contracts the stations one at a time in order of
+    importance (fewest shortcuts added, fewest neighbours already
+    contracted).  Whenever removing a station would lengthen a shortest path
+    between two of its neighbours, a shortcut track with the combined
+    travel time is inserted.  Afterwards every track points either upwards
+    or downwards in the contraction order, and a query only needs two small
+    Dijkstra searches that move upwards from the origin and from the
+    destination until they meet.
+
+    The hierarchy is stored as two CSR arrays: ``up`` holds the tracks from
+    every station to higher-ranked stations and ``down`` the reversed tracks
+    that arrive at every station from higher-ranked ones.  Use
+    :meth:`save`/:meth:`load` or :meth:`to_bytes`/:meth:`from_bytes` to
+    prepare a hierarchy once and share it with worker processes.
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        fingerprint: int,
+        rank: Sequence[int],
+        up: Tuple[Sequence[int], Sequence[int], Sequence[float]],
+        down: Tuple[Sequence[int], Sequence[int], Sequence[float]],
+    ) -> None:
+        self.names: Tuple[str, ...] = tuple(names)
+        self.fingerprint = fingerprint
+        self.rank = array("i", rank)
+        self.up = (array("q", up[0]), array("i", up[1]), array("d", up[2]))
+        self.down = (array("q", down[0]), array("i", down[1]), array("d", down[2]))
+        for offsets, targets, weights in (self.up, self.down):
+            if (
+                len(offsets) != len(self.names) + 1
+                or offsets[-1] != len(targets)
+                or len(targets) != len(weights)
+            ):
+                raise ValueError("hierarchy arrays do not match the station count")
+        if len(self.rank) != len(self.names):
+            raise ValueError("hierarchy ranks do not match the station count")
+
+    @classmethod
+    def build(
+        cls, graph: CompactRailwayGraph, *, witness_limit: int = 64
+    ) -> "ContractionHierarchy":
+        """Contract every station of *graph*.
+
+        ``witness_limit`` bounds how many stations each witness search may
+        settle.  Smaller limits build faster but may insert shortcuts that a
+        longer search would have proven unnecessary; queries stay exact.
+        """
+
+        size = len(graph)
+        outgoing: List[Dict[int, float]] = [{} for _ in range(size)]
+        incoming: List[Dict[int, float]] = [{} for _ in range(size)]
+        for station in range(size):
+            for target, hours in graph.neighbours(station):
+                if hours < outgoing[station].get(target, math.inf):
+                    outgoing[station][target] = hours
+                    incoming[target][station] = hours
+
+        def shortcuts(station: int) -> List[Tuple[int, int, float]]:
+            needed: List[Tuple[int, int, float]] = []
+            out_edges = outgoing[station]
+            if not out_edges:
+                return needed
+            longest_out = max(out_edges.values())
+            for source, to_station in incoming[station].items():
+                limit = to_station + longest_out
+                witnesses = _witness_search(outgoing, source, station, limit, witness_limit)
+                for target, from_station in out_edges.items():
+                    if target == source:
+                        continue
+                    via = to_station + from_station
+                    if witnesses.get(target, math.inf) > via:
+                        needed.append((source, target, via))
+            return needed
+
+        contracted_neighbours = [0] * size
+
+        def priority(station: int) -> int:
+            removed = len(outgoing[station]) + len(incoming[station])
+            return len(shortcuts(station)) - removed + contracted_neighbours[station]
+
+        queue = [(priority(station), station) for station in range(size)]
+        heapq.heapify(queue)
+        rank = array("i", [0]) * size
+        up_edges: List[Tuple[int, int, float]] = []
+        down_edges: List[Tuple[int, int, float]] = []
+        contracted = bytearray(size)
+        order = 0
+
+        while queue:
+            _, station = heapq.heappop(queue)
+            if contracted[station]:
+                continue
+            current = priority(station)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, station))
+                continue
+
+            added = shortcuts(station)
+            contracted[station] = 1
+            rank[station] = order
+            order += 1
+            for target, hours in outgoing[station].items():
+                up_edges.append((station, target, hours))
+                del incoming[target][station]
+                contracted_neighbours[target] += 1
+            for source, hours in incoming[station].items():
+                down_edges.append((station, source, hours))
+                del outgoing[source][station]
+                contracted_neighbours[source] += 1
+            outgoing[station] = {}
+            incoming[station] = {}
+            for source, target, hours in added:
+                if hours < outgoing[source].get(target, math.inf):
+                    outgoing[source][target] = hours
+                    incoming[target][source] = hours
+
+        up = CompactRailwayGraph.from_edges(graph.names, up_edges, graph.x, graph.y)
+        down = CompactRailwayGraph.from_edges(graph.names, down_edges, graph.x, graph.y)
+        return cls(
+            graph.names,
+            graph.fingerprint(),
+            rank,
+            (up.offsets, up.targets, up.weights),
+            (down.offsets, down.targets, down.weights),
+        )
+
+    @property
+    def shortcut_count(self) -> int:
+        """Number of stored upward and downward tracks."""
+
+        return len(self.up[1]) + len(self.down[1])
+
+    def travel_time(self, source: int, target: int) -> float:
+        """Return the shortest travel time, or ``math.inf`` if unreachable."""
+
+        return self.search(source, target).travel_time
+
+    def search(self, source: int, target: int) -> RouteSearch:
+        """Run the bidirectional upward search between two station IDs."""
+
+        if source == target:
+            return RouteSearch(0.0, 0)
+        graphs = (self.up, self.down)
+        times: Tuple[Dict[int, float], Dict[int, float]] = ({source: 0.0}, {target: 0.0})
+        queues: Tuple[List[Tuple[float, int]], List[Tuple[float, int]]] = (
+            [(0.0, source)],
+            [(0.0, target)],
+        )
+        best = math.inf
+        expanded = 0
+        side = 1
+        while queues[0] or queues[1]:
+            side = 1 - side if queues[1 - side] else side
+            queue = queues[side]
+            current, station = heapq.heappop(queue)
+            own, other = times[side], times[1 - side]
+            if current > own[station]:
+                continue
+            if current >= best:
+                queue.clear()
+                continue
+            expanded += 1
+            if station in other:
+                best = min(best, current + other[station])
+            offsets, targets, weights = graphs[side]
+            for edge in range(offsets[station], offsets[station + 1]):
+                neighbour = targets[edge]
+                candidate = current + weights[edge]
+                if candidate < own.get(neighbour, math.inf):
+                    own[neighbour] = candidate
+                    heapq.heappush(queue, (candidate, neighbour))
+        return RouteSearch(best, expanded)
+
+    def to_bytes(self) -> bytes:
+        """Serialise the hierarchy into a compact binary blob."""
+
+        columns = (self.rank, *self.up, *self.down)
+        header = json.dumps(
+            {
+                "version": 1,
+                "byteorder": sys.byteorder,
+                "names": list(self.names),
+                "fingerprint": self.fingerprint,
+                "lengths": [len(column) for column in columns],
+            },
+            ensure_ascii=False,
+        ).encode("utf-8")
+        parts = [_HIERARCHY_MAGIC, struct.pack("<Q", len(header)), header]
+        parts.extend(column.tobytes() for column in columns)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ContractionHierarchy":
+        """Restore a hierarchy written by :meth:`to_bytes`."""
+
+        if not data.startswith(_HIERARCHY_MAGIC):
+            raise ValueError("data does not hold a contraction hierarchy")
+        position = len(_HIERARCHY_MAGIC)
+        if len(data) < position + 8:
+            raise ValueError("contraction hierarchy data is truncated")
+        (header_length,) = struct.unpack_from("<Q", data, position)
+        position += 8
+        if len(data) < position + header_length:
+            raise ValueError("contraction hierarchy data is truncated")
+        try:
+            header = json.loads(data[position : position + header_length].decode("utf-8"))
+            version = header["version"]
+            byteorder = header["byteorder"]
+            names = list(header["names"])
+            fingerprint = int(header["fingerprint"])
+            lengths = [int(length) for length in header["lengths"]]
+        except (UnicodeDecodeError, ValueError, KeyError, TypeError):
+            raise ValueError("malformed hierarchy header") from None
+        position += header_length
+        if version != 1:
+            raise ValueError("unsupported contraction hierarchy version")
+        if min(lengths, default=0) < 0:
+            raise ValueError("malformed hierarchy header")
+
+        typecodes = "iqidqid"
+        if len(lengths) != len(typecodes):
+            raise ValueError("contraction hierarchy header lists the wrong number of arrays")
+        payload = sum(
+            length * array(typecode).itemsize for typecode, length in zip(typecodes, lengths)
+        )
+        if len(data) - position < payload:
+            raise ValueError("contraction hierarchy data is truncated")
+        if len(data) - position > payload:
+            raise ValueError("contraction hierarchy data has trailing bytes")
+
+        columns = []
+        for typecode, length in zip(typecodes, lengths):
+            column = array(typecode)
+            end = position + length * column.itemsize
+            column.frombytes(data[position:end])
+            if byteorder != sys.byteorder:  # pragma: no cover - platform specific
+                column.byteswap()
+            columns.append(column)
+            position = end
+        rank, *arrays = columns
+        return cls(
+            names,
+            fingerprint,
+            rank,
+            (arrays[0], arrays[1], arrays[2]),
+            (arrays[3], arrays[4], arrays[5]),
+        )
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write :meth:`to_bytes` to *path*."""
+
+        Path(path).write_bytes(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "ContractionHierarchy":
+        """Read a hierarchy written by :meth:`save`."""
+
+        return cls.from_bytes(Path(path).read_bytes())
+
+
+def _witness_search(
+    outgoing: Sequence[Dict[int, float]],
+    source: int,
+    excluded: int,
+    limit: float,
+    max_settled: int,
+) -> Dict[int, float]:
+    """Return tentative travel times from *source* that avoid *excluded*."""
+
+    times = {source: 0.0}
+    queue = [(0.0, source)]
+    settled = 0
+    while queue:
+        current, station = heapq.heappop(queue)
+        if current > times[station]:
+            continue
+        if current > limit or settled >= max_settled:
+            break
+        settled += 1
+        for neighbour, hours in outgoing[station].items():
+            if neighbour == excluded:
+                continue
+            candidate = current + hours
+            if candidate < times.get(neighbour, math.inf):
+                times[neighbour] = candidate
+                heapq.heappush(queue, (candidate, neighbour))
+    return times
+
+
+def benchmark_routing(
+    graph: CompactRailwayGraph,
+    queries: Sequence[Tuple[int, int]],
+    *,
+    methods: Sequence[RoutingMethod] = ROUTING_METHODS,
+) -> List[RoutingBenchmark]:
+    """Time *methods* on the same origin-destination *queries*.
+
+    Raises ``ValueError`` if two methods disagree on any travel time, so a
+    benchmark run doubles as a consistency check.
+    """
+
+    results: List[RoutingBenchmark] = []
+    reference: Optional[List[float]] = None
+    for method in methods:
+        if method == "bidirectional":
+            graph._reverse()
+        expanded = 0
+        answers: List[float] = []
+        start = time.perf_counter()
+        for source, target in queries:
+            outcome = graph.search(source, target, method)
+            expanded += outcome.expanded
+            answers.append(outcome.travel_time)
+        seconds = time.perf_counter() - start
+
+        if reference is None:
+            reference = answers
+        elif any(
+            not math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-12)
+            for expected, actual in zip(reference, answers)
+        ):
+            raise ValueError(f"routing method '{method}' disagrees with '{methods[0]}'")
+        results.append(RoutingBenchmark(method, len(queries), expanded, seconds))
+    return results
+
+
+def _synthetic_grid(width: int, height: int, rng: random.Random) -> CompactRailwayGraph:
+    spacing_km = 25.0
+    names = [f"{column}-{row}" for column in range(width) for row in range(height)]
+    xs = [
+        column * spacing_km + rng.uniform(-5.0, 5.0)
+        for column in range(width)
+        for _ in range(height)
+    ]
+    ys = [row * spacing_km + rng.uniform(-5.0, 5.0) for _ in range(width) for row in range(height)]
+    edges: List[Tuple[int, int, float]] = []
+    max_speed = 350.0
+    for column in range(width):
+        for row in range(height):
+            station = column * height + row
+            neighbours = []
+            if column + 1 < width:
+                neighbours.append(station + height)
+            if row + 1 < height:
+                neighbours.append(station + 1)
+            for neighbour in neighbours:
+                distance = math.hypot(xs[station] - xs[neighbour], ys[station] - ys[neighbour])
+                hours = distance * rng.uniform(1.0, 1.3) / rng.choice((160.0, 250.0, max_speed))
+                edges.append((station, neighbour, hours))
+                edges.append((neighbour, station, hours))
+    return CompactRailwayGraph.from_edges(names, edges, xs, ys, max_speed_kph=max_speed)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare Dijkstra, A* and bidirectional A* on a synthetic rail grid."
+    )
+    parser.add_argument("--width", type=int, default=60, help="Grid columns")
+    parser.add_argument("--height", type=int, default=60, help="Grid rows")
+    parser.add_argument("--queries", type=int, default=200, help="Random point-to-point queries")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    graph = _synthetic_grid(args.width, args.height, rng)
+    queries = [(rng.randrange(len(graph)), rng.randrange(len(graph))) for _ in range(args.queries)]
+    print(f"{len(graph)} stations, {graph.track_count} directed tracks, {len(queries)} queries")
+    print(f"{'method':<14}{'expanded/query':>16}{'ms/query':>12}")
+    for result in benchmark_routing(graph, queries):
+        print(f"{result.method:<14}{result.mean_expanded:>16.1f}{result.mean_milliseconds:>12.3f}")
+
+    start = time.perf_counter()
+    hierarchy = ContractionHierarchy.build(graph)
+    build_seconds = time.perf_counter() - start
+    expanded = 0
+    start = time.perf_counter()
+    for source, target in queries:
+        expanded += hierarchy.search(source, target).expanded
+    query_ms = 1000.0 * (time.perf_counter() - start) / max(len(queries), 1)
+    print(f"{'hierarchy':<14}{expanded / max(len(queries), 1):>16.1f}{query_ms:>12.3f}")
+    print(
+        f"hierarchy built in {build_seconds:.2f} s "
+        f"with {hierarchy.shortcut_count} upward/downward tracks"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""Departure-time aware journey planning with the Connection Scan Algorithm.
+
+:class:`~jb_bootcamp.tamagawa_network.RailwayNetwork` only knows how long a
+track takes to traverse.  A :class:`Timetable` adds the trains that run on
+it: every :class:`Trip` visits a sequence of stations, and the running time
+between consecutive stops is taken from the physical network.  The trips are
+flattened into *connections* (one train moving from one station to the next
+without stopping) and stored in flat arrays sorted by departure time.
+
+Both queries are single linear scans over those arrays.  Earliest-arrival
+queries scan forwards from the requested departure time; profile queries
+scan backwards once and return every Pareto-optimal ``(departure, arrival)``
+pair between two stations.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+import math
+from typing import Dict, Iterable, List, Tuple
+
+from .tamagawa_network import RailwayNetwork
+
+__all__ = [
+    "Trip",
+    "Timetable",
+]
+
+
+@dataclass(frozen=True)
+class Trip:
+    """A train run visiting *stops* in order.
+
+    Parameters
+    ----------
+    trip_id:
+        Unique identifier of the run.
+    stops:
+        Station names in calling order; at least two.
+    departure_hour:
+        Departure time from the first stop, in hours since the start of the
+        service day.  Values past 24 denote runs after midnight.
+    dwell_hours:
+        Time the train waits at every intermediate stop.
+    """
+
+    trip_id: str
+    stops: Tuple[str, ...]
+    departure_hour: float
+    dwell_hours: float = 0.0
+
+    def __post_init__(self) -> None:  # pragma: no cover - simple validation
+        if not self.trip_id:
+            raise ValueError("trips require a non-empty identifier")
+        if len(self.stops) < 2:
+            raise ValueError("trips must call at two or more stops")
+        if self.dwell_hours < 0.0:
+            raise ValueError("dwell time cannot be negative")
+
+
+class Timetable:
+    """Connections of a set of trips over a :class:`RailwayNetwork`.
+
+    Parameters
+    ----------
+    network:
+        Physical network supplying the running time of every leg.  Legs
+        between stops that share a track use the fastest such track; legs
+        that skip stations use the shortest travel time through the network.
+    trips:
+        The train runs to schedule.
+    transfer_hours:
+        Minimum time needed to change trains at a station.
+    """
+
+    def __init__(
+        self,
+        network: RailwayNetwork,
+        trips: Iterable[Trip],
+        *,
+        transfer_hours: float = 0.0,
+    ) -> None:
+        if transfer_hours < 0.0:
+            raise ValueError("transfer_hours cannot be negative")
+        graph = network.compile()
+        self.stations: Tuple[str, ...] = graph.names
+        self.transfer_hours = transfer_hours
+        self.trips: Tuple[Trip, ...] = tuple(trips)
+        if len({trip.trip_id for trip in self.trips}) != len(self.trips):
+            raise ValueError("trip identifiers must be unique")
+
+        legs = [
+            [start, end] for trip in self.trips for start, end in zip(trip.stops, trip.stops[1:])
+        ]
+        running_times = iter(network.itinerary_times(legs))
+        rows: List[Tuple[float, float, int, int, int]] = []
+        for trip_index, trip in enumerate(self.trips):
+            departure = trip.departure_hour
+            for start, end in zip(trip.stops, trip.stops[1:]):
+                arrival = departure + next(running_times)
+                rows.append(
+                    (departure, arrival, graph.station_id(start), graph.station_id(end), trip_index)
+                )
+                departure = arrival + trip.dwell_hours
+        rows.sort()
+
+        self.departures = array("d", (row[0] for row in rows))
+        self.arrivals = array("d", (row[1] for row in rows))
+        self.origins = array("i", (row[2] for row in rows))
+        self.destinations = array("i", (row[3] for row in rows))
+        self.trip_indices = array("i", (row[4] for row in rows))
+        self._index: Dict[str, int] = {name: station for station, name in enumerate(self.stations)}
+
+    def __len__(self) -> int:
+        """Return the number of connections."""
+
+        return len(self.departures)
+
+    def earliest_arrival(self, origin: str, destination: str, departure_hour: float) -> float:
+        """Return the earliest arrival at *destination* leaving *origin* at *departure_hour*.
+
+        ``ValueError`` is raised when no sequence of trains reaches the
+        destination after the requested departure time.
+        """
+
+        source, target = self._station(origin), self._station(destination)
+        if source == target:
+            return departure_hour
+
+        arrival = [math.inf] * len(self.stations)
+        arrival[source] = departure_hour - self.transfer_hours
+        boarded = bytearray(len(self.trips))
+        departures, arrivals = self.departures, self.arrivals
+        origins, destinations, trips = self.origins, self.destinations, self.trip_indices
+        transfer = self.transfer_hours
+
+        for connection in range(bisect_left(departures, departure_hour), len(departures)):
+            leaves = departures[connection]
+            if leaves >= arrival[target]:
+                break
+            trip = trips[connection]
+            if boarded[trip] or arrival[origins[connection]] + transfer <= leaves:
+                boarded[trip] = 1
+                station = destinations[connection]
+                if arrivals[connection] < arrival[station]:
+                    arrival[station] = arrivals[connection]
+
+        if arrival[target] == math.inf:
+            raise ValueError(
+                f"'{destination}' cannot be reached from '{origin}' after {departure_hour}"
+            )
+        return arrival[target]
+
+    def profile(self, origin: str, destination: str) -> List[Tuple[float, float]]:
+        """Return every Pareto-optimal ``(departure, arrival)`` pair.
+
+        Each pair departs *origin* on some train and reaches *destination*
+        as early as possible; no other journey both leaves later and arrives
+        earlier.  Pairs are sorted by departure time.
+        """
+
+        source, target = self._station(origin), self._station(destination)
+        if source == target:
+            return []
+
+        # Per station: departure times (negated, so ascending) and arrival
+        # times of the Pareto front, built from the latest departure down.
+        fronts: List[Tuple[List[float], List[float]]] = [([], []) for _ in self.stations]
+        trip_arrival = [math.inf] * len(self.trips)
+        departures, arrivals = self.departures, self.arrivals
+        origins, destinations, trips = self.origins, self.destinations, self.trip_indices
+        transfer = self.transfer_hours
+
+        for connection in range(len(departures) - 1, -1, -1):
+            station = destinations[connection]
+            trip = trips[connection]
+            best = arrivals[connection] if station == target else math.inf
+            if trip_arrival[trip] < best:
+                best = trip_arrival[trip]
+            negated, reached = fronts[station]
+            position = bisect_right(negated, -(arrivals[connection] + transfer))
+            if position and reached[position - 1] < best:
+                best = reached[position - 1]
+            if best == math.inf:
+                continue
+            trip_arrival[trip] = best
+
+            negated, reached = fronts[origins[connection]]
+            leaves = departures[connection]
+            if reached and best >= reached[-1]:
+                continue
+            if negated and negated[-1] == -leaves:
+                negated.pop()
+                reached.pop()
+            negated.append(-leaves)
+            reached.append(best)
+
+        negated, reached = fronts[source]
+        return [(-leaves, arrives) for leaves, arrives in zip(reversed(negated), reversed(reached))]
+
+    def _station(self, name: str) -> int:
+        try:
+            return self._index[name]
+        except KeyError:
+            raise KeyError(f"unknown station '{name}'") from None
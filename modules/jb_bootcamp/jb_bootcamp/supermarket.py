@@ -2,18 +2,52 @@
 
 from __future__ import annotations
 
+from array import array
+from bisect import bisect_left
 from collections import defaultdict
-from dataclasses import dataclass
-from math import ceil
-from typing import Iterable, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+import csv
+from dataclasses import dataclass, field
+from itertools import accumulate, islice
+import json
+import math
+from math import ceil, isfinite
+import mmap
+from multiprocessing import shared_memory
+import os
+from pathlib import Path
+import random
+import sys
+import time
+from typing import Iterable, Literal, Mapping, Optional, Sequence, Union
+
+from ._csvrows import numbered_rows
+from ._npy import npy_header, read_npy_header
 
 __all__ = [
     "SupermarketProduct",
     "Delivery",
+    "StoreScenario",
+    "ChainHistory",
+    "InventoryHistory",
+    "InventorySummary",
+    "PolicyChoice",
+    "ReorderPolicy",
+    "ServiceLevelQuantiles",
+    "optimise_reorder_policies",
     "plan_restock",
+    "plan_restock_columns",
+    "plan_restock_csv",
+    "simulate_chain",
     "simulate_inventory",
+    "simulate_inventory_events",
+    "simulate_inventory_history",
+    "simulate_service_levels",
 ]
 
+DemandDistribution = Literal["poisson", "negative-binomial"]
+PolicyKind = Literal["sS", "RQ"]
+
 
 @dataclass(frozen=True)
 class SupermarketProduct:
@@ -53,6 +87,181 @@ class Delivery:
             raise ValueError("Deliveries must reference a product name.")
 
 
+@dataclass(frozen=True)
+class InventoryHistory:
+    """End-of-day stock levels as a ``days`` × ``products`` table.
+
+    ``levels`` is a flat row-major ``array('q')``: the stock of product ``p``
+    at the end of day ``d`` is ``levels[d * len(products) + p]``.
+    """
+
+    products: tuple[str, ...]
+    days: int
+    levels: array
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return (self.days, len(self.products))
+
+    def __getitem__(self, key: tuple[int, int]) -> int:
+        day, product = key
+        return self.levels[day * len(self.products) + product]
+
+    def day(self, day: int) -> array:
+        """Return the stock of every product at the end of ``day``."""
+
+        if not 0 <= day < self.days:
+            raise IndexError(f"day {day} is outside the simulated horizon.")
+        width = len(self.products)
+        return self.levels[day * width : (day + 1) * width]
+
+    def product(self, name: str) -> tuple[int, ...]:
+        """Return the daily stock of product ``name``."""
+
+        try:
+            column = self.products.index(name)
+        except ValueError:
+            raise KeyError(f"Unknown product: {name}.") from None
+        return tuple(self.levels[column :: len(self.products)])
+
+    def as_dict(self) -> dict[str, tuple[int, ...]]:
+        """Return the history in the format of :func:`simulate_inventory`."""
+
+        width = len(self.products)
+        return {
+            name: tuple(self.levels[column::width]) for column, name in enumerate(self.products)
+        }
+
+
+@dataclass(frozen=True)
+class StoreScenario:
+    """Inputs of :func:`simulate_inventory` for one store of a chain."""
+
+    name: str
+    initial_stock: Mapping[str, int]
+    deliveries: Sequence[Delivery] = ()
+    demand_pattern: Mapping[str, Sequence[int]] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:  # pragma: no cover - simple validation
+        if not self.name:
+            raise ValueError("Stores require a non-empty name.")
+
+
+class ChainHistory:
+    """Stock levels of every store written by :func:`simulate_chain`.
+
+    The ``.npy`` file holds an ``int64`` array of shape
+    ``(stores, days, products)``; store and product labels live in a JSON
+    file next to it with the suffix ``.labels.json``.  The values are memory
+    mapped, so opening a large chain is cheap and only the stores asked for
+    are read.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        source = Path(path)
+        with open(_chain_labels_path(source), encoding="utf-8") as handle:
+            labels = json.load(handle)
+        self.stores: tuple[str, ...] = tuple(labels["stores"])
+        self.products: tuple[str, ...] = tuple(labels["products"])
+        with open(source, "rb") as handle:
+            descr, shape, offset = read_npy_header(handle)
+            if (
+                descr != "<i8"
+                or len(shape) != 3
+                or shape[0] != len(self.stores)
+                or shape[2] != len(self.products)
+            ):
+                raise ValueError(f"{source} does not hold a chain inventory history.")
+            self.days = shape[1]
+            count = shape[0] * shape[1] * shape[2]
+            if os.fstat(handle.fileno()).st_size - offset != 8 * count:
+                raise ValueError(
+                    f"{source} holds the wrong amount of data for shape {tuple(shape)}."
+                )
+            if count:
+                self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                self._values: Union[memoryview, array] = memoryview(self._map)[offset:].cast("q")
+            else:
+                self._values = array("q")
+
+    def store(self, name: str) -> InventoryHistory:
+        """Return the history of store ``name``."""
+
+        try:
+            position = self.stores.index(name)
+        except ValueError:
+            raise KeyError(f"Unknown store: {name}.") from None
+        size = self.days * len(self.products)
+        levels = array("q", self._values[position * size : (position + 1) * size])
+        if sys.byteorder == "big":  # pragma: no cover - depends on platform
+            levels.byteswap()
+        return InventoryHistory(products=self.products, days=self.days, levels=levels)
+
+
+@dataclass(frozen=True)
+class InventorySummary:
+    """Outcome of simulating one product over the whole horizon.
+
+    ``stockout_days`` counts the days that end with no stock left and
+    ``first_stockout_day`` is the first of them, or ``None``.
+    """
+
+    final_stock: int
+    units_sold: int
+    unmet_demand: int
+    stockout_days: int
+    first_stockout_day: int | None
+
+
+@dataclass(frozen=True)
+class ServiceLevelQuantiles:
+    """Quantiles of one product's service levels across Monte Carlo runs.
+
+    ``fill_rate`` holds the share of demand served and
+    ``stockout_probability`` the share of days with unmet demand, each
+    evaluated at the requested ``quantiles``.
+    """
+
+    quantiles: tuple[float, ...]
+    fill_rate: tuple[float, ...]
+    stockout_probability: tuple[float, ...]
+
+
+@dataclass(frozen=True)
+class ReorderPolicy:
+    """Inventory policy reviewed at the end of every day.
+
+    With ``kind="sS"`` an order raising the inventory position (stock on
+    hand plus stock on order) to ``level`` is placed whenever the position
+    is at or below ``reorder_point``.  With ``kind="RQ"`` batches of
+    ``level`` units are ordered until the position exceeds
+    ``reorder_point``.
+    """
+
+    kind: PolicyKind
+    reorder_point: int
+    level: int
+
+    def __post_init__(self) -> None:  # pragma: no cover - simple validation
+        if self.kind not in ("sS", "RQ"):
+            raise ValueError(f"Unknown policy kind: {self.kind}.")
+        if self.reorder_point < 0:
+            raise ValueError("reorder_point cannot be negative.")
+        if self.kind == "sS" and self.level <= self.reorder_point:
+            raise ValueError("The order-up-to level must exceed the reorder point.")
+        if self.kind == "RQ" and self.level <= 0:
+            raise ValueError("The batch size must be positive.")
+
+
+@dataclass(frozen=True)
+class PolicyChoice:
+    """Cheapest policy found for one product and its average daily cost."""
+
+    policy: ReorderPolicy
+    daily_cost: float
+    candidates_evaluated: int
+
+
 def plan_restock(
     products: Sequence[SupermarketProduct],
     current_stock: Mapping[str, int],
@@ -62,18 +271,151 @@ def plan_restock(
 ) -> dict[str, int]:
     """Return purchase quantities needed to stay in stock."""
 
+    quantities = plan_restock_columns(
+        [product.daily_demand for product in products],
+        [product.safety_stock for product in products],
+        [current_stock.get(product.name, 0) for product in products],
+        lead_time_days=lead_time_days,
+        planning_days=planning_days,
+    )
+    return {product.name: quantity for product, quantity in zip(products, quantities)}
+
+
+def plan_restock_columns(
+    daily_demand: Sequence[float],
+    safety_stock: Sequence[int],
+    current_stock: Sequence[int],
+    *,
+    lead_time_days: int,
+    planning_days: int,
+) -> array:
+    """Column-wise :func:`plan_restock` for catalogues held as arrays.
+
+    The three sequences hold one entry per product, for example ``array``
+    columns or NumPy arrays.  They are checked as whole columns instead of
+    building a :class:`SupermarketProduct` per row, and the quantities are
+    returned as an ``array('q')`` in the same order.
+    """
+
     if lead_time_days < 0:
         raise ValueError("lead_time_days must be non-negative.")
     if planning_days <= 0:
         raise ValueError("planning_days must be positive.")
+    if not len(daily_demand) == len(safety_stock) == len(current_stock):
+        raise ValueError("All columns must hold one entry per product.")
+    if not all(map(isfinite, daily_demand)):
+        raise ValueError("daily_demand must be finite.")
+    if len(daily_demand) and min(daily_demand) <= 0:
+        raise ValueError("daily_demand must be positive.")
+    if len(safety_stock) and min(safety_stock) < 0:
+        raise ValueError("safety_stock cannot be negative.")
 
     window = lead_time_days + planning_days
-    restock: dict[str, int] = {}
-    for product in products:
-        projected_need = ceil(product.daily_demand * window) + product.safety_stock
-        available = max(0, int(current_stock.get(product.name, 0)))
-        restock[product.name] = max(0, projected_need - available)
-    return restock
+    return array(
+        "q",
+        (
+            max(0, ceil(demand * window) + int(safety) - max(0, int(stock)))
+            for demand, safety, stock in zip(daily_demand, safety_stock, current_stock)
+        ),
+    )
+
+
+def plan_restock_csv(
+    source: Union[str, Path],
+    target: Union[str, Path],
+    *,
+    lead_time_days: int,
+    planning_days: int,
+    chunk_size: int = 65536,
+) -> int:
+    """Stream restock quantities for a catalogue stored as CSV.
+
+    ``source`` needs a header row naming the columns ``name`` and
+    ``daily_demand`` and optionally ``safety_stock`` and ``current_stock``
+    (missing columns and empty fields count as 0); blank rows are skipped.
+    Rows are processed ``chunk_size`` at a time with
+    :func:`plan_restock_columns`, and ``name,restock`` rows are written to
+    ``target`` as each chunk completes, so catalogues larger than memory can
+    be planned.  Returns the number of products written.  Errors name the
+    first offending line.
+    """
+
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive.")
+    written = 0
+    with open(source, newline="", encoding="utf-8") as infile, open(
+        target, "w", newline="", encoding="utf-8"
+    ) as outfile:
+        reader = csv.reader(infile)
+        writer = csv.writer(outfile)
+        header = [field.strip() for field in next(reader, [])]
+        for required in ("name", "daily_demand"):
+            if required not in header:
+                raise ValueError(f"{source}: missing column {required!r}.")
+        positions = [
+            header.index(column) if column in header else None
+            for column in ("name", "daily_demand", "safety_stock", "current_stock")
+        ]
+        writer.writerow(["name", "restock"])
+        numbered = numbered_rows(reader)
+        while True:
+            batch = list(islice(numbered, chunk_size))
+            if not batch:
+                break
+            lines = [line for line, _ in batch]
+            rows = [row for _, row in batch]
+            try:
+                names, demand, safety, stock = (
+                    [row[position].strip() for row in rows]
+                    if position is not None
+                    else ["0"] * len(rows)
+                    for position in positions
+                )
+            except IndexError:
+                short = next(i for i, row in enumerate(rows) if len(row) < len(header))
+                raise ValueError(f"{source}:{lines[short]}: too few fields.") from None
+            demand = _parse_column(demand, float, source, lines, "daily_demand")
+            safety = _parse_column(
+                [value or "0" for value in safety], int, source, lines, "safety_stock"
+            )
+            stock = _parse_column(
+                [value or "0" for value in stock], int, source, lines, "current_stock"
+            )
+            for offset, (value, reserve) in enumerate(zip(demand, safety)):
+                if value <= 0:
+                    raise ValueError(f"{source}:{lines[offset]}: daily_demand must be positive.")
+                if reserve < 0:
+                    raise ValueError(f"{source}:{lines[offset]}: safety_stock cannot be negative.")
+            quantities = plan_restock_columns(
+                demand,
+                safety,
+                stock,
+                lead_time_days=lead_time_days,
+                planning_days=planning_days,
+            )
+            writer.writerows(zip(names, quantities))
+            written += len(rows)
+    return written
+
+
+def _parse_column(
+    values: list[str], kind: type, source: Union[str, Path], lines: Sequence[int], column: str
+) -> list:
+    try:
+        parsed = list(map(kind, values))
+    except ValueError:
+        for offset, value in enumerate(values):
+            try:
+                kind(value)
+            except ValueError:
+                raise ValueError(
+                    f"{source}:{lines[offset]}: {column} is not a number: {value!r}"
+                ) from None
+        raise
+    if kind is float and not all(map(isfinite, parsed)):
+        offset = next(i for i, value in enumerate(parsed) if not isfinite(value))
+        raise ValueError(f"{source}:{lines[offset]}: {column} is not finite: {values[offset]!r}")
+    return parsed
 
 
 def simulate_inventory(
@@ -86,6 +428,70 @@ def simulate_inventory(
 ) -> dict[str, tuple[int, ...]]:
     """Simulate day-by-day inventory for ``days`` days."""
 
+    return simulate_inventory_history(
+        products, initial_stock, deliveries, demand_pattern, days=days
+    ).as_dict()
+
+
+def simulate_inventory_history(
+    products: Sequence[SupermarketProduct],
+    initial_stock: Mapping[str, int],
+    deliveries: Sequence[Delivery],
+    demand_pattern: Mapping[str, Sequence[int]],
+    *,
+    days: int,
+) -> InventoryHistory:
+    """Simulate inventory like :func:`simulate_inventory` into a 2D table.
+
+    Each day deliveries arrive first and then as much of the day's demand
+    as possible is sold, so the stock follows
+    ``stock = max(0, stock + delivered - demand)``.  Rather than stepping
+    through every day and product, the demand pattern of each product is
+    tiled over the horizon once, the sparse deliveries are added to it, and
+    the recursion runs as a single :func:`itertools.accumulate` over that
+    net-change column.
+    """
+
+    if days <= 0:
+        raise ValueError("days must be positive.")
+
+    product_names = [product.name for product in products]
+    _check_unique(product_names)
+    name_set = set(product_names)
+    patterns = _normalise_patterns(demand_pattern, name_set)
+    arrivals = _deliveries_by_product(deliveries, name_set, days)
+
+    width = len(product_names)
+    levels = array("q", bytes(8 * width * days))
+    for column, name in enumerate(product_names):
+        net = _tiled_demand(patterns.get(name, ()), days, negate=True)
+        for day, quantity in arrivals.get(name, {}).items():
+            net[day] += quantity
+        start = max(0, int(initial_stock.get(name, 0)))
+        trajectory = accumulate(net, _restocked_level, initial=start)
+        levels[column::width] = array("q", islice(trajectory, 1, None))
+
+    return InventoryHistory(products=tuple(product_names), days=days, levels=levels)
+
+
+def simulate_inventory_events(
+    products: Sequence[SupermarketProduct],
+    initial_stock: Mapping[str, int],
+    deliveries: Sequence[Delivery],
+    demand_pattern: Mapping[str, Sequence[int]],
+    *,
+    days: int,
+) -> dict[str, InventorySummary]:
+    """Summarise the inventory of :func:`simulate_inventory` without daily steps.
+
+    Between two deliveries the stock of a product only falls, and it does
+    so by the cumulative demand of its cyclic pattern, which prefix sums of
+    the pattern give in closed form.  The simulation therefore jumps from
+    delivery to delivery and finds the day the stock runs out by bisecting
+    the prefix sums, so it costs O(deliveries × log(pattern length)) per
+    product independently of ``days``.
+    """
+
     if days <= 0:
         raise ValueError("days must be positive.")
 
@@ -93,22 +499,587 @@ def simulate_inventory(
     _check_unique(product_names)
     name_set = set(product_names)
     patterns = _normalise_patterns(demand_pattern, name_set)
-    schedule = _build_schedule(deliveries, name_set)
+    arrivals = _deliveries_by_product(deliveries, name_set, days)
+
+    summaries: dict[str, InventorySummary] = {}
+    for name in product_names:
+        demand = _CumulativeDemand(patterns.get(name, ()))
+        stock = max(0, int(initial_stock.get(name, 0)))
+        delivered = 0
+        stockout_days = 0
+        first_stockout = None
+        schedule = sorted(arrivals.get(name, {}).items())
+        starts = [0] + [day for day, _ in schedule if day > 0]
+        quantities = dict(schedule)
+        ends = starts[1:] + [days]
+        for start, end in zip(starts, ends):
+            arriving = quantities.get(start, 0)
+            stock += arriving
+            delivered += arriving
+            empty = demand.exhausted_on(start, stock)
+            if empty < end:
+                stockout_days += end - empty
+                if first_stockout is None:
+                    first_stockout = empty
+            stock = max(0, stock - demand.between(start, end))
+
+        initial = max(0, int(initial_stock.get(name, 0)))
+        sold = initial + delivered - stock
+        summaries[name] = InventorySummary(
+            final_stock=stock,
+            units_sold=sold,
+            unmet_demand=demand.between(0, days) - sold,
+            stockout_days=stockout_days,
+            first_stockout_day=first_stockout,
+        )
+    return summaries
+
 
-    inventory = {name: max(0, int(initial_stock.get(name, 0))) for name in name_set}
-    history: dict[str, list[int]] = {name: [] for name in name_set}
+class _CumulativeDemand:
+    """Closed-form cumulative demand of a cyclic pattern."""
 
-    for day in range(days):
-        for arrival in schedule.get(day, ()):  # pragma: no branch - depends on data
-            inventory[arrival.product_name] += arrival.quantity
+    def __init__(self, pattern: Sequence[int]) -> None:
+        self.prefix = list(accumulate(pattern, initial=0))
+        self.length = max(1, len(pattern))
+        self.cycle = self.prefix[-1]
 
-        for name in name_set:
-            demand = _demand_for_day(patterns.get(name, ()), day)
-            sold = min(inventory[name], demand)
-            inventory[name] -= sold
-            history[name].append(inventory[name])
+    def until(self, day: int) -> int:
+        """Demand of days ``0`` to ``day - 1``."""
 
-    return {name: tuple(values) for name, values in history.items()}
+        cycles, offset = divmod(day, self.length)
+        return cycles * self.cycle + self.prefix[offset]
+
+    def between(self, start: int, end: int) -> int:
+        return self.until(end) - self.until(start)
+
+    def exhausted_on(self, start: int, stock: int) -> int:
+        """First day from ``start`` on that ends with ``stock`` used up."""
+
+        if stock <= 0:
+            return start
+        if self.cycle == 0:
+            return _NEVER
+        target = self.until(start) + stock
+        cycles = -(-target // self.cycle) - 1
+        offset = bisect_left(self.prefix, target - cycles * self.cycle)
+        return max(start, cycles * self.length + offset - 1)
+
+
+# Larger than any horizon: the stock of a product without demand never runs out.
+_NEVER = 2**63
+
+
+def simulate_service_levels(
+    products: Sequence[SupermarketProduct],
+    initial_stock: Mapping[str, int],
+    deliveries: Sequence[Delivery],
+    *,
+    days: int,
+    replications: int = 1000,
+    distribution: DemandDistribution = "poisson",
+    dispersion: Optional[float] = None,
+    quantiles: Sequence[float] = (0.05, 0.5, 0.95),
+    seed: int = 0,
+    processes: Optional[int] = None,
+) -> dict[str, ServiceLevelQuantiles]:
+    """Estimate stock-out risk under random daily demand.
+
+    Parameters
+    ----------
+    products, initial_stock, deliveries, days:
+        As for :func:`simulate_inventory`.
+    replications:
+        Number of independent Monte Carlo runs.
+    distribution:
+        ``"poisson"`` draws each day's demand with mean ``daily_demand``;
+        ``"negative-binomial"`` adds overdispersion, with variance
+        ``mean + mean**2 / dispersion``.
+    dispersion:
+        Shape of the negative binomial; required for that distribution.
+    quantiles:
+        Probabilities at which the fill rate and stock-out probability are
+        reported, using linear interpolation between runs.
+    seed:
+        Run ``i`` draws from its own generator seeded with ``(seed, i)``, so
+        results do not depend on the number of processes.
+    processes:
+        Worker processes sharing the runs.  ``None`` uses every CPU; ``1``
+        simulates in-process.
+
+    Only two numbers per product and run are kept, never the daily stock.
+    """
+
+    if days <= 0:
+        raise ValueError("days must be positive.")
+    if replications <= 0:
+        raise ValueError("replications must be positive.")
+    if distribution == "negative-binomial":
+        if dispersion is None or dispersion <= 0:
+            raise ValueError("negative-binomial demand needs a positive dispersion.")
+    elif distribution != "poisson":
+        raise ValueError(f"Unknown demand distribution: {distribution}.")
+    if any(not 0.0 <= q <= 1.0 for q in quantiles):
+        raise ValueError("quantiles must lie within [0, 1].")
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes < 1:
+        raise ValueError("processes must be at least 1.")
+
+    product_names = [product.name for product in products]
+    _check_unique(product_names)
+    arrivals = _deliveries_by_product(deliveries, set(product_names), days)
+    model = _DemandModel(
+        days=days,
+        means=tuple(product.daily_demand for product in products),
+        initial=tuple(max(0, int(initial_stock.get(name, 0))) for name in product_names),
+        arrivals=tuple(arrivals.get(name, {}) for name in product_names),
+        dispersion=dispersion if distribution == "negative-binomial" else None,
+        seed=seed,
+    )
+
+    runs: list[tuple[array, array]] = []
+    if processes == 1 or replications == 1:
+        runs = [model.replicate(run) for run in range(replications)]
+    else:
+        chunk = max(1, replications // (processes * 4))
+        batches = [
+            range(start, min(start + chunk, replications))
+            for start in range(0, replications, chunk)
+        ]
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_set_worker_model,
+            initargs=(model,),
+        ) as pool:
+            for batch in pool.map(_worker_replicate, batches):
+                runs.extend(batch)
+
+    levels = tuple(quantiles)
+    results: dict[str, ServiceLevelQuantiles] = {}
+    for column, name in enumerate(product_names):
+        fill = sorted(run[0][column] for run in runs)
+        risk = sorted(run[1][column] for run in runs)
+        results[name] = ServiceLevelQuantiles(
+            quantiles=levels,
+            fill_rate=tuple(_quantile(fill, q) for q in levels),
+            stockout_probability=tuple(_quantile(risk, q) for q in levels),
+        )
+    return results
+
+
+def optimise_reorder_policies(
+    products: Sequence[SupermarketProduct],
+    current_stock: Mapping[str, int],
+    *,
+    lead_time_days: int,
+    days: int = 182,
+    demand_pattern: Optional[Mapping[str, Sequence[int]]] = None,
+    kinds: Sequence[PolicyKind] = ("sS", "RQ"),
+    holding_cost: float = 0.1,
+    shortage_cost: float = 5.0,
+    order_cost: float = 20.0,
+    refinement_rounds: int = 3,
+    time_budget: Optional[float] = None,
+) -> dict[str, PolicyChoice]:
+    """Search reorder policies per product and keep the cheapest.
+
+    Parameters
+    ----------
+    products, current_stock:
+        As for :func:`plan_restock`.
+    lead_time_days:
+        Days between placing an order at the end of a day and its arrival;
+        an order placed on day ``t`` can be sold from day
+        ``t + lead_time_days + 1``.
+    days:
+        Length of the simulated horizon.
+    demand_pattern:
+        Optional cyclic demand per product, as for
+        :func:`simulate_inventory`.  Other products see a deterministic
+        series averaging ``daily_demand``.
+    kinds:
+        Policy families to search.
+    holding_cost, shortage_cost, order_cost:
+        Cost per unit left at the end of a day, per unit of lost sales and
+        per order placed.
+    refinement_rounds:
+        Rounds of local search around the best grid candidate, halving the
+        step each round.
+    time_budget:
+        Seconds to spend.  Every product first gets the policy implied by
+        :func:`plan_restock` with a one-week planning window; grid search
+        and refinement then proceed product by product until the budget is
+        spent, so large catalogues always receive an answer.
+
+    All candidates for a product are simulated together in one pass over
+    its demand series.
+    """
+
+    if lead_time_days < 0:
+        raise ValueError("lead_time_days must be non-negative.")
+    if days <= 0:
+        raise ValueError("days must be positive.")
+    if min(holding_cost, shortage_cost, order_cost) < 0:
+        raise ValueError("Costs cannot be negative.")
+    if not kinds or any(kind not in ("sS", "RQ") for kind in kinds):
+        raise ValueError("kinds must name at least one of 'sS' and 'RQ'.")
+
+    product_names = [product.name for product in products]
+    _check_unique(product_names)
+    patterns = _normalise_patterns(demand_pattern or {}, set(product_names))
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    costs = (holding_cost, shortage_cost, order_cost)
+
+    def expired() -> bool:
+        return deadline is not None and time.perf_counter() >= deadline
+
+    searches = []
+    for product in products:
+        pattern = patterns.get(product.name)
+        if pattern:
+            demand = _tiled_demand(pattern, days)
+        else:
+            demand = _steady_demand(product.daily_demand, days)
+        search = _PolicySearch(
+            demand=demand,
+            initial=max(0, int(current_stock.get(product.name, 0))),
+            lead=lead_time_days,
+            costs=costs,
+        )
+        reorder_point = ceil(product.daily_demand * lead_time_days) + product.safety_stock
+        target = ceil(product.daily_demand * (lead_time_days + 7)) + product.safety_stock
+        search.evaluate([ReorderPolicy("sS", reorder_point, max(target, reorder_point + 1))])
+        searches.append((product, search))
+
+    for product, search in searches:
+        if expired():
+            break
+        search.evaluate(_policy_grid(product, lead_time_days, kinds))
+    for round_index in range(refinement_rounds):
+        for product, search in searches:
+            if expired():
+                break
+            step = max(1, round(product.daily_demand * 4) >> round_index)
+            search.evaluate(_neighbours(search.best, step))
+
+    return {
+        product.name: PolicyChoice(search.best, search.best_cost / days, search.evaluated)
+        for product, search in searches
+    }
+
+
+class _PolicySearch:
+    """Best policy so far for one product, with a batched cost kernel."""
+
+    def __init__(self, demand: Sequence[int], initial: int, lead: int, costs: tuple) -> None:
+        self.demand = demand
+        self.initial = initial
+        self.lead = lead
+        self.costs = costs
+        self.seen: set[ReorderPolicy] = set()
+        self.best: ReorderPolicy
+        self.best_cost = math.inf
+        self.evaluated = 0
+
+    def evaluate(self, policies: Iterable[ReorderPolicy]) -> None:
+        fresh = [policy for policy in dict.fromkeys(policies) if policy not in self.seen]
+        if not fresh:
+            return
+        self.seen.update(fresh)
+        self.evaluated += len(fresh)
+        for policy, cost in zip(fresh, self._costs(fresh)):
+            if cost < self.best_cost:
+                self.best, self.best_cost = policy, cost
+
+    def _costs(self, policies: Sequence[ReorderPolicy]) -> list[float]:
+        # One pass over the demand series advances every candidate; each
+        # candidate keeps its stock, inventory position and a ring buffer
+        # of orders due over the next lead + 1 days.
+        holding, shortage, ordering = self.costs
+        slots = self.lead + 1
+        count = len(policies)
+        up_to = [policy.kind == "sS" for policy in policies]
+        points = [policy.reorder_point for policy in policies]
+        levels = [policy.level for policy in policies]
+        stock = [self.initial] * count
+        position = [self.initial] * count
+        pipeline = [[0] * slots for _ in range(count)]
+        totals = [0.0] * count
+        for day, demand in enumerate(self.demand):
+            slot = day % slots
+            for c in range(count):
+                due = pipeline[c]
+                on_hand = stock[c] + due[slot]
+                due[slot] = 0
+                if demand < on_hand:
+                    on_hand -= demand
+                    position[c] -= demand
+                    cost = holding * on_hand
+                else:
+                    position[c] -= on_hand
+                    cost = shortage * (demand - on_hand)
+                    on_hand = 0
+                if position[c] <= points[c]:
+                    if up_to[c]:
+                        quantity = levels[c] - position[c]
+                    else:
+                        quantity = levels[c] * ((points[c] - position[c]) // levels[c] + 1)
+                    position[c] += quantity
+                    due[slot] = quantity
+                    cost += ordering
+                stock[c] = on_hand
+                totals[c] += cost
+        return totals
+
+
+def _steady_demand(mean: float, days: int) -> list[int]:
+    # Integer demand whose running total tracks mean * day as closely as possible.
+    return [math.floor((day + 1) * mean) - math.floor(day * mean) for day in range(days)]
+
+
+def _policy_grid(
+    product: SupermarketProduct, lead: int, kinds: Sequence[PolicyKind]
+) -> list[ReorderPolicy]:
+    lead_demand = product.daily_demand * (lead + 1)
+    points = sorted(
+        {
+            max(0, round(lead_demand * f)) + product.safety_stock
+            for f in (0.5, 0.75, 1.0, 1.25, 1.5, 2.0)
+        }
+    )
+    spans = sorted({max(1, round(product.daily_demand * c)) for c in (1, 3, 7, 14, 28)})
+    grid = []
+    for kind in kinds:
+        for point in points:
+            for span in spans:
+                grid.append(ReorderPolicy(kind, point, point + span if kind == "sS" else span))
+    return grid
+
+
+def _neighbours(policy: ReorderPolicy, step: int) -> list[ReorderPolicy]:
+    candidates = []
+    for dp in (-step, 0, step):
+        for dl in (-step, 0, step):
+            point, level = policy.reorder_point + dp, policy.level + dl
+            if point < 0 or (level <= point if policy.kind == "sS" else level <= 0):
+                continue
+            candidates.append(ReorderPolicy(policy.kind, point, level))
+    return candidates
+
+
+def simulate_chain(
+    products: Sequence[SupermarketProduct],
+    stores: Sequence[StoreScenario],
+    *,
+    days: int,
+    output: Union[str, Path],
+    processes: Optional[int] = None,
+) -> ChainHistory:
+    """Simulate every store of a chain and write the results to ``output``.
+
+    Parameters
+    ----------
+    products:
+        Catalogue shared by all stores.  It is published once in a
+        :class:`multiprocessing.shared_memory.SharedMemory` block that every
+        worker decodes at start-up instead of receiving it with each task.
+    stores:
+        One :class:`StoreScenario` per store; names must be unique.
+    days:
+        Length of the simulated horizon.
+    output:
+        Path of the ``.npy`` file to write; see :class:`ChainHistory`.
+    processes:
+        Worker processes simulating stores.  ``None`` uses every CPU; ``1``
+        simulates in-process.
+
+    Stores are simulated with :func:`simulate_inventory_history` and each
+    result is appended to ``output`` as soon as it arrives, in store order,
+    so memory use does not grow with the number of stores.
+    """
+
+    if days <= 0:
+        raise ValueError("days must be positive.")
+    _check_unique(product.name for product in products)
+    store_names = [store.name for store in stores]
+    if len(set(store_names)) != len(store_names):
+        raise ValueError("Store names must be unique.")
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes < 1:
+        raise ValueError("processes must be at least 1.")
+
+    target = Path(output)
+    with open(_chain_labels_path(target), "w", encoding="utf-8") as handle:
+        json.dump(
+            {"stores": store_names, "products": [product.name for product in products]},
+            handle,
+            ensure_ascii=False,
+        )
+    with open(target, "wb") as handle:
+        handle.write(npy_header("<i8", (len(stores), days, len(products))))
+        if processes == 1 or len(stores) < 2:
+            for store in stores:
+                handle.write(_simulate_store(products, store, days))
+        else:
+            catalogue = _encode_catalogue(products)
+            block = shared_memory.SharedMemory(create=True, size=max(1, len(catalogue)))
+            try:
+                block.buf[: len(catalogue)] = catalogue
+                chunk = max(1, len(stores) // (processes * 4))
+                with ProcessPoolExecutor(
+                    max_workers=processes,
+                    initializer=_attach_catalogue,
+                    initargs=(block.name, len(catalogue)),
+                ) as pool:
+                    for levels in pool.map(
+                        _worker_store, stores, [days] * len(stores), chunksize=chunk
+                    ):
+                        handle.write(levels)
+            finally:
+                block.close()
+                block.unlink()
+    return ChainHistory(target)
+
+
+def _chain_labels_path(path: Path) -> Path:
+    return path.with_suffix(".labels.json")
+
+
+def _simulate_store(
+    products: Sequence[SupermarketProduct], store: StoreScenario, days: int
+) -> bytes:
+    history = simulate_inventory_history(
+        products, store.initial_stock, store.deliveries, store.demand_pattern, days=days
+    )
+    levels = history.levels
+    if sys.byteorder == "big":  # pragma: no cover - depends on platform
+        levels = array("q", levels)
+        levels.byteswap()
+    return levels.tobytes()
+
+
+def _encode_catalogue(products: Sequence[SupermarketProduct]) -> bytes:
+    rows = [
+        [
+            product.name,
+            product.category,
+            product.daily_demand,
+            product.safety_stock,
+            product.storage,
+        ]
+        for product in products
+    ]
+    return json.dumps(rows, ensure_ascii=False).encode("utf-8")
+
+
+_worker_catalogue: Optional[tuple[SupermarketProduct, ...]] = None
+
+
+def _attach_catalogue(block_name: str, size: int) -> None:
+    global _worker_catalogue
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        rows = json.loads(bytes(block.buf[:size]).decode("utf-8"))
+    finally:
+        block.close()
+    _worker_catalogue = tuple(SupermarketProduct(*row) for row in rows)
+
+
+def _worker_store(store: StoreScenario, days: int) -> bytes:
+    assert _worker_catalogue is not None
+    return _simulate_store(_worker_catalogue, store, days)
+
+
+@dataclass(frozen=True)
+class _DemandModel:
+    days: int
+    means: tuple[float, ...]
+    initial: tuple[int, ...]
+    arrivals: tuple[dict[int, int], ...]
+    dispersion: Optional[float]
+    seed: int
+
+    def replicate(self, run: int) -> tuple[array, array]:
+        """Return the fill rate and share of stock-out days of every product."""
+
+        rng = random.Random(f"{self.seed}:{run}")
+        dispersion = self.dispersion
+        fill_rates = array("d")
+        stockouts = array("d")
+        for mean, stock, arrivals in zip(self.means, self.initial, self.arrivals):
+            demanded = sold = short_days = 0
+            for day in range(self.days):
+                stock += arrivals.get(day, 0)
+                if dispersion is None:
+                    rate = mean
+                else:
+                    rate = rng.gammavariate(dispersion, mean / dispersion)
+                demand = _poisson(rng, rate)
+                demanded += demand
+                if demand > stock:
+                    short_days += 1
+                    sold += stock
+                    stock = 0
+                else:
+                    sold += demand
+                    stock -= demand
+            fill_rates.append(sold / demanded if demanded else 1.0)
+            stockouts.append(short_days / self.days)
+        return fill_rates, stockouts
+
+
+_worker_model: Optional[_DemandModel] = None
+
+
+def _set_worker_model(model: _DemandModel) -> None:
+    global _worker_model
+    _worker_model = model
+
+
+def _worker_replicate(runs: range) -> list[tuple[array, array]]:
+    assert _worker_model is not None
+    return [_worker_model.replicate(run) for run in runs]
+
+
+def _poisson(rng: random.Random, mean: float) -> int:
+    """Draw a Poisson variate: multiplication method for small means,
+    Hörmann's transformed rejection (PTRS) otherwise."""
+
+    if mean < 10.0:
+        limit = math.exp(-mean)
+        count = 0
+        product = rng.random()
+        while product > limit:
+            product *= rng.random()
+            count += 1
+        return count
+
+    log_mean = math.log(mean)
+    b = 0.931 + 2.53 * math.sqrt(mean)
+    a = -0.059 + 0.02483 * b
+    inverse_alpha = 1.1239 + 1.1328 / (b - 3.4)
+    v_r = 0.9277 - 3.6224 / (b - 2.0)
+    while True:
+        u = rng.random() - 0.5
+        v = rng.random()
+        us = 0.5 - abs(u)
+        k = math.floor((2.0 * a / us + b) * u + mean + 0.43)
+        if us >= 0.07 and v <= v_r:
+            return k
+        if k < 0 or (us < 0.013 and v > us):
+            continue
+        if math.log(v) + math.log(inverse_alpha) - math.log(a / (us * us) + b) <= (
+            -mean + k * log_mean - math.lgamma(k + 1)
+        ):
+            return k
+
+
+def _quantile(ordered: Sequence[float], q: float) -> float:
+    position = q * (len(ordered) - 1)
+    below = math.floor(position)
+    above = min(below + 1, len(ordered) - 1)
+    return ordered[below] + (ordered[above] - ordered[below]) * (position - below)
 
 
 def _check_unique(names: Iterable[str]) -> None:
@@ -137,20 +1108,31 @@ def _normalise_patterns(
     return patterns
 
 
-def _build_schedule(
+def _deliveries_by_product(
     deliveries: Sequence[Delivery],
     products: set[str],
-) -> dict[int, tuple[Delivery, ...]]:
-    schedule: dict[int, list[Delivery]] = defaultdict(list)
+    days: int,
+) -> dict[str, dict[int, int]]:
+    # Sparse day x product delivery matrix, stored per product.
+    arrivals: dict[str, dict[int, int]] = defaultdict(dict)
     for delivery in deliveries:
         if delivery.product_name not in products:
             raise KeyError(f"Unknown product in delivery schedule: {delivery.product_name}.")
-        schedule[delivery.day].append(delivery)
-    return {day: tuple(entries) for day, entries in schedule.items()}
+        if delivery.day < days:
+            column = arrivals[delivery.product_name]
+            column[delivery.day] = column.get(delivery.day, 0) + delivery.quantity
+    return arrivals
 
 
-def _demand_for_day(pattern: Sequence[int], day: int) -> int:
+def _tiled_demand(pattern: Sequence[int], days: int, *, negate: bool = False) -> list[int]:
     if not pattern:
-        return 0
-    return pattern[day % len(pattern)]
+        return [0] * days
+    values = [-value for value in pattern] if negate else list(pattern)
+    repeats, remainder = divmod(days, len(values))
+    return values * repeats + values[:remainder]
+
+
+def _restocked_level(stock: int, change: int) -> int:
+    stock += change
+    return stock if stock > 0 else 0
 
@@ -12,25 +12,41 @@ the covariance matrix and to compute the closed-form eigen-decomposition of a
 2x2 symmetric matrix.  The resulting axes describe how symmetric the
 landscape is in the complex plane and yield a natural, low-dimensional summary
 of its structure.
+
+The same analysis generalises to points in any number of dimensions.
+:func:`analyze_point_symmetry` diagonalises the ``d x d`` covariance matrix
+with cyclic Jacobi rotations and additionally reports the radius of
+gyration, which makes it suitable for protein coordinates read with
+:mod:`jb_bootcamp.pdb_atoms`.
 """
 
 from __future__ import annotations
 
 import math
+from array import array
 from dataclasses import dataclass
-from typing import Iterable, List, Sequence, Tuple
+from pathlib import Path
+import random
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
 
 from .folding_energy import imaginary_potential_barriers
+from .pdb_atoms import read_pdb_atoms
 
 Point = Tuple[float, float]
+Vector = Tuple[float, ...]
 
 
 @dataclass(frozen=True)
 class PrincipalAxis:
-    """Description of a principal axis in the complex plane."""
+    """Description of a principal axis.
+
+    For complex sequences the direction is a unit vector in the complex
+    plane; for :func:`analyze_point_symmetry` it has one component per
+    dimension of the input points.
+    """
 
     eigenvalue: float
-    direction: Point
+    direction: Vector
 
 
 @dataclass(frozen=True)
@@ -171,6 +187,99 @@ def analyze_fly_landscape(
     return analyze_complex_symmetry(barriers)
 
 
+@dataclass(frozen=True)
+class RollingSymmetry:
+    """Leading-axis angle and axis ratio for every window of a sequence.
+
+    ``angles[i]`` and ``axis_ratios[i]`` describe the window that starts at
+    index ``i``.  Angles are in radians within ``(-pi/2, pi/2]`` and follow
+    the sign convention of :class:`PrincipalAxis` directions.
+    """
+
+    window: int
+    angles: array
+    axis_ratios: array
+
+    def __len__(self) -> int:
+        return len(self.angles)
+
+
+def rolling_complex_symmetry(sequence: Sequence[complex], window: int) -> RollingSymmetry:
+    """Track how the principal axes drift across sliding windows.
+
+    The covariance of each window is maintained with Welford-style updates:
+    the point entering the window is added and the point leaving it is
+    removed in constant time, so the whole sweep costs ``O(n)`` instead of
+    the ``O(n * window)`` needed to call :func:`analyze_complex_symmetry`
+    on every window.  To stop rounding errors from accumulating across long
+    sequences the sums are rebuilt from scratch once every *window* steps,
+    which keeps the amortised cost per step constant.
+
+    Parameters
+    ----------
+    sequence:
+        Complex numbers treated as points in the plane.
+    window:
+        Number of consecutive points per window; at least two and no longer
+        than *sequence*.
+    """
+
+    if window < 2:
+        raise ValueError("window must contain at least two points.")
+    if window > len(sequence):
+        raise ValueError("window cannot be longer than the sequence.")
+
+    angles = array("d")
+    ratios = array("d")
+    scale = 1.0 / (window - 1)
+
+    def rebuild(start: int) -> Tuple[float, float, float, float, float]:
+        mx, my = _mean([(z.real, z.imag) for z in sequence[start : start + window]])
+        sxx = sxy = syy = 0.0
+        for z in sequence[start : start + window]:
+            dx = z.real - mx
+            dy = z.imag - my
+            sxx += dx * dx
+            sxy += dx * dy
+            syy += dy * dy
+        return mx, my, sxx, sxy, syy
+
+    mean_x, mean_y, sum_xx, sum_xy, sum_yy = rebuild(0)
+
+    def emit() -> None:
+        axes = _principal_axes_from_covariance(sum_xx * scale, sum_xy * scale, sum_yy * scale)
+        lx, ly = axes[0].direction
+        angles.append(math.atan2(ly, lx))
+        ratios.append(_axis_ratio(axes))
+
+    emit()
+    for start, (leaving, entering) in enumerate(zip(sequence, sequence[window:]), start=1):
+        if start % window == 0:
+            mean_x, mean_y, sum_xx, sum_xy, sum_yy = rebuild(start)
+            emit()
+            continue
+        # Remove the oldest point from a window of ``window`` points ...
+        dx = leaving.real - mean_x
+        dy = leaving.imag - mean_y
+        old_mean_y = mean_y
+        mean_x -= dx / (window - 1)
+        mean_y -= dy / (window - 1)
+        sum_xx -= dx * (leaving.real - mean_x)
+        sum_xy -= (leaving.real - mean_x) * (leaving.imag - old_mean_y)
+        sum_yy -= dy * (leaving.imag - mean_y)
+        # ... and add the newest one back to restore the window size.
+        dx = entering.real - mean_x
+        dy = entering.imag - mean_y
+        mean_x += dx / window
+        mean_y += dy / window
+        sum_xx += dx * (entering.real - mean_x)
+        sum_xy += dx * (entering.imag - mean_y)
+        sum_yy += dy * (entering.imag - mean_y)
+        emit()
+
+    return RollingSymmetry(window=window, angles=angles, axis_ratios=ratios)
+
+
 def project_landscape(
     sequence: Sequence[complex], axes: Tuple[PrincipalAxis, PrincipalAxis]
 ) -> List[float]:
@@ -189,3 +298,166 @@ def project_landscape(
         projections.append(value.real * lx + value.imag * ly)
     return projections
 
+
+@dataclass(frozen=True)
+class StructureSymmetryResult:
+    """Shape descriptors of a point cloud in an arbitrary number of dimensions."""
+
+    centroid: Vector
+    principal_axes: Tuple[PrincipalAxis, ...]
+    radius_of_gyration: float
+    axis_ratios: Tuple[float, ...]
+    sample_size: int
+
+    def variance_explained(self) -> Tuple[float, ...]:
+        """Return the fraction of variance captured by each axis."""
+
+        total = sum(axis.eigenvalue for axis in self.principal_axes)
+        if total <= 0.0:
+            return tuple(0.0 for _ in self.principal_axes)
+        return tuple(axis.eigenvalue / total for axis in self.principal_axes)
+
+
+def _covariance_matrix_nd(
+    points: Sequence[Sequence[float]], dimension: int
+) -> Tuple[Vector, List[List[float]]]:
+    n = len(points)
+    centroid = tuple(sum(point[k] for point in points) / n for k in range(dimension))
+    sums = [[0.0] * dimension for _ in range(dimension)]
+    for point in points:
+        deltas = [point[k] - centroid[k] for k in range(dimension)]
+        for i in range(dimension):
+            di = deltas[i]
+            row = sums[i]
+            for j in range(i, dimension):
+                row[j] += di * deltas[j]
+
+    scale = 1.0 / (n - 1)
+    for i in range(dimension):
+        for j in range(i, dimension):
+            sums[i][j] *= scale
+            sums[j][i] = sums[i][j]
+    return centroid, sums
+
+
+def _symmetric_eigen(
+    matrix: Sequence[Sequence[float]], *, max_sweeps: int = 64
+) -> List[PrincipalAxis]:
+    """Diagonalise a symmetric matrix with cyclic Jacobi rotations."""
+
+    n = len(matrix)
+    a = [list(row) for row in matrix]
+    v = [[1.0 if i == j else 0.0 for j in range(n)] for i in range(n)]
+    scale = sum(a[i][i] * a[i][i] for i in range(n)) or 1.0
+
+    for _ in range(max_sweeps):
+        off_diagonal = sum(a[i][j] * a[i][j] for i in range(n) for j in range(i + 1, n))
+        if off_diagonal <= 1e-30 * scale:
+            break
+        for p in range(n):
+            for q in range(p + 1, n):
+                apq = a[p][q]
+                if apq == 0.0:
+                    continue
+                theta = (a[q][q] - a[p][p]) / (2.0 * apq)
+                t = math.copysign(1.0, theta) / (abs(theta) + math.sqrt(theta * theta + 1.0))
+                c = 1.0 / math.sqrt(t * t + 1.0)
+                s = t * c
+                for k in range(n):
+                    akp, akq = a[k][p], a[k][q]
+                    a[k][p] = c * akp - s * akq
+                    a[k][q] = s * akp + c * akq
+                for k in range(n):
+                    apk, aqk = a[p][k], a[q][k]
+                    a[p][k] = c * apk - s * aqk
+                    a[q][k] = s * apk + c * aqk
+                for k in range(n):
+                    vkp, vkq = v[k][p], v[k][q]
+                    v[k][p] = c * vkp - s * vkq
+                    v[k][q] = s * vkp + c * vkq
+
+    axes: List[PrincipalAxis] = []
+    for column in range(n):
+        direction = [v[row][column] for row in range(n)]
+        for component in direction:
+            if abs(component) > 1e-12:
+                if component < 0.0:
+                    direction = [-value for value in direction]
+                break
+        axes.append(PrincipalAxis(max(a[column][column], 0.0), tuple(direction)))
+    axes.sort(key=lambda axis: axis.eigenvalue, reverse=True)
+    return axes
+
+
+def analyze_point_symmetry(
+    points: Sequence[Sequence[float]],
+    *,
+    max_points: Optional[int] = None,
+    seed: int = 0,
+) -> StructureSymmetryResult:
+    """Perform a PCA on points with any number of coordinates.
+
+    Parameters
+    ----------
+    points:
+        Sequence of equally sized coordinate tuples, for example the
+        ``(x, y, z)`` positions of the atoms in a protein.
+    max_points:
+        Optional upper bound on the number of points used.  Larger inputs are
+        reduced to a uniform random sample drawn with ``random.Random(seed)``,
+        which keeps the analysis of very large assemblies cheap while giving
+        reproducible estimates of the axes and radius of gyration.
+    seed:
+        Seed for the random sample; ignored when no sampling takes place.
+    """
+
+    if len(points) < 2:
+        raise ValueError("At least two points are required for analysis.")
+    dimension = len(points[0])
+    if dimension == 0:
+        raise ValueError("Points must have at least one coordinate.")
+    if any(len(point) != dimension for point in points):
+        raise ValueError("All points must have the same number of coordinates.")
+    if max_points is not None:
+        if max_points < 2:
+            raise ValueError("max_points must be at least 2.")
+        if len(points) > max_points:
+            sample = random.Random(seed).sample(range(len(points)), max_points)
+            points = [points[index] for index in sample]
+
+    centroid, covariance = _covariance_matrix_nd(points, dimension)
+    axes = tuple(_symmetric_eigen(covariance))
+
+    n = len(points)
+    radius_sq = sum(axis.eigenvalue for axis in axes) * (n - 1) / n
+    leading = axes[0].eigenvalue
+    ratios = tuple(
+        math.sqrt(leading / axis.eigenvalue) if axis.eigenvalue > 0.0 else math.inf
+        for axis in axes[1:]
+    )
+    return StructureSymmetryResult(
+        centroid=centroid,
+        principal_axes=axes,
+        radius_of_gyration=math.sqrt(radius_sq),
+        axis_ratios=ratios,
+        sample_size=n,
+    )
+
+
+def analyze_pdb_symmetry(
+    path: Union[str, Path],
+    *,
+    chains: Optional[Iterable[str]] = None,
+    atom_names: Optional[Iterable[str]] = None,
+    max_points: Optional[int] = None,
+    seed: int = 0,
+) -> StructureSymmetryResult:
+    """Analyse the shape of the atoms selected from the PDB file at *path*.
+
+    ``chains`` and ``atom_names`` are forwarded to
+    :func:`jb_bootcamp.pdb_atoms.read_pdb_atoms`; ``max_points`` and ``seed``
+    to :func:`analyze_point_symmetry`.
+    """
+
+    atoms = read_pdb_atoms(path, chains=chains, atom_names=atom_names)
+    return analyze_point_symmetry(atoms.coordinates(), max_points=max_points, seed=seed)
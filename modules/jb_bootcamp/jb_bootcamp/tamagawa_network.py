@@ -17,18 +17,51 @@ honours network symmetries.
 
 from __future__ import annotations
 
+from array import array
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-import heapq
+import json
 import math
-from typing import Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+import mmap
+import os
+from pathlib import Path
+import sys
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+import weakref
+
+from ._npy import read_npy_header, write_npy
+from .railway_routing import CompactRailwayGraph, ContractionHierarchy, RoutingMethod
 
 __all__ = [
     "Station",
     "Track",
     "RailwayNetwork",
+    "TravelTimeMatrix",
+    "EquivariantTamagawaIndex",
     "compute_equivariant_tamagawa_index",
+    "find_symmetry_orbits",
 ]
 
+# Networks up to this many stations whose directed track count reaches the
+# density threshold are solved with Floyd-Warshall instead of repeated
+# Dijkstra searches.
+_FLOYD_WARSHALL_MAX_STATIONS = 300
+_FLOYD_WARSHALL_MIN_DENSITY = 0.25
+# Below this size the cost of starting worker processes outweighs the gain.
+_PARALLEL_MIN_STATIONS = 256
+
 
 @dataclass(frozen=True)
 class Station:
@@ -90,13 +123,129 @@ class Track:
         return self.length_km / self.design_speed_kph
 
 
+class TravelTimeMatrix:
+    """Dense origin-destination matrix of shortest travel times in hours.
+
+    Rows are origins and columns destinations, both ordered like
+    :attr:`stations`.  Unreachable pairs hold ``math.inf``.  The values are
+    stored row-major in a flat ``float64`` buffer, which is either an
+    ``array('d')`` or a read-only memory map created by :meth:`load`.
+    """
+
+    def __init__(self, stations: Sequence[str], values: Union[array, memoryview]) -> None:
+        self._stations = tuple(stations)
+        self._index = {name: position for position, name in enumerate(self._stations)}
+        if len(self._index) != len(self._stations):
+            raise ValueError("station labels must be unique")
+        if len(values) != len(self._stations) ** 2:
+            raise ValueError("values must hold one entry per origin-destination pair")
+        self._values = values
+
+    @property
+    def stations(self) -> Tuple[str, ...]:
+        """Station labels for both axes of the matrix."""
+
+        return self._stations
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (len(self._stations), len(self._stations))
+
+    def __getitem__(self, key: Tuple[str, str]) -> float:
+        origin, destination = key
+        size = len(self._stations)
+        return self._values[self._position(origin) * size + self._position(destination)]
+
+    def row(self, origin: str) -> List[float]:
+        """Return the travel times from *origin* to every station."""
+
+        size = len(self._stations)
+        start = self._position(origin) * size
+        return list(self._values[start : start + size])
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the matrix to *path* as a ``float64`` ``.npy`` file.
+
+        Station labels are written next to it in a JSON file with the suffix
+        ``.stations.json`` so that :meth:`load` can restore them.
+        """
+
+        target = Path(path)
+        values = array("d", self._values)
+        if sys.byteorder == "big":  # pragma: no cover - depends on platform
+            values.byteswap()
+        write_npy(target, "<f8", self.shape, values.tobytes())
+        with open(_labels_path(target), "w", encoding="utf-8") as handle:
+            json.dump(list(self._stations), handle, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], *, memory_map: bool = True) -> "TravelTimeMatrix":
+        """Load a matrix written by :meth:`save`.
+
+        With ``memory_map=True`` (the default) the values are not read into
+        memory; lookups page them in from the file on demand.
+        """
+
+        source = Path(path)
+        with open(_labels_path(source), encoding="utf-8") as handle:
+            stations = json.load(handle)
+        with open(source, "rb") as handle:
+            descr, shape, offset = read_npy_header(handle)
+            if descr != "<f8" or shape != (len(stations), len(stations)):
+                raise ValueError(f"{source} does not hold a travel-time matrix")
+            if memory_map and stations:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                values: Union[array, memoryview] = memoryview(mapped)[offset:].cast("d")
+            else:
+                values = array("d")
+                values.frombytes(handle.read())
+        if sys.byteorder == "big":  # pragma: no cover - depends on platform
+            values = array("d", values)
+            values.byteswap()
+        return cls(stations, values)
+
+    def _position(self, name: str) -> int:
+        try:
+            return self._index[name]
+        except KeyError:
+            raise KeyError(f"unknown station '{name}'") from None
+
+
+def _labels_path(path: Path) -> Path:
+    return path.with_suffix(".stations.json")
+
+
 class RailwayNetwork:
-    """A railway network with high-speed track segments."""
+    """A railway network with high-speed track segments.
+
+    Parameters
+    ----------
+    cache_size:
+        Number of per-origin shortest-path trees kept by
+        :meth:`travel_time` and :meth:`travel_times_from`.  The least
+        recently used tree is evicted once the limit is reached, and every
+        cached tree is discarded when a station or track is added.  Use
+        ``0`` to disable caching.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, *, cache_size: int = 128) -> None:
+        if cache_size < 0:
+            raise ValueError("cache_size must be non-negative")
         self._stations: Dict[str, Station] = {}
         self._tracks: List[Track] = []
         self._adjacency: Dict[str, List[Tuple[str, float]]] = {}
+        self._legs: Dict[str, Dict[str, float]] = {}
+        self._local_factors: Dict[str, float] = {}
+        # Stations whose local factor changed, kept only while an
+        # EquivariantTamagawaIndex follows the network; _journal_base is the
+        # number of entries already consumed by every tracker and dropped.
+        self._factor_journal: List[str] = []
+        self._journal_base = 0
+        self._factor_trackers: "weakref.WeakSet[EquivariantTamagawaIndex]" = weakref.WeakSet()
+        self._cache_size = cache_size
+        self._tree_cache: "OrderedDict[int, array]" = OrderedDict()
+        self._compiled: Optional[CompactRailwayGraph] = None
+        self._hierarchy: Optional[ContractionHierarchy] = None
 
     def add_station(self, station: Station) -> None:
         """Add *station* to the network."""
@@ -105,6 +254,10 @@ class RailwayNetwork:
             raise ValueError(f"station '{station.name}' already exists")
         self._stations[station.name] = station
         self._adjacency.setdefault(station.name, [])
+        self._legs.setdefault(station.name, {})
+        self._local_factors[station.name] = station.weight
+        self._record_factor_changes((station.name,))
+        self._invalidate_routes()
 
     def add_track(self, track: Track) -> None:
         """Add *track* to the network."""
@@ -117,17 +270,106 @@ class RailwayNetwork:
         self._tracks.append(track)
         travel_time = track.travel_time_hours
         self._adjacency[track.origin].append((track.destination, travel_time))
+        self._record_leg(track.origin, track.destination, travel_time)
 
         if track.bidirectional:
             self._adjacency[track.destination].append((track.origin, travel_time))
+            self._record_leg(track.destination, track.origin, travel_time)
+
+        contribution = 0.5 * _track_factor(track)
+        self._local_factors[track.origin] += contribution
+        self._local_factors[track.destination] += contribution
+        self._record_factor_changes((track.origin, track.destination))
+        self._invalidate_routes()
+
+    def _load_validated(
+        self,
+        stations: Iterable[Station],
+        tracks: Iterable[Track],
+        compiled: Optional[CompactRailwayGraph] = None,
+    ) -> None:
+        # Bulk counterpart of add_station/add_track for data the caller has
+        # already validated as a whole: no per-item checks and a single
+        # cache invalidation.  *compiled* must equal what compile() builds.
+        for station in stations:
+            self._stations[station.name] = station
+            self._adjacency[station.name] = []
+            self._legs[station.name] = {}
+            self._local_factors[station.name] = station.weight
+            self._record_factor_changes((station.name,))
+        adjacency, factors = self._adjacency, self._local_factors
+        for track in tracks:
+            self._tracks.append(track)
+            travel_time = track.length_km / track.design_speed_kph
+            adjacency[track.origin].append((track.destination, travel_time))
+            self._record_leg(track.origin, track.destination, travel_time)
+            if track.bidirectional:
+                adjacency[track.destination].append((track.origin, travel_time))
+                self._record_leg(track.destination, track.origin, travel_time)
+            contribution = 0.5 * _track_factor(track)
+            factors[track.origin] += contribution
+            factors[track.destination] += contribution
+            self._record_factor_changes((track.origin, track.destination))
+        self._invalidate_routes()
+        self._compiled = compiled
+
+    def _record_factor_changes(self, names: Iterable[str]) -> None:
+        if self._factor_trackers:
+            self._factor_journal.extend(names)
+        elif self._factor_journal:
+            self._journal_base += len(self._factor_journal)
+            self._factor_journal.clear()
+
+    def _journal_since(self, position: int) -> List[str]:
+        return self._factor_journal[position - self._journal_base :]
+
+    def _journal_end(self) -> int:
+        return self._journal_base + len(self._factor_journal)
+
+    def _trim_factor_journal(self) -> None:
+        consumed = min(
+            (tracker._journal_position for tracker in self._factor_trackers),
+            default=self._journal_end(),
+        )
+        if consumed > self._journal_base:
+            del self._factor_journal[: consumed - self._journal_base]
+            self._journal_base = consumed
+
+    def _record_leg(self, origin: str, destination: str, travel_time: float) -> None:
+        legs = self._legs[origin]
+        if travel_time < legs.get(destination, math.inf):
+            legs[destination] = travel_time
 
     def stations(self) -> Iterator[Station]:
         """Iterate over stations in insertion order."""
 
         return iter(self._stations.values())
 
-    def travel_time(self, origin: str, destination: str) -> float:
-        """Return the shortest travel time between two stations in hours."""
+    def travel_time(
+        self,
+        origin: str,
+        destination: str,
+        *,
+        method: Union[RoutingMethod, Literal["auto", "hierarchy"]] = "auto",
+    ) -> float:
+        """Return the shortest travel time between two stations in hours.
+
+        Parameters
+        ----------
+        origin, destination:
+            Station names.
+        method:
+            ``"dijkstra"`` answers from the cached shortest-path tree of
+            *origin*, which is fastest when the same origins are queried
+            repeatedly.  ``"astar"`` and ``"bidirectional"`` run a fresh
+            goal-directed search guided by the straight-line distance to
+            *destination* divided by the network's fastest design speed; they
+            expand far fewer stations for one-off point-to-point queries.
+            ``"hierarchy"`` queries the contraction hierarchy set up by
+            :meth:`prepare_hierarchy` or :meth:`use_hierarchy`.  ``"auto"``
+            (the default) uses the hierarchy when one is available and
+            ``"dijkstra"`` otherwise.
+        """
 
         if origin not in self._stations:
             raise KeyError(f"unknown origin station '{origin}'")
@@ -136,53 +378,248 @@ class RailwayNetwork:
         if origin == destination:
             return 0.0
 
-        queue: List[Tuple[float, str]] = [(0.0, origin)]
-        visited: Dict[str, float] = {}
+        graph = self.compile()
+        source = graph.station_id(origin)
+        target = graph.station_id(destination)
+        if method == "auto":
+            method = "dijkstra" if self._hierarchy is None else "hierarchy"
+        if method == "hierarchy":
+            if self._hierarchy is None:
+                raise ValueError("no contraction hierarchy has been prepared")
+            best = self._hierarchy.travel_time(source, target)
+        elif method == "dijkstra" and self._cache_size:
+            best = self._shortest_path_tree(source)[target]
+        else:
+            best = graph.search(source, target, method).travel_time
+        if best == math.inf:
+            raise ValueError(f"destination '{destination}' is not reachable from '{origin}'")
+        return best
 
-        while queue:
-            current_time, station = heapq.heappop(queue)
-            if station in visited and current_time >= visited[station]:
-                continue
-            visited[station] = current_time
+    def travel_times_from(self, origin: str) -> Dict[str, float]:
+        """Return the shortest travel time from *origin* to every reachable station.
+
+        The result comes from a single search and includes *origin* itself
+        with a travel time of zero.  Unreachable stations are omitted.
+        """
+
+        if origin not in self._stations:
+            raise KeyError(f"unknown origin station '{origin}'")
+        graph = self.compile()
+        source = graph.station_id(origin)
+        if self._cache_size:
+            times = self._shortest_path_tree(source)
+        else:
+            times = graph.shortest_times(source)
+        return {name: time for name, time in zip(graph.names, times) if time != math.inf}
+
+    def compile(self) -> CompactRailwayGraph:
+        """Return the network as a :class:`CompactRailwayGraph`.
+
+        Stations keep their insertion order as integer IDs.  The compiled
+        graph is cached and reused by the routing methods until the next
+        call to :meth:`add_station` or :meth:`add_track`; it stays valid on
+        its own, so large networks can be compiled once and the
+        :class:`RailwayNetwork` discarded.
+        """
+
+        if self._compiled is None:
+            names = list(self._stations)
+            index = {name: position for position, name in enumerate(names)}
+            edges = (
+                (index[name], index[neighbour], travel_time)
+                for name in names
+                for neighbour, travel_time in self._adjacency[name]
+            )
+            coordinates = [station.coordinates for station in self._stations.values()]
+            self._compiled = CompactRailwayGraph.from_edges(
+                names,
+                edges,
+                [x for x, _ in coordinates],
+                [y for _, y in coordinates],
+                max_speed_kph=max((track.design_speed_kph for track in self._tracks), default=None),
+            )
+        return self._compiled
+
+    def prepare_hierarchy(self, *, witness_limit: int = 64) -> ContractionHierarchy:
+        """Build a contraction hierarchy and use it for :meth:`travel_time`.
 
-            if station == destination:
-                return current_time
+        Preprocessing pays off for static networks that answer many
+        point-to-point queries.  The returned hierarchy can be saved with
+        :meth:`ContractionHierarchy.save` and attached to an identical
+        network elsewhere with :meth:`use_hierarchy`.  Adding a station or
+        track discards it.
+        """
 
-            for neighbour, travel_time in self._adjacency.get(station, []):
-                next_time = current_time + travel_time
-                if neighbour not in visited or next_time < visited[neighbour]:
-                    heapq.heappush(queue, (next_time, neighbour))
+        self._hierarchy = ContractionHierarchy.build(self.compile(), witness_limit=witness_limit)
+        return self._hierarchy
 
-        raise ValueError(f"destination '{destination}' is not reachable from '{origin}'")
+    def use_hierarchy(self, hierarchy: ContractionHierarchy) -> None:
+        """Attach a previously built *hierarchy* to this network.
+
+        ``ValueError`` is raised unless the hierarchy was built from a network
+        with exactly the same stations and tracks.
+        """
+
+        graph = self.compile()
+        if hierarchy.names != graph.names or hierarchy.fingerprint != graph.fingerprint():
+            raise ValueError("the contraction hierarchy was built for a different network")
+        self._hierarchy = hierarchy
+
+    @property
+    def hierarchy(self) -> Optional[ContractionHierarchy]:
+        """The contraction hierarchy in use, if any."""
+
+        return self._hierarchy
+
+    def _shortest_path_tree(self, source: int) -> array:
+        times = self._tree_cache.get(source)
+        if times is not None:
+            self._tree_cache.move_to_end(source)
+            return times
+
+        times = self.compile().shortest_times(source)
+        self._tree_cache[source] = times
+        if len(self._tree_cache) > self._cache_size:
+            self._tree_cache.popitem(last=False)
+        return times
+
+    def _invalidate_routes(self) -> None:
+        self._tree_cache.clear()
+        self._compiled = None
+        self._hierarchy = None
 
     def itinerary_time(self, stops: Sequence[str]) -> float:
-        """Return the travel time for visiting *stops* in order."""
+        """Return the travel time for visiting *stops* in order.
+
+        Consecutive stops joined by a track use the fastest such track;
+        other legs fall back to :meth:`travel_time`.
+        """
 
         if len(stops) < 2:
             return 0.0
         total = 0.0
         for start, end in zip(stops, stops[1:]):
-            leg_time = None
-            for neighbour, travel_time in self._adjacency.get(start, []):
-                if neighbour == end:
-                    leg_time = travel_time
-                    break
+            leg_time = self._legs.get(start, {}).get(end)
             if leg_time is None:
                 leg_time = self.travel_time(start, end)
             total += leg_time
         return total
 
+    def itinerary_times(self, itineraries: Iterable[Sequence[str]]) -> List[float]:
+        """Return :meth:`itinerary_time` for every itinerary in one batch.
+
+        Legs without a direct track are grouped by origin so that each origin
+        needs at most one shortest-path search across the whole batch.
+        """
+
+        itineraries = [list(stops) for stops in itineraries]
+        missing: Dict[str, set[str]] = {}
+        for stops in itineraries:
+            for start, end in zip(stops, stops[1:]):
+                if start not in self._stations:
+                    raise KeyError(f"unknown origin station '{start}'")
+                if end not in self._stations:
+                    raise KeyError(f"unknown destination station '{end}'")
+                if end not in self._legs[start] and start != end:
+                    missing.setdefault(start, set()).add(end)
+
+        indirect: Dict[Tuple[str, str], float] = {}
+        if missing:
+            graph = self.compile()
+            for start, ends in missing.items():
+                source = graph.station_id(start)
+                if self._cache_size:
+                    times = self._shortest_path_tree(source)
+                else:
+                    times = graph.shortest_times(source)
+                for end in ends:
+                    best = times[graph.station_id(end)]
+                    if best == math.inf:
+                        raise ValueError(f"destination '{end}' is not reachable from '{start}'")
+                    indirect[start, end] = best
+
+        totals: List[float] = []
+        for stops in itineraries:
+            total = 0.0
+            for start, end in zip(stops, stops[1:]):
+                leg_time = self._legs.get(start, {}).get(end)
+                if leg_time is None:
+                    leg_time = indirect.get((start, end), 0.0)
+                total += leg_time
+            totals.append(total)
+        return totals
+
+    def all_pairs_travel_time(
+        self,
+        *,
+        backend: Literal["auto", "dijkstra", "floyd-warshall"] = "auto",
+        processes: Optional[int] = None,
+    ) -> TravelTimeMatrix:
+        """Return the shortest travel time between every pair of stations.
+
+        Parameters
+        ----------
+        backend:
+            ``"dijkstra"`` runs one search per origin and suits sparse
+            networks; ``"floyd-warshall"`` relaxes whole matrix rows at a time
+            and suits small, dense networks.  ``"auto"`` chooses based on the
+            station count and the ratio of directed tracks to station pairs.
+        processes:
+            Number of worker processes for the Dijkstra backend.  ``None``
+            uses every CPU for networks of at least a few hundred stations
+            and searches in-process otherwise; ``1`` always searches
+            in-process.
+        """
+
+        graph = self.compile()
+        names = graph.names
+        size = len(graph)
+
+        if backend == "auto":
+            dense = size > 0 and graph.track_count >= _FLOYD_WARSHALL_MIN_DENSITY * size * size
+            use_floyd = dense and size <= _FLOYD_WARSHALL_MAX_STATIONS
+        elif backend in ("dijkstra", "floyd-warshall"):
+            use_floyd = backend == "floyd-warshall"
+        else:
+            raise ValueError(f"unknown backend '{backend}'")
+
+        if use_floyd:
+            return TravelTimeMatrix(names, _floyd_warshall(graph))
+
+        if processes is None:
+            processes = (os.cpu_count() or 1) if size >= _PARALLEL_MIN_STATIONS else 1
+        if processes < 1:
+            raise ValueError("processes must be at least 1")
+
+        values = array("d", [math.inf]) * (size * size)
+        if processes == 1 or size < 2:
+            rows = (graph.shortest_times(source) for source in range(size))
+            for source, row in enumerate(rows):
+                values[source * size : (source + 1) * size] = row
+        else:
+            chunk = max(1, size // (processes * 4))
+            with ProcessPoolExecutor(
+                max_workers=processes,
+                initializer=_set_worker_graph,
+                initargs=(graph,),
+            ) as pool:
+                batches = [
+                    range(start, min(start + chunk, size)) for start in range(0, size, chunk)
+                ]
+                for batch, rows in zip(batches, pool.map(_worker_dijkstra_rows, batches)):
+                    for source, row in zip(batch, rows):
+                        values[source * size : (source + 1) * size] = row
+        return TravelTimeMatrix(names, values)
+
     def local_tamagawa_factors(self) -> Dict[str, float]:
-        """Return local invariants inspired by Tamagawa measures."""
+        """Return local invariants inspired by Tamagawa measures.
 
-        factors: Dict[str, float] = {
-            name: station.weight for name, station in self._stations.items()
-        }
-        for track in self._tracks:
-            contribution = track.design_speed_kph / track.length_km
-            factors[track.origin] += 0.5 * contribution
-            factors[track.destination] += 0.5 * contribution
-        return factors
+        Each station's factor is its weight plus half of ``speed / length``
+        for every track touching it.  The factors are maintained as stations
+        and tracks are added, so this only copies the current values.
+        """
+
+        return dict(self._local_factors)
 
     def adjacency(self) -> Mapping[str, List[Tuple[str, float]]]:
         """Expose the adjacency mapping (read-only usage expected)."""
@@ -190,11 +627,52 @@ class RailwayNetwork:
         return self._adjacency
 
 
+_worker_graph: Optional[CompactRailwayGraph] = None
+
+
+def _set_worker_graph(graph: CompactRailwayGraph) -> None:
+    global _worker_graph
+    _worker_graph = graph
+
+
+def _worker_dijkstra_rows(sources: range) -> List[array]:
+    assert _worker_graph is not None
+    return [_worker_graph.shortest_times(source) for source in sources]
+
+
+def _floyd_warshall(graph: CompactRailwayGraph) -> array:
+    size = len(graph)
+    rows = [[math.inf] * size for _ in range(size)]
+    for origin in range(size):
+        row = rows[origin]
+        row[origin] = 0.0
+        for neighbour, travel_time in graph.neighbours(origin):
+            if travel_time < row[neighbour]:
+                row[neighbour] = travel_time
+
+    for pivot in range(size):
+        pivot_row = rows[pivot]
+        for origin in range(size):
+            via = rows[origin][pivot]
+            if via == math.inf or origin == pivot:
+                continue
+            rows[origin] = [
+                direct if direct <= via + onward else via + onward
+                for direct, onward in zip(rows[origin], pivot_row)
+            ]
+
+    values = array("d")
+    for row in rows:
+        values.extend(row)
+    return values
+
+
 def compute_equivariant_tamagawa_index(
     network: RailwayNetwork,
-    orbits: Iterable[Iterable[str]],
+    orbits: Optional[Iterable[Iterable[str]]] = None,
     *,
     weight_exponent: float = 1.0,
+    log_space: bool = False,
 ) -> float:
     """Compute an equivariant Tamagawa index for *network*.
 
@@ -205,18 +683,26 @@ def compute_equivariant_tamagawa_index(
     orbits:
         An iterable of station-name collections describing the orbits of
         a symmetry group action.  Each orbit contributes an averaged
-        local factor to the final product.
+        local factor to the final product.  When omitted the orbits are
+        detected with :func:`find_symmetry_orbits`.
     weight_exponent:
         A scaling exponent applied to every orbit average.  Values must
         be strictly positive.
+    log_space:
+        Return the natural logarithm of the index instead of the index.
+        The logarithms of the orbit averages are summed with
+        :func:`math.fsum`, so networks with many orbits neither overflow
+        nor underflow.  Every orbit average must then be positive.
     """
 
     if weight_exponent <= 0.0:
         raise ValueError("weight_exponent must be positive")
+    if orbits is None:
+        orbits = find_symmetry_orbits(network)
 
     local_factors = network.local_tamagawa_factors()
     covered: set[str] = set()
-    invariant = 1.0
+    averages: List[float] = []
 
     for orbit in orbits:
         orbit_list = list(orbit)
@@ -232,15 +718,340 @@ def compute_equivariant_tamagawa_index(
             covered.add(station_name)
             total += local_factors[station_name]
 
-        average = total / len(orbit_list)
-        invariant *= math.pow(average, weight_exponent)
+        averages.append(total / len(orbit_list))
 
     # Include stations that were not explicitly assigned to an orbit by
     # treating them as singleton orbits.  This ensures that the measure
     # accounts for the entire network.
     for station_name, local_factor in local_factors.items():
         if station_name not in covered:
-            invariant *= math.pow(local_factor, weight_exponent)
+            averages.append(local_factor)
 
+    if log_space:
+        if any(average <= 0.0 for average in averages):
+            raise ValueError("log_space requires every orbit average to be positive")
+        return weight_exponent * math.fsum(math.log(average) for average in averages)
+
+    invariant = 1.0
+    for average in averages:
+        invariant *= math.pow(average, weight_exponent)
     return invariant
 
+
+class EquivariantTamagawaIndex:
+    """Equivariant Tamagawa index kept up to date as *network* grows.
+
+    The orbit averages are stored once and only the orbits containing
+    stations touched since the last evaluation are recomputed, so after
+    adding a track the index costs time proportional to the size of the two
+    affected orbits rather than the whole network.  The index is kept as a
+    sum of logarithms, which requires every orbit average to be positive.
+
+    Parameters
+    ----------
+    network:
+        The :class:`RailwayNetwork` to follow.
+    orbits:
+        Orbits as accepted by :func:`compute_equivariant_tamagawa_index`;
+        detected with :func:`find_symmetry_orbits` when omitted.  The
+        partition is fixed at construction: stations added later become
+        singleton orbits.
+    weight_exponent:
+        Exponent applied to every orbit average; must be positive.
+    """
+
+    def __init__(
+        self,
+        network: RailwayNetwork,
+        orbits: Optional[Iterable[Iterable[str]]] = None,
+        *,
+        weight_exponent: float = 1.0,
+    ) -> None:
+        if weight_exponent <= 0.0:
+            raise ValueError("weight_exponent must be positive")
+        if orbits is None:
+            orbits = find_symmetry_orbits(network)
+        self._network = network
+        self._weight_exponent = weight_exponent
+        self._members: List[List[str]] = []
+        self._orbit_of: Dict[str, int] = {}
+        for orbit in orbits:
+            members = list(orbit)
+            if not members:
+                raise ValueError("orbit collections must be non-empty")
+            for name in members:
+                if name not in network._local_factors:
+                    raise KeyError(f"orbit references unknown station '{name}'")
+                if name in self._orbit_of:
+                    raise ValueError(f"station '{name}' appears in multiple orbits")
+                self._orbit_of[name] = len(self._members)
+            self._members.append(members)
+        self._logs: List[float] = []
+        self._journal_position = 0
+        self._refresh(network.local_tamagawa_factors())
+        network._factor_trackers.add(self)
+
+    @property
+    def log_value(self) -> float:
+        """Natural logarithm of the current index."""
+
+        self._catch_up()
+        return self._weight_exponent * self._log_total
+
+    @property
+    def value(self) -> float:
+        """The current index; ``math.inf`` if it exceeds the float range."""
+
+        try:
+            return math.exp(self.log_value)
+        except OverflowError:
+            return math.inf
+
+    def delta_for_track(self, track: Track, *, log_space: bool = False) -> float:
+        """Return how much the index would change if *track* were added.
+
+        The network is not modified.  With ``log_space=True`` the change of
+        the logarithm of the index is returned instead, which stays finite
+        for indices too large to represent.
+        """
+
+        network = self._network
+        for name in (track.origin, track.destination):
+            if name not in network._local_factors:
+                raise KeyError(f"unknown station '{name}'")
+        self._catch_up()
+
+        contribution = 0.5 * _track_factor(track)
+        touched: Dict[int, float] = {}
+        for name in (track.origin, track.destination):
+            orbit = self._orbit_of[name]
+            touched[orbit] = touched.get(orbit, 0.0) + contribution
+        change = 0.0
+        for orbit, increase in touched.items():
+            members = self._members[orbit]
+            total = math.fsum(network._local_factors[name] for name in members) + increase
+            change += math.log(total / len(members)) - self._logs[orbit]
+        change *= self._weight_exponent
+
+        if log_space:
+            return change
+        current = self.value
+        return current * math.expm1(change) if current != math.inf else math.inf
+
+    def _catch_up(self) -> None:
+        network = self._network
+        if self._journal_position == network._journal_end():
+            return
+        touched = set()
+        for name in network._journal_since(self._journal_position):
+            if name not in self._orbit_of:
+                self._orbit_of[name] = len(self._members)
+                self._members.append([name])
+                self._logs.append(0.0)
+            touched.add(self._orbit_of[name])
+        self._journal_position = network._journal_end()
+        network._trim_factor_journal()
+
+        factors = network._local_factors
+        for orbit in touched:
+            old = self._logs[orbit]
+            new = self._orbit_log(orbit, factors)
+            self._logs[orbit] = new
+            self._log_total += new - old
+
+    def _refresh(self, factors: Mapping[str, float]) -> None:
+        for name in factors:
+            if name not in self._orbit_of:
+                self._orbit_of[name] = len(self._members)
+                self._members.append([name])
+        self._logs = [self._orbit_log(orbit, factors) for orbit in range(len(self._members))]
+        self._log_total = math.fsum(self._logs)
+        self._journal_position = self._network._journal_end()
+
+    def _orbit_log(self, orbit: int, factors: Mapping[str, float]) -> float:
+        members = self._members[orbit]
+        average = math.fsum(factors[name] for name in members) / len(members)
+        if average <= 0.0:
+            raise ValueError("every orbit average must be positive")
+        return math.log(average)
+
+
+def find_symmetry_orbits(
+    network: RailwayNetwork, *, exact: bool = False, precision: int = 9
+) -> List[List[str]]:
+    """Group stations that the network's symmetries cannot tell apart.
+
+    Stations start out coloured by their weight, and colour refinement
+    (the one-dimensional Weisfeiler-Leman algorithm) repeatedly splits every
+    colour class by the multiset of ``(track speed, track length, direction,
+    neighbour colour)`` labels around each station until the partition
+    stabilises.  Each round costs ``O((n + m) log n)``.
+
+    Colour classes always contain every automorphism orbit but can be
+    coarser on highly regular networks.  With ``exact=True`` each class is
+    split further into true automorphism orbits by an
+    individualisation-refinement search that looks for a track-preserving
+    permutation mapping one station onto another.
+
+    Parameters
+    ----------
+    network:
+        The network to analyse.
+    exact:
+        Refine colour classes into automorphism orbits.
+    precision:
+        Number of decimal places kept when comparing weights, speeds and
+        lengths.
+
+    Returns
+    -------
+    list of list of str
+        Orbits in the order their first station was added to the network,
+        each listing stations in insertion order.  Singletons are included.
+    """
+
+    structure = _OrbitStructure(network, precision)
+    colours = structure.refine(structure.initial_colours)
+    if exact:
+        parent = list(range(len(colours)))
+
+        def find(station: int) -> int:
+            while parent[station] != station:
+                parent[station] = parent[parent[station]]
+                station = parent[station]
+            return station
+
+        cells: Dict[int, List[int]] = {}
+        for station, colour in enumerate(colours):
+            cells.setdefault(colour, []).append(station)
+        for members in cells.values():
+            representatives: List[int] = []
+            for candidate in members:
+                for representative in representatives:
+                    if find(candidate) == find(representative):
+                        break
+                    mapping = structure.find_automorphism(colours, representative, candidate)
+                    if mapping is not None:
+                        for station, image in enumerate(mapping):
+                            root, other = find(station), find(image)
+                            if root != other:
+                                parent[max(root, other)] = min(root, other)
+                        break
+                else:
+                    representatives.append(candidate)
+        labels = [find(station) for station in range(len(colours))]
+    else:
+        labels = colours
+
+    orbits: Dict[int, List[str]] = {}
+    for name, label in zip(structure.names, labels):
+        orbits.setdefault(label, []).append(name)
+    return list(orbits.values())
+
+
+class _OrbitStructure:
+    """Integer-labelled view of a network used by :func:`find_symmetry_orbits`."""
+
+    def __init__(self, network: RailwayNetwork, precision: int) -> None:
+        self.names = [station.name for station in network.stations()]
+        index = {name: position for position, name in enumerate(self.names)}
+        weights = [round(station.weight, precision) for station in network.stations()]
+        self.initial_colours = _canonical_colours(weights)
+
+        raw_labels: List[Tuple[int, int, str, float, float]] = []
+        for track in network._tracks:
+            speed = round(track.design_speed_kph, precision)
+            length = round(track.length_km, precision)
+            origin, destination = index[track.origin], index[track.destination]
+            if track.bidirectional:
+                raw_labels.append((origin, destination, "both", speed, length))
+                raw_labels.append((destination, origin, "both", speed, length))
+            else:
+                raw_labels.append((origin, destination, "out", speed, length))
+                raw_labels.append((destination, origin, "in", speed, length))
+        label_ids = {
+            label: position
+            for position, label in enumerate(sorted({row[2:] for row in raw_labels}))
+        }
+
+        self.neighbours: List[List[Tuple[int, int]]] = [[] for _ in self.names]
+        for station, neighbour, *label in raw_labels:
+            self.neighbours[station].append((label_ids[tuple(label)], neighbour))
+        self.edges = Counter(
+            (station, label, neighbour)
+            for station, incident in enumerate(self.neighbours)
+            for label, neighbour in incident
+        )
+
+    def refine(self, colours: List[int]) -> List[int]:
+        """Return the coarsest stable refinement of *colours*."""
+
+        count = len(set(colours))
+        while True:
+            signatures = [
+                (
+                    colours[station],
+                    tuple(sorted((label, colours[neighbour]) for label, neighbour in incident)),
+                )
+                for station, incident in enumerate(self.neighbours)
+            ]
+            refined = _canonical_colours(signatures)
+            refined_count = len(set(refined))
+            if refined_count == count:
+                return refined
+            colours, count = refined, refined_count
+
+    def find_automorphism(
+        self, colours: List[int], station: int, image: int
+    ) -> Optional[List[int]]:
+        """Return a track-preserving permutation mapping *station* to *image*."""
+
+        return self._search(
+            self.refine(self._individualise(colours, station)),
+            self.refine(self._individualise(colours, image)),
+        )
+
+    def _search(self, left: List[int], right: List[int]) -> Optional[List[int]]:
+        if Counter(left) != Counter(right):
+            return None
+        cells: Dict[int, List[int]] = {}
+        for station, colour in enumerate(left):
+            cells.setdefault(colour, []).append(station)
+        target_cell = min(
+            (colour for colour, members in cells.items() if len(members) > 1), default=None
+        )
+
+        if target_cell is None:
+            position = {colour: station for station, colour in enumerate(right)}
+            mapping = [position[colour] for colour in left]
+            mapped: Counter = Counter()
+            for (a, label, b), count in self.edges.items():
+                mapped[(mapping[a], label, mapping[b])] += count
+            return mapping if mapped == self.edges else None
+
+        pivot = cells[target_cell][0]
+        left_next = self.refine(self._individualise(left, pivot))
+        for candidate, colour in enumerate(right):
+            if colour != target_cell:
+                continue
+            mapping = self._search(left_next, self.refine(self._individualise(right, candidate)))
+            if mapping is not None:
+                return mapping
+        return None
+
+    @staticmethod
+    def _individualise(colours: List[int], station: int) -> List[int]:
+        individualised = [2 * colour for colour in colours]
+        individualised[station] -= 1
+        return individualised
+
+
+def _track_factor(track: Track) -> float:
+    return track.design_speed_kph / track.length_km
+
+
+def _canonical_colours(signatures: Sequence) -> List[int]:
+    """Relabel *signatures* with dense integers in sorted signature order."""
+
+    palette = {signature: colour for colour, signature in enumerate(sorted(set(signatures)))}
+    return [palette[signature] for signature in signatures]
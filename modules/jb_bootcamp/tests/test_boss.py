@@ -1,6 +1,17 @@
+import random
+
 import pytest
 
-from jb_bootcamp.boss import boss_of, chain_of_command, count_reports, normalize_chart
+from jb_bootcamp.boss import (
+    DynamicOrgChart,
+    OrgChart,
+    ReportingCycleError,
+    boss_of,
+    chain_of_command,
+    count_reports,
+    normalize_chart,
+    validate_chart_file,
+)
 
 
 def test_normalize_chart_rejects_cycles():
@@ -38,3 +49,237 @@ def test_count_reports_handles_indirects():
     assert counts["carla"] == 0
     assert counts["bruce"] == 1
     assert counts["ceo"] == 3
+
+
+def test_count_reports_includes_unlisted_bosses_and_rejects_cycles():
+    assert count_reports({"alice": "bruce", "carla": "bruce"}) == {
+        "alice": 0,
+        "carla": 0,
+        "bruce": 2,
+    }
+    with pytest.raises(ValueError):
+        count_reports({"alice": "bruce", "bruce": "alice"})
+
+
+def test_org_chart_ranges():
+    chart = OrgChart.from_pairs(
+        [
+            ("alice", "bruce"),
+            ("bruce", "ceo"),
+            ("carla", "ceo"),
+            ("ceo", None),
+            ("devon", "alice"),
+            ("erin", "board"),
+        ]
+    )
+
+    assert len(chart) == 7
+    assert "board" in chart
+    assert chart.report_count("ceo") == 4
+    assert chart.report_count("board") == 1
+    assert chart.is_under("devon", "ceo")
+    assert chart.is_under("devon", "bruce")
+    assert not chart.is_under("carla", "bruce")
+    assert not chart.is_under("ceo", "ceo")
+    assert not chart.is_under("erin", "ceo")
+    assert chart.reports_of("bruce") == ["alice", "devon"]
+    assert sorted(chart.reports_of("ceo")) == ["alice", "bruce", "carla", "devon"]
+    assert chart.reports_of("devon") == []
+    with pytest.raises(KeyError):
+        chart.reports_of("zoe")
+
+
+def test_org_chart_handles_deep_chains():
+    depth = 50_000
+    chart = OrgChart({f"e{i}": (f"e{i - 1}" if i else None) for i in range(depth)})
+    assert chart.report_count("e0") == depth - 1
+    assert chart.is_under(f"e{depth - 1}", "e0")
+    assert count_reports({f"e{i}": f"e{i + 1}" for i in range(10)})["e10"] == 10
+
+
+def test_org_chart_ancestor_queries():
+    chart = OrgChart.from_pairs(
+        [
+            ("ceo", None),
+            ("bruce", "ceo"),
+            ("carla", "ceo"),
+            ("alice", "bruce"),
+            ("devon", "alice"),
+            ("erin", "carla"),
+            ("solo", None),
+        ]
+    )
+
+    assert chart.depth("devon") == 3
+    assert chart.kth_boss("devon", 0) == "devon"
+    assert chart.kth_boss("devon", 2) == "bruce"
+    assert chart.kth_boss("devon", 3) == "ceo"
+    assert chart.kth_boss("devon", 4) is None
+    assert chart.ultimate_boss("devon") == "ceo"
+    assert chart.ultimate_boss("ceo") is None
+    assert chart.lowest_common_boss("devon", "erin") == "ceo"
+    assert chart.lowest_common_boss("devon", "bruce") == "bruce"
+    assert chart.lowest_common_boss("devon", "devon") == "devon"
+    assert chart.lowest_common_boss("devon", "solo") is None
+    with pytest.raises(ValueError):
+        chart.kth_boss("devon", -1)
+
+    ids = chart.ids_of(["devon", "erin", "ceo"])
+    assert list(chart.depths_of(ids)) == [3, 2, 0]
+    assert list(chart.kth_bosses(ids, 1)) == list(chart.ids_of(["alice", "carla"])) + [-1]
+    assert list(chart.kth_bosses(ids, [3, 2, 0])) == [chart.id_of("ceo")] * 3
+    assert list(chart.lowest_common_bosses(ids, chart.ids_of(["alice", "devon", "solo"]))) == [
+        chart.id_of("alice"),
+        chart.id_of("ceo"),
+        -1,
+    ]
+    with pytest.raises(KeyError):
+        chart.lowest_common_bosses([-1], [0])
+    with pytest.raises(KeyError):
+        chart.lowest_common_bosses([0], [len(chart.names)])
+    with pytest.raises(KeyError):
+        chart.depths_of([-1])
+
+
+def test_org_chart_ancestors_match_chain_of_command():
+    rng = random.Random(7)
+    chart_dict = {"e0": None}
+    for i in range(1, 400):
+        chart_dict[f"e{i}"] = f"e{rng.randrange(max(0, i - 5), i)}"
+    chart = OrgChart(chart_dict)
+    for _ in range(200):
+        a, b = f"e{rng.randrange(400)}", f"e{rng.randrange(400)}"
+        chain_a = chain_of_command(a, chart_dict)
+        chain_b = set(chain_of_command(b, chart_dict))
+        assert chart.depth(a) == len(chain_a) - 1
+        k = rng.randrange(len(chain_a))
+        assert chart.kth_boss(a, k) == chain_a[k]
+        assert chart.lowest_common_boss(a, b) == next(p for p in chain_a if p in chain_b)
+
+
+def test_normalize_chart_reports_every_cycle():
+    with pytest.raises(ReportingCycleError) as excinfo:
+        normalize_chart(
+            [
+                ("alice", "bruce"),
+                ("bruce", "carla"),
+                ("carla", "alice"),
+                ("devon", "alice"),
+                ("erin", "frank"),
+                ("frank", "erin"),
+                ("gina", None),
+            ]
+        )
+    assert excinfo.value.cycles == [["alice", "bruce", "carla"], ["erin", "frank"]]
+    assert isinstance(excinfo.value, ValueError)
+    with pytest.raises(ReportingCycleError):
+        OrgChart({"alice": "bruce", "bruce": "alice"})
+
+
+def test_normalize_chart_handles_deep_chains():
+    depth = 20_000
+    pairs = [(f"e{i}", f"e{i + 1}") for i in range(depth)]
+    assert len(normalize_chart(pairs)) == depth
+    with pytest.raises(ReportingCycleError) as excinfo:
+        normalize_chart(pairs + [(f"e{depth}", "e0")])
+    assert len(excinfo.value.cycles[0]) == depth + 1
+
+
+def test_validate_chart_file(tmp_path):
+    path = tmp_path / "chart.csv"
+    path.write_text("employee,boss\nalice,bruce\nbruce,ceo\nceo,\ndevon,bruce\n")
+    assert validate_chart_file(path, chunk_size=2) == 4
+
+    path.write_text("employee,boss\nalice,bruce\nbruce,alice\ncarla,\ncarla,alice\n")
+    with pytest.raises(ValueError, match="already listed"):
+        validate_chart_file(path, chunk_size=1)
+
+    path.write_text("boss,employee\nbruce,alice\nalice,bruce\n")
+    with pytest.raises(ReportingCycleError) as excinfo:
+        validate_chart_file(path)
+    assert excinfo.value.cycles == [["alice", "bruce"]]
+
+    path.write_text("employee,boss\nalice,bruce\n\nbruce,\ncarla\n")
+    with pytest.raises(ValueError, match=r"chart.csv:5: row has too few fields"):
+        validate_chart_file(path)
+
+
+def build_dynamic_chart():
+    return DynamicOrgChart(
+        normalize_chart(
+            [
+                ("ceo", None),
+                ("bruce", "ceo"),
+                ("carla", "ceo"),
+                ("alice", "bruce"),
+                ("devon", "alice"),
+                ("erin", "carla"),
+            ]
+        )
+    )
+
+
+def test_dynamic_org_chart_updates_counts():
+    chart = build_dynamic_chart()
+    assert chart.report_count("ceo") == 5
+
+    chart.move("alice", "carla")
+    assert chart.report_count("bruce") == 0
+    assert chart.report_count("carla") == 3
+    assert chart.is_under("devon", "carla")
+
+    chart.hire("fiona", "devon")
+    assert chart.report_count("ceo") == 6
+    assert chart.report_count("alice") == 2
+
+    chart.terminate("alice")
+    assert chart.boss("devon") == "carla"
+    assert chart.direct_reports("carla") == ["erin", "devon"]
+    assert chart.report_count("carla") == 3
+    assert chart.report_count("ceo") == 5
+    assert "alice" not in chart
+
+    chart.move("carla", None)
+    assert chart.report_count("ceo") == 1
+    assert chart.report_counts() == count_reports(chart.chart())
+
+
+def test_dynamic_org_chart_rejects_cycles_and_unknowns():
+    chart = build_dynamic_chart()
+    with pytest.raises(ValueError, match="cycle"):
+        chart.move("bruce", "devon")
+    with pytest.raises(ValueError, match="cycle"):
+        chart.move("bruce", "bruce")
+    with pytest.raises(ValueError, match="already listed"):
+        chart.hire("erin", "ceo")
+    with pytest.raises(KeyError):
+        chart.hire("zoe", "nobody")
+    with pytest.raises(KeyError):
+        chart.terminate("nobody")
+    assert chart.report_count("ceo") == 5
+
+
+def test_dynamic_org_chart_what_if_rolls_back():
+    chart = build_dynamic_chart()
+    before = chart.chart()
+    counts = chart.report_counts()
+
+    with chart.what_if():
+        chart.terminate("bruce")
+        chart.hire("gus", "alice")
+        with chart.what_if():
+            chart.move("carla", "gus")
+            assert chart.report_count("alice") == 4
+        assert chart.report_count("alice") == 2
+        chart.terminate("ceo")
+        assert chart.boss("alice") is None
+
+    assert chart.chart() == before
+    assert chart.report_counts() == counts
+    assert chart.direct_reports("alice") == ["devon"]
+
+    with pytest.raises(RuntimeError):
+        with chart.what_if():
+            chart.move("erin", "devon")
+            raise RuntimeError
+    assert chart.boss("erin") == "carla"
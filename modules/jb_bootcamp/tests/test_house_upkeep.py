@@ -1,5 +1,7 @@
+import datetime
 import math
 import pathlib
+import random
 import sys
 
 import pytest
@@ -10,7 +12,18 @@ if str(PACKAGE_ROOT) not in sys.path:
     sys.path.insert(0, str(PACKAGE_ROOT))
 
 
-from jb_bootcamp.house_upkeep import TaskProjection, UpkeepPlanner, VillaProfile, suggest_upkeep_tasks
+from jb_bootcamp import house_upkeep
+from jb_bootcamp.house_upkeep import (
+    PortfolioPlanner,
+    TaskProjection,
+    UpkeepPlanner,
+    UpkeepTask,
+    VillaProfile,
+    _assign_by_scan,
+    benchmark_assignment,
+    portfolio_calendar,
+    suggest_upkeep_tasks,
+)
 
 
 def test_villa_profile_and_suggestion_scaling():
@@ -76,3 +89,180 @@ def test_planner_requires_tasks_and_staff():
     with pytest.raises(ValueError):
         planner.assign_staff([], days=3)
 
+
+def build_portfolio_tasks(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        UpkeepTask(
+            name=f"task {index}",
+            frequency_days=rng.randint(1, 10),
+            duration_hours=rng.choice([0.5, 1.0, 1.5, 2.0, 3.0]),
+            priority=rng.randint(1, 3),
+        )
+        for index in range(count)
+    ]
+
+
+def test_assign_staff_heap_matches_linear_scan():
+    profile = VillaProfile(name="大别野", floor_count=3, area_m2=480, resident_count=6)
+    planner = UpkeepPlanner(profile, build_portfolio_tasks(400))
+    staff = ["阿福", "Lena", "", "Bo", "Lena", "Mei", "Kai"]
+
+    assignments = planner.assign_staff(staff, days=28)
+
+    ordered = sorted(
+        planner.project_cycle(28),
+        key=lambda proj: (-proj.task.priority, -proj.total_hours, proj.task.name),
+    )
+    expected, _ = _assign_by_scan(ordered, [member for member in staff if member])
+    assert assignments == expected
+    assert list(assignments) == ["阿福", "Lena", "Bo", "Mei", "Kai"]
+
+
+def test_assign_staff_improvement_tightens_makespan():
+    profile = VillaProfile(name="大别野", floor_count=3, area_m2=480, resident_count=6)
+    planner = UpkeepPlanner(profile, build_portfolio_tasks(120, seed=4))
+    staff = [f"caretaker {index}" for index in range(7)]
+
+    def loads(assignments):
+        return [sum(item.total_hours for item in bucket) for bucket in assignments.values()]
+
+    greedy = planner.assign_staff(staff, days=14)
+    improved = planner.assign_staff(staff, days=14, improve=True)
+
+    assert sorted(item.task.name for bucket in improved.values() for item in bucket) == sorted(
+        item.task.name for item in planner.project_cycle(14)
+    )
+    assert max(loads(improved)) <= max(loads(greedy))
+    assert max(loads(improved)) - min(loads(improved)) <= max(loads(greedy)) - min(loads(greedy))
+
+
+def test_benchmark_assignment_reports_each_strategy():
+    profile = VillaProfile(name="晓院", floor_count=1, area_m2=120, resident_count=2)
+    projections = UpkeepPlanner(profile, build_portfolio_tasks(60)).project_cycle(7)
+
+    results = benchmark_assignment(projections, ["a", "b", "c"])
+
+    assert [result.strategy for result in results] == ["linear scan", "heap", "heap + improve"]
+    assert results[0].makespan == results[1].makespan
+    assert results[2].makespan <= results[1].makespan
+    assert all(result.spread >= 0 for result in results)
+
+
+def test_calendar_matches_projection_and_is_chronological():
+    profile = VillaProfile(name="大别野", floor_count=3, area_m2=480, resident_count=6, has_pool=True)
+    planner = UpkeepPlanner(profile, suggest_upkeep_tasks(profile))
+
+    occurrences = list(planner.calendar(end=30))
+    counts = {}
+    for item in occurrences:
+        counts[item.task.name] = counts.get(item.task.name, 0) + 1
+        assert item.day % item.task.frequency_days == 0
+        assert item.villa == "大别野"
+    assert counts == {proj.task.name: proj.occurrences for proj in planner.project_cycle(30)}
+    assert [(item.day, item.task.name) for item in occurrences] == sorted(
+        (item.day, item.task.name) for item in occurrences
+    )
+
+    week = list(planner.calendar(start=7, end=14, start_date=datetime.date(2024, 2, 5)))
+    assert week == [
+        item for item in planner.calendar(end=14, start_date=datetime.date(2024, 2, 5)) if item.day >= 7
+    ]
+    assert week[0].date == datetime.date(2024, 2, 12)
+
+    forever = planner.calendar(start=10**9)
+    assert next(forever).day == 10**9
+
+    with pytest.raises(ValueError):
+        planner.calendar(start=5, end=4)
+    with pytest.raises(ValueError):
+        planner.calendar(start=-1)
+
+
+def test_portfolio_calendar_merges_villas():
+    planners = [
+        UpkeepPlanner(profile, [UpkeepTask("sweep", frequency_days=frequency, duration_hours=1.0)])
+        for profile, frequency in [
+            (VillaProfile(name="梅园", floor_count=1, area_m2=150, resident_count=2), 2),
+            (VillaProfile(name="晓院", floor_count=1, area_m2=150, resident_count=2), 3),
+        ]
+    ]
+    merged = [(item.day, item.villa) for item in portfolio_calendar(planners, start=1, end=7)]
+    assert merged == [(2, "梅园"), (3, "晓院"), (4, "梅园"), (6, "梅园"), (6, "晓院")]
+
+
+def build_villas(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        VillaProfile(
+            name=f"villa {index}",
+            floor_count=rng.randint(1, 4),
+            area_m2=round(rng.uniform(120, 900), 1),
+            resident_count=rng.randint(0, 8),
+            has_garden=rng.random() < 0.7,
+            has_pool=rng.random() < 0.4,
+            has_guesthouse=rng.random() < 0.3,
+        )
+        for index in range(count)
+    ]
+
+
+def test_portfolio_planner_matches_per_villa_planning():
+    villas = build_villas(60)
+    portfolio = PortfolioPlanner(villas)
+    projections = portfolio.project_cycles(30)
+    totals = portfolio.total_hours(30)
+
+    assert len(portfolio) == 60
+    for profile in villas:
+        planner = UpkeepPlanner(profile, suggest_upkeep_tasks(profile))
+        assert portfolio.tasks(profile.name) == suggest_upkeep_tasks(profile)
+        assert projections[profile.name] == planner.project_cycle(30)
+        assert totals[profile.name] == planner.total_hours(30)
+
+    with pytest.raises(KeyError):
+        portfolio.tasks("missing")
+    with pytest.raises(ValueError):
+        portfolio.total_hours(0)
+    with pytest.raises(ValueError):
+        PortfolioPlanner(villas[:1] * 2)
+    with pytest.raises(KeyError):
+        PortfolioPlanner(villas, regions={"missing": "north"})
+
+
+def test_portfolio_planner_assigns_staff_per_region(monkeypatch):
+    villas = build_villas(24, seed=3)
+    regions = {
+        profile.name: "north" if index % 3 else "south" for index, profile in enumerate(villas)
+    }
+    portfolio = PortfolioPlanner(villas, regions=regions)
+    staff = {"north": ["Aiko", "Ren", "Sora"], "south": ["Mei", "Kenta"]}
+
+    serial = portfolio.assign_staff(staff, 14, improve=True, processes=1)
+    assert portfolio.assign_staff(staff, 14, improve=True, processes=2) == serial
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("small portfolios are balanced in-process")
+
+    monkeypatch.setattr(house_upkeep, "ProcessPoolExecutor", no_pool)
+    assert portfolio.assign_staff(staff, 14, improve=True) == serial
+    assert set(serial) == {"north", "south"}
+    assert set(serial["south"]) == {"Mei", "Kenta"}
+
+    projections = portfolio.project_cycles(14)
+    for region, team in serial.items():
+        assigned = sorted(
+            (villa, proj.task.name) for share in team.values() for villa, proj in share
+        )
+        expected = sorted(
+            (villa, proj.task.name)
+            for villa, villa_projections in projections.items()
+            if regions[villa] == region
+            for proj in villa_projections
+        )
+        assert assigned == expected
+
+    with pytest.raises(ValueError):
+        portfolio.assign_staff({"north": ["Aiko"]}, 14, processes=1)
+    with pytest.raises(ValueError):
+        portfolio.assign_staff(staff, 14, processes=0)
@@ -0,0 +1,80 @@
+"""Tests for the columnar PDB reader."""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import shutil
+
+import pytest
+
+from jb_bootcamp.pdb_atoms import pdb_coordinates, read_pdb_atoms
+
+DATA_DIR = pathlib.Path(__file__).resolve().parents[3] / "data"
+
+SAMPLE = """\
+HEADER    TEST
+ATOM      1  N   GLY A   1       1.000   2.000   3.000  1.00  0.00           N
+ATOM      2  CA  GLY A   1       2.000   2.000   3.000  1.00  0.00           C
+ATOM      3  CB AGLY A   1       3.000   2.000   3.000  0.50  0.00           C
+ATOM      4  CB BGLY A   1       3.500   2.000   3.000  0.50  0.00           C
+ATOM      5  CA  ALA B   2      -1.500   0.250  10.000  1.00  0.00           C
+HETATM    6 FE   HEM B 500       0.000   0.000   0.000  1.00  0.00          FE
+ENDMDL
+ATOM      7  CA  ALA B   2      99.000  99.000  99.000  1.00  0.00           C
+"""
+
+
+@pytest.fixture
+def sample_pdb(tmp_path: pathlib.Path) -> pathlib.Path:
+    path = tmp_path / "sample.pdb"
+    path.write_text(SAMPLE)
+    return path
+
+
+def test_reader_parses_columns_and_skips_alternates(sample_pdb):
+    atoms = read_pdb_atoms(sample_pdb, use_cache=False)
+
+    assert len(atoms) == 5
+    assert atoms.atom_names == ("N", "CA", "CB", "CA", "FE")
+    assert atoms.record_types == ("ATOM", "ATOM", "ATOM", "ATOM", "HETATM")
+    assert atoms.chain_ids == ("A", "A", "A", "B", "B")
+    assert list(atoms.residue_numbers) == [1, 1, 1, 2, 500]
+    assert atoms.coordinates()[2] == (3.0, 2.0, 3.0)
+    assert atoms.coordinates()[3] == (-1.5, 0.25, 10.0)
+    assert not (sample_pdb.parent / "sample.npy").exists()
+
+
+def test_reader_filters_by_chain_and_atom_name(sample_pdb):
+    assert pdb_coordinates(sample_pdb, chains=["B"], atom_names=["CA"]) == [(-1.5, 0.25, 10.0)]
+    atoms = read_pdb_atoms(sample_pdb, atom_names={"CA"}, use_cache=False)
+    assert atoms.chain_ids == ("A", "B")
+
+
+def test_cache_round_trip_and_invalidation(sample_pdb):
+    parsed = read_pdb_atoms(sample_pdb)
+    cache = sample_pdb.with_suffix(".npy")
+    assert cache.exists()
+    assert cache.read_bytes().startswith(b"\x93NUMPY")
+
+    cached = read_pdb_atoms(sample_pdb)
+    assert cached == parsed
+
+    sample_pdb.write_text(SAMPLE.replace("ATOM      1", "REMARK    1"))
+    stale_time = cache.stat().st_mtime_ns - 1_000_000_000
+    os.utime(cache, ns=(stale_time, stale_time))
+    assert len(read_pdb_atoms(sample_pdb)) == 4
+
+
+def test_reader_handles_bundled_structure(tmp_path):
+    source = tmp_path / "1OLG.pdb"
+    shutil.copy(DATA_DIR / "1OLG.pdb", source)
+
+    atoms = read_pdb_atoms(source)
+    assert len(atoms) == 2792
+    assert set(atoms.chain_ids) == {"A", "B", "C", "D"}
+    assert read_pdb_atoms(source) == atoms
+
+    alpha_a = read_pdb_atoms(source, chains=["A"], atom_names=["CA"])
+    assert 0 < len(alpha_a) < len(atoms)
+    assert set(alpha_a.atom_names) == {"CA"}
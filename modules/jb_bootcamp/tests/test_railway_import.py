@@ -0,0 +1,151 @@
+"""Tests for bulk railway network import."""
+
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from jb_bootcamp.railway_import import read_gtfs, read_network_csv
+from jb_bootcamp.tamagawa_network import RailwayNetwork, Station, Track
+
+STATIONS_CSV = """name,x,y,weight
+A,0,0,1.5
+B,10,0,
+C,10,10,2
+D,0,10,1
+"""
+
+TRACKS_CSV = """origin,destination,length_km,design_speed_kph,bidirectional
+A,B,10,300,yes
+B,C,10,250,1
+C,D,10,200,false
+A,D,12,300,
+"""
+
+
+def write_csv(tmp_path, stations=STATIONS_CSV, tracks=TRACKS_CSV):
+    stations_path = tmp_path / "stations.csv"
+    tracks_path = tmp_path / "tracks.csv"
+    stations_path.write_text(stations)
+    tracks_path.write_text(tracks)
+    return stations_path, tracks_path
+
+
+def build_expected() -> RailwayNetwork:
+    network = RailwayNetwork()
+    network.add_station(Station("A", (0.0, 0.0), 1.5))
+    network.add_station(Station("B", (10.0, 0.0)))
+    network.add_station(Station("C", (10.0, 10.0), 2.0))
+    network.add_station(Station("D", (0.0, 10.0)))
+    network.add_track(Track("A", "B", 10.0, 300.0))
+    network.add_track(Track("B", "C", 10.0, 250.0))
+    network.add_track(Track("C", "D", 10.0, 200.0, bidirectional=False))
+    network.add_track(Track("A", "D", 12.0, 300.0))
+    return network
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 65536])
+def test_csv_import_matches_incremental_build(tmp_path, chunk_size) -> None:
+    columns = read_network_csv(*write_csv(tmp_path), chunk_size=chunk_size)
+    expected = build_expected()
+
+    assert columns.names == ("A", "B", "C", "D")
+    assert columns.station_count == 4
+    assert columns.track_count == 4
+    assert list(columns.weights) == [1.5, 1.0, 2.0, 1.0]
+    assert columns.bidirectional == bytes([1, 1, 0, 1])
+    assert columns.compile().fingerprint() == expected.compile().fingerprint()
+
+    network = columns.to_network()
+    assert network.compile().fingerprint() == expected.compile().fingerprint()
+    assert network.local_tamagawa_factors() == pytest.approx(expected.local_tamagawa_factors())
+    for origin in "ABCD":
+        assert network.travel_times_from(origin) == pytest.approx(expected.travel_times_from(origin))
+
+    network.add_track(Track("B", "D", 5.0, 100.0))
+    assert network.travel_time("B", "D") == pytest.approx(0.05)
+
+
+@pytest.mark.parametrize(
+    "tracks, error, message",
+    [
+        ("origin,destination,length_km,design_speed_kph\nA,B,0,300\n", ValueError, ":2: track length"),
+        ("origin,destination,length_km,design_speed_kph\nA,B,1,300\nA,Z,1,300\n", KeyError, ":3: unknown"),
+        ("origin,destination,length_km,design_speed_kph\nA,A,1,300\n", ValueError, "distinct"),
+        ("origin,destination,length_km,design_speed_kph\nA,B,x,300\n", ValueError, "not a number"),
+        ("origin,destination,length_km,design_speed_kph,bidirectional\nA,B,1,3,maybe\n", ValueError, "boolean"),
+        ("origin,length_km,design_speed_kph\nA,1,300\n", ValueError, "destination"),
+        ("origin,destination,length_km,design_speed_kph\nA,B,nan,300\n", ValueError, ":2: length"),
+        ("origin,destination,length_km,design_speed_kph\nA,B,1,inf\n", ValueError, ":2: design"),
+    ],
+)
+def test_csv_import_reports_invalid_rows(tmp_path, tracks, error, message) -> None:
+    with pytest.raises(error, match=message):
+        read_network_csv(*write_csv(tmp_path, tracks=tracks), chunk_size=1)
+
+
+def test_csv_import_rejects_duplicate_stations(tmp_path) -> None:
+    with pytest.raises(ValueError, match=":3: station 'A' already exists"):
+        read_network_csv(*write_csv(tmp_path, stations="name,x,y\nA,0,0\nA,1,1\n"))
+
+
+def test_gtfs_import(tmp_path) -> None:
+    (tmp_path / "stops.txt").write_text(
+        "stop_id,stop_name,stop_lat,stop_lon\n"
+        "S1,One,35.0,135.0\n"
+        "S2,Two,35.0,136.0\n"
+        "S3,Three,36.0,136.0\n"
+    )
+    (tmp_path / "stop_times.txt").write_text(
+        "trip_id,arrival_time,departure_time,stop_id,stop_sequence\n"
+        "slow,08:00:00,08:00:00,S1,1\n"
+        "slow,09:00:00,09:05:00,S2,2\n"
+        "slow,10:05:00,10:05:00,S3,3\n"
+        "fast,08:30:00,08:30:00,S2,2\n"
+        "fast,08:00:00,08:00:00,S1,1\n"
+        "notime,,,S3,1\n"
+        "notime,,,S2,2\n"
+    )
+    columns = read_gtfs(tmp_path, fallback_speed_kph=100.0)
+    graph = columns.compile()
+
+    assert columns.names == ("S1", "S2", "S3")
+    assert columns.bidirectional == bytes(3)
+    pairs = list(zip(columns.origins, columns.destinations))
+    assert pairs == [(0, 1), (1, 2), (2, 1)]
+
+    east = 2.0 * 6371.0 * math.asin(math.cos(math.radians(35.0)) * math.sin(math.radians(0.5)))
+    assert columns.lengths_km[0] == pytest.approx(east)
+    assert columns.speeds_kph[0] == pytest.approx(east / 0.5)
+    assert columns.lengths_km[1] == pytest.approx(6371.0 * math.radians(1.0))
+    assert columns.speeds_kph[2] == 100.0
+    assert graph.x[1] - graph.x[0] == pytest.approx(6371.0 * math.radians(1.0) * math.cos(math.radians(35.0 + 1 / 3)))
+    assert graph.y[2] - graph.y[1] == pytest.approx(6371.0 * math.radians(1.0))
+
+
+def test_gtfs_import_requires_contiguous_trips(tmp_path) -> None:
+    (tmp_path / "stops.txt").write_text("stop_id,stop_lat,stop_lon\nS1,0,0\nS2,0,1\n")
+    (tmp_path / "stop_times.txt").write_text(
+        "trip_id,stop_sequence,stop_id\nt1,1,S1\nt2,1,S2\nt1,2,S2\n"
+    )
+    with pytest.raises(ValueError, match="not contiguous"):
+        read_gtfs(tmp_path)
+
+
+def test_gtfs_import_rejects_repeated_stop_sequence(tmp_path) -> None:
+    (tmp_path / "stops.txt").write_text("stop_id,stop_lat,stop_lon\nS1,0,0\nS2,0,1\n")
+    (tmp_path / "stop_times.txt").write_text(
+        "trip_id,stop_sequence,stop_id,arrival_time\nt1,1,S1,08:00:00\nt1,1,S2,\n"
+    )
+    with pytest.raises(ValueError, match="trip 't1' repeats stop_sequence 1"):
+        read_gtfs(tmp_path)
+
+
+def test_csv_import_counts_blank_lines_in_messages(tmp_path) -> None:
+    tracks = "origin,destination,length_km,design_speed_kph\n\nA,B,1,300\n\nA,Z,1,300\n"
+    with pytest.raises(KeyError, match=":5: unknown"):
+        read_network_csv(*write_csv(tmp_path, tracks=tracks), chunk_size=1)
+    short = "origin,destination,length_km,design_speed_kph\n\n\nA,B\n"
+    with pytest.raises(ValueError, match=":4: row has too few fields"):
+        read_network_csv(*write_csv(tmp_path, tracks=short))
@@ -0,0 +1,203 @@
+"""Tests for the compact railway routing kernels."""
+
+from __future__ import annotations
+
+import math
+import pickle
+import random
+import struct
+
+import pytest
+
+from jb_bootcamp.railway_routing import (
+    ROUTING_METHODS,
+    CompactRailwayGraph,
+    ContractionHierarchy,
+    benchmark_routing,
+)
+from jb_bootcamp.tamagawa_network import RailwayNetwork, Station, Track
+
+
+def build_random_network(size: int, extra_tracks: int, seed: int = 3) -> RailwayNetwork:
+    rng = random.Random(seed)
+    network = RailwayNetwork()
+    for index in range(size):
+        network.add_station(Station(f"S{index}", (rng.uniform(0, 500), rng.uniform(0, 500))))
+    stations = list(network.stations())
+    pairs = [(index, index + 1) for index in range(size - 1)]
+    pairs += [tuple(rng.sample(range(size), 2)) for _ in range(extra_tracks)]
+    for origin, destination in pairs:
+        start, end = stations[origin], stations[destination]
+        network.add_track(
+            Track(
+                start.name,
+                end.name,
+                length_km=start.distance_to(end) * rng.uniform(1.0, 1.4) + 0.1,
+                design_speed_kph=rng.choice([160.0, 250.0, 350.0]),
+                bidirectional=rng.random() < 0.8,
+            )
+        )
+    return network
+
+
+def test_compiled_graph_uses_csr_layout():
+    network = RailwayNetwork()
+    for name, x in (("A", 0.0), ("B", 1.0), ("C", 2.0)):
+        network.add_station(Station(name, (x, 0.0)))
+    network.add_track(Track("A", "B", length_km=10.0, design_speed_kph=100.0))
+    network.add_track(Track("B", "C", length_km=20.0, design_speed_kph=100.0, bidirectional=False))
+
+    graph = network.compile()
+    assert graph.names == ("A", "B", "C")
+    assert list(graph.offsets) == [0, 1, 3, 3]
+    assert list(graph.targets) == [1, 0, 2]
+    assert list(graph.weights) == pytest.approx([0.1, 0.1, 0.2])
+    assert graph.track_count == 3
+    assert graph.neighbours(graph.station_id("B")) == [(0, pytest.approx(0.1)), (2, pytest.approx(0.2))]
+    assert network.compile() is graph
+
+    network.add_station(Station("D", (3.0, 0.0)))
+    assert network.compile() is not graph
+    with pytest.raises(KeyError):
+        graph.station_id("D")
+
+
+def test_dijkstra_and_astar_agree_with_full_search():
+    network = build_random_network(120, 200)
+    graph = network.compile()
+    rng = random.Random(11)
+    for _ in range(40):
+        source, target = rng.randrange(len(graph)), rng.randrange(len(graph))
+        expected = graph.shortest_times(source)[target]
+        assert graph.dijkstra(source, target) == pytest.approx(expected)
+        assert graph.astar(source, target) == pytest.approx(expected)
+
+
+def test_astar_heuristic_stays_admissible_for_short_tracks():
+    network = RailwayNetwork()
+    network.add_station(Station("A", (0.0, 0.0)))
+    network.add_station(Station("B", (100.0, 0.0)))
+    network.add_station(Station("C", (200.0, 0.0)))
+    network.add_track(Track("A", "B", length_km=10.0, design_speed_kph=100.0))
+    network.add_track(Track("B", "C", length_km=10.0, design_speed_kph=100.0))
+    network.add_track(Track("A", "C", length_km=150.0, design_speed_kph=100.0))
+
+    graph = network.compile()
+    assert graph.speed_bound == pytest.approx(1000.0)
+    assert graph.astar(0, 2) == pytest.approx(0.2)
+
+
+def test_unreachable_targets_return_infinity():
+    graph = CompactRailwayGraph.from_edges(["A", "B"], [(0, 1, 1.0)], [0.0, 1.0], [0.0, 0.0])
+    assert graph.dijkstra(1, 0) == math.inf
+    assert graph.astar(1, 0) == math.inf
+    assert list(graph.shortest_times(1)) == [math.inf, 0.0]
+
+
+def test_constructor_validates_arrays():
+    with pytest.raises(ValueError):
+        CompactRailwayGraph(["A"], [0], [], [], [0.0], [0.0])
+    with pytest.raises(ValueError):
+        CompactRailwayGraph(["A", "B"], [0, 1, 1], [5], [1.0], [0.0, 0.0], [0.0, 0.0])
+    with pytest.raises(ValueError):
+        CompactRailwayGraph(["A", "B"], [0, 1, 1], [1], [0.0], [0.0, 0.0], [0.0, 0.0])
+    with pytest.raises(ValueError):
+        CompactRailwayGraph(["A", "A"], [0, 0, 0], [], [], [0.0, 0.0], [0.0, 0.0])
+
+
+def test_bidirectional_search_matches_dijkstra_and_expands_less():
+    network = build_random_network(300, 450, seed=5)
+    graph = network.compile()
+    rng = random.Random(2)
+    queries = [(rng.randrange(len(graph)), rng.randrange(len(graph))) for _ in range(60)]
+
+    for source, target in queries:
+        expected = graph.dijkstra(source, target)
+        assert graph.bidirectional_astar(source, target) == pytest.approx(expected)
+
+    results = {result.method: result for result in benchmark_routing(graph, queries)}
+    assert set(results) == set(ROUTING_METHODS)
+    assert all(result.queries == len(queries) for result in results.values())
+    assert results["astar"].expanded < results["dijkstra"].expanded
+    assert results["bidirectional"].mean_expanded < results["dijkstra"].mean_expanded
+    assert results["dijkstra"].mean_milliseconds >= 0.0
+
+
+def test_network_travel_time_accepts_search_method():
+    network = build_random_network(80, 100, seed=9)
+    names = [station.name for station in network.stations()]
+    for origin, destination in [(names[0], names[-1]), (names[10], names[42]), (names[5], names[5])]:
+        try:
+            expected = network.travel_time(origin, destination)
+        except ValueError:
+            for method in ("astar", "bidirectional"):
+                with pytest.raises(ValueError):
+                    network.travel_time(origin, destination, method=method)
+            continue
+        for method in ("astar", "bidirectional"):
+            assert network.travel_time(origin, destination, method=method) == pytest.approx(expected)
+
+    with pytest.raises(ValueError):
+        network.travel_time(names[0], names[1], method="teleport")
+
+
+@pytest.mark.parametrize("witness_limit", [1, 64])
+def test_contraction_hierarchy_answers_exact_travel_times(witness_limit):
+    network = build_random_network(150, 220, seed=13)
+    graph = network.compile()
+    hierarchy = ContractionHierarchy.build(graph, witness_limit=witness_limit)
+    assert sorted(hierarchy.rank) == list(range(len(graph)))
+
+    for source in range(0, len(graph), 7):
+        expected = graph.shortest_times(source)
+        for target in range(len(graph)):
+            assert hierarchy.travel_time(source, target) == pytest.approx(expected[target])
+
+
+def test_contraction_hierarchy_serialises_and_attaches(tmp_path):
+    network = build_random_network(60, 80, seed=4)
+    names = [station.name for station in network.stations()]
+    hierarchy = network.prepare_hierarchy()
+    assert network.hierarchy is hierarchy
+    expected = network.travel_time(names[3], names[50], method="dijkstra")
+    assert network.travel_time(names[3], names[50]) == pytest.approx(expected)
+
+    path = tmp_path / "network.ch"
+    hierarchy.save(path)
+    restored = ContractionHierarchy.load(path)
+    assert restored.to_bytes() == hierarchy.to_bytes()
+    assert pickle.loads(pickle.dumps(restored)).to_bytes() == hierarchy.to_bytes()
+
+    twin = build_random_network(60, 80, seed=4)
+    twin.use_hierarchy(restored)
+    assert twin.travel_time(names[3], names[50], method="hierarchy") == pytest.approx(expected)
+
+    other = build_random_network(60, 81, seed=4)
+    with pytest.raises(ValueError):
+        other.use_hierarchy(restored)
+    with pytest.raises(ValueError):
+        other.travel_time(names[3], names[50], method="hierarchy")
+    with pytest.raises(ValueError):
+        ContractionHierarchy.from_bytes(b"not a hierarchy")
+    blob = hierarchy.to_bytes()
+    with pytest.raises(ValueError, match="truncated"):
+        ContractionHierarchy.from_bytes(blob[:-8])
+    with pytest.raises(ValueError, match="trailing"):
+        ContractionHierarchy.from_bytes(blob + b"\0" * 8)
+    magic = blob[: blob.index(b"{") - 8]
+    for header in (b"\xff\xfe", b"{not json", b'{"version": 1}', b"[1, 2]"):
+        corrupt = magic + struct.pack("<Q", len(header)) + header
+        with pytest.raises(ValueError, match="malformed hierarchy header"):
+            ContractionHierarchy.from_bytes(corrupt)
+
+    twin.add_station(Station("extra", (0.0, 0.0)))
+    assert twin.hierarchy is None
+
+
+def test_contraction_hierarchy_validates_arrays():
+    with pytest.raises(ValueError):
+        ContractionHierarchy(["a", "b"], 0, [0, 1], ([0, 1, 1], [1], []), ([0, 0, 0], [], []))
+    with pytest.raises(ValueError):
+        ContractionHierarchy(["a", "b"], 0, [0, 1], ([0, 1, 1], [], []), ([0, 0, 0], [], []))
+    with pytest.raises(ValueError):
+        ContractionHierarchy(["a", "b"], 0, [0], ([0, 1, 1], [1], [1.0]), ([0, 0, 0], [], []))
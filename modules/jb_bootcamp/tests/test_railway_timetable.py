@@ -0,0 +1,103 @@
+"""Tests for connection-scan timetable routing."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from jb_bootcamp.railway_timetable import Timetable, Trip
+from jb_bootcamp.tamagawa_network import RailwayNetwork, Station, Track
+
+
+def build_line() -> RailwayNetwork:
+    network = RailwayNetwork()
+    for index, name in enumerate("ABCD"):
+        network.add_station(Station(name, (100.0 * index, 0.0)))
+    for start, end in ("AB", "BC", "CD"):
+        network.add_track(Track(start, end, length_km=100.0, design_speed_kph=200.0))
+    return network
+
+
+def test_connections_follow_physical_running_times():
+    timetable = Timetable(
+        build_line(),
+        [Trip("slow", ("A", "B", "C"), departure_hour=8.0, dwell_hours=0.1), Trip("express", ("A", "D"), 7.0)],
+    )
+    assert len(timetable) == 3
+    assert list(timetable.departures) == pytest.approx([7.0, 8.0, 8.6])
+    assert list(timetable.arrivals) == pytest.approx([8.5, 8.5, 9.1])
+
+
+def test_earliest_arrival_with_transfers():
+    timetable = Timetable(
+        build_line(),
+        [
+            Trip("first", ("A", "B"), departure_hour=8.0),
+            Trip("missed", ("B", "C", "D"), departure_hour=8.55),
+            Trip("connection", ("B", "C", "D"), departure_hour=8.75),
+            Trip("late", ("A", "B", "C", "D"), departure_hour=9.0),
+        ],
+        transfer_hours=0.1,
+    )
+
+    assert timetable.earliest_arrival("A", "D", 7.5) == pytest.approx(9.75)
+    assert timetable.earliest_arrival("A", "D", 8.5) == pytest.approx(10.5)
+    assert timetable.earliest_arrival("B", "C", 8.5) == pytest.approx(9.05)
+    assert timetable.earliest_arrival("C", "C", 12.0) == 12.0
+    with pytest.raises(ValueError):
+        timetable.earliest_arrival("A", "D", 9.5)
+    with pytest.raises(ValueError):
+        timetable.earliest_arrival("D", "A", 0.0)
+    with pytest.raises(KeyError):
+        timetable.earliest_arrival("A", "Z", 0.0)
+
+    assert timetable.profile("A", "D") == [
+        (pytest.approx(8.0), pytest.approx(9.75)),
+        (pytest.approx(9.0), pytest.approx(10.5)),
+    ]
+
+
+def test_profile_agrees_with_earliest_arrival_queries():
+    rng = random.Random(21)
+    network = RailwayNetwork()
+    names = [f"S{index}" for index in range(8)]
+    for index, name in enumerate(names):
+        network.add_station(Station(name, (rng.uniform(0, 300), rng.uniform(0, 300))))
+    for start, end in zip(names, names[1:]):
+        network.add_track(Track(start, end, length_km=rng.uniform(40, 120), design_speed_kph=250.0))
+    for _ in range(6):
+        start, end = rng.sample(names, 2)
+        network.add_track(Track(start, end, length_km=rng.uniform(60, 200), design_speed_kph=300.0))
+
+    trips = []
+    for index in range(40):
+        stops = rng.sample(names, rng.randint(2, 5))
+        trips.append(Trip(f"T{index}", tuple(stops), rng.uniform(5.0, 20.0), dwell_hours=0.05))
+    timetable = Timetable(network, trips, transfer_hours=0.2)
+
+    for origin, destination in [("S0", "S7"), ("S3", "S1"), ("S5", "S2")]:
+        profile = timetable.profile(origin, destination)
+        departures = [departure for departure, _ in profile]
+        arrivals = [arrival for _, arrival in profile]
+        assert departures == sorted(departures)
+        assert arrivals == sorted(arrivals)
+        for query in [4.0 + 0.5 * step for step in range(34)]:
+            candidates = [arrival for departure, arrival in profile if departure >= query]
+            if candidates:
+                assert timetable.earliest_arrival(origin, destination, query) == pytest.approx(min(candidates))
+            else:
+                with pytest.raises(ValueError):
+                    timetable.earliest_arrival(origin, destination, query)
+
+
+def test_timetable_validates_input():
+    network = build_line()
+    with pytest.raises(ValueError):
+        Timetable(network, [Trip("x", ("A", "B"), 1.0), Trip("x", ("B", "C"), 2.0)])
+    with pytest.raises(ValueError):
+        Timetable(network, [], transfer_hours=-1.0)
+    with pytest.raises(KeyError):
+        Timetable(network, [Trip("x", ("A", "Z"), 1.0)])
+    with pytest.raises(ValueError):
+        Trip("x", ("A",), 1.0)
@@ -1,12 +1,25 @@
 from __future__ import annotations
 
+from array import array
+import math
+import random
+
 import pytest
 
 from jb_bootcamp.supermarket import (
+    ChainHistory,
     Delivery,
+    StoreScenario,
     SupermarketProduct,
+    optimise_reorder_policies,
     plan_restock,
+    plan_restock_columns,
+    plan_restock_csv,
+    simulate_chain,
     simulate_inventory,
+    simulate_inventory_events,
+    simulate_inventory_history,
+    simulate_service_levels,
 )
 
 
@@ -57,3 +70,303 @@ def test_simulate_inventory_rejects_unknown_demand_entry() -> None:
             days=2,
         )
 
+
+def test_simulate_inventory_history_table() -> None:
+    products = [
+        SupermarketProduct("荔枝", "produce", daily_demand=5),
+        SupermarketProduct("rice noodles", "pantry", daily_demand=2),
+        SupermarketProduct("soy sauce", "pantry", daily_demand=1),
+    ]
+    deliveries = [
+        Delivery("荔枝", day=1, quantity=4),
+        Delivery("荔枝", day=1, quantity=1),
+        Delivery("rice noodles", day=2, quantity=3),
+        Delivery("soy sauce", day=9, quantity=3),
+    ]
+    history = simulate_inventory_history(
+        products,
+        {"荔枝": 6, "rice noodles": 5, "soy sauce": -2},
+        deliveries,
+        {"荔枝": (3, 2), "rice noodles": (2,)},
+        days=4,
+    )
+
+    assert history.shape == (4, 3)
+    assert list(history.day(1)) == [6, 1, 0]
+    assert history[3, 0] == 1
+    assert history.product("rice noodles") == (3, 1, 2, 0)
+    assert history.as_dict() == {
+        "荔枝": (3, 6, 3, 1),
+        "rice noodles": (3, 1, 2, 0),
+        "soy sauce": (0, 0, 0, 0),
+    }
+    with pytest.raises(KeyError):
+        history.product("tofu")
+
+
+def test_simulate_inventory_matches_day_by_day_reference() -> None:
+    rng = random.Random(3)
+    products = [SupermarketProduct(f"p{i}", "misc", daily_demand=1) for i in range(20)]
+    patterns = {
+        f"p{i}": tuple(rng.randrange(6) for _ in range(rng.randrange(1, 8)))
+        for i in range(20)
+        if i % 5
+    }
+    deliveries = [Delivery(f"p{rng.randrange(20)}", rng.randrange(40), rng.randrange(30)) for _ in range(60)]
+    initial = {f"p{i}": rng.randrange(20) for i in range(20)}
+
+    expected = {}
+    for product in products:
+        stock, levels = initial[product.name], []
+        pattern = patterns.get(product.name, (0,))
+        for day in range(30):
+            stock += sum(d.quantity for d in deliveries if d.product_name == product.name and d.day == day)
+            stock -= min(stock, pattern[day % len(pattern)])
+            levels.append(stock)
+        expected[product.name] = tuple(levels)
+
+    assert simulate_inventory(products, initial, deliveries, patterns, days=30) == expected
+
+
+def test_simulate_inventory_events_matches_daily_history() -> None:
+    rng = random.Random(11)
+    products = [SupermarketProduct(f"p{i}", "misc", daily_demand=1) for i in range(30)]
+    patterns = {
+        f"p{i}": tuple(rng.randrange(4) for _ in range(rng.randrange(1, 9)))
+        for i in range(30)
+        if i % 7
+    }
+    patterns["p1"] = (0, 0, 0)
+    deliveries = [
+        Delivery(f"p{rng.randrange(30)}", rng.randrange(120), rng.randrange(40)) for _ in range(150)
+    ]
+    initial = {f"p{i}": rng.randrange(25) for i in range(30)}
+
+    days = 100
+    history = simulate_inventory(products, initial, deliveries, patterns, days=days)
+    summaries = simulate_inventory_events(products, initial, deliveries, patterns, days=days)
+    for name, levels in history.items():
+        summary = summaries[name]
+        empty_days = [day for day, level in enumerate(levels) if level == 0]
+        pattern = patterns.get(name, (0,))
+        demand = sum(pattern[day % len(pattern)] for day in range(days))
+        delivered = sum(d.quantity for d in deliveries if d.product_name == name and d.day < days)
+        assert summary.final_stock == levels[-1]
+        assert summary.stockout_days == len(empty_days)
+        assert summary.first_stockout_day == (empty_days[0] if empty_days else None)
+        assert summary.units_sold == initial[name] + delivered - levels[-1]
+        assert summary.unmet_demand == demand - summary.units_sold
+
+
+def test_simulate_inventory_events_long_horizon() -> None:
+    arguments = (
+        [SupermarketProduct("豆腐", "fresh", daily_demand=2)],
+        {"豆腐": 10},
+        [Delivery("豆腐", day=365 * 50, quantity=1_000)],
+        {"豆腐": (1, 2, 3)},
+    )
+    days = 365 * 100
+    summary = simulate_inventory_events(*arguments, days=days)["豆腐"]
+    levels = simulate_inventory(*arguments, days=days)["豆腐"]
+
+    assert summary.first_stockout_day == 5
+    assert summary.final_stock == 0
+    assert summary.units_sold == 1_010
+    assert summary.stockout_days == levels.count(0)
+
+
+def test_simulate_service_levels_bounds_and_reproducibility() -> None:
+    products = [
+        SupermarketProduct("rice", "pantry", daily_demand=2),
+        SupermarketProduct("荔枝", "produce", daily_demand=2),
+        SupermarketProduct("tofu", "fresh", daily_demand=15),
+    ]
+    stock = {"rice": 10_000, "荔枝": 0, "tofu": 150}
+    deliveries = [Delivery("tofu", day=10, quantity=150)]
+
+    levels = simulate_service_levels(
+        products, stock, deliveries, days=20, replications=200, seed=5, processes=1
+    )
+    assert levels["rice"].fill_rate == (1.0, 1.0, 1.0)
+    assert levels["rice"].stockout_probability == (0.0, 0.0, 0.0)
+    assert levels["荔枝"].fill_rate == (0.0, 0.0, 0.0)
+    assert levels["荔枝"].stockout_probability[1] == pytest.approx(1 - math.exp(-2), abs=0.1)
+    low, median, high = levels["tofu"].fill_rate
+    assert 0.8 < low <= median <= high <= 1.0
+
+    parallel = simulate_service_levels(
+        products, stock, deliveries, days=20, replications=200, seed=5, processes=2
+    )
+    assert parallel == levels
+
+
+def test_simulate_service_levels_negative_binomial_is_riskier() -> None:
+    products = [SupermarketProduct("tofu", "fresh", daily_demand=10)]
+    common = dict(days=30, replications=300, quantiles=(0.05,), processes=1)
+    poisson = simulate_service_levels(products, {"tofu": 290}, (), **common)["tofu"]
+    clumped = simulate_service_levels(
+        products, {"tofu": 290}, (), distribution="negative-binomial", dispersion=0.5, **common
+    )["tofu"]
+    assert clumped.fill_rate[0] < poisson.fill_rate[0]
+
+    with pytest.raises(ValueError):
+        simulate_service_levels(products, {}, (), days=5, distribution="negative-binomial")
+
+
+def reference_policy_cost(policy, demand, initial, lead, holding, shortage, ordering):
+    stock, orders, total = initial, [], 0.0
+    for day, wanted in enumerate(demand):
+        stock += sum(quantity for due, quantity in orders if due == day)
+        sold = min(stock, wanted)
+        stock -= sold
+        total += holding * stock + shortage * (wanted - sold)
+        position = stock + sum(quantity for due, quantity in orders if due > day)
+        if position <= policy.reorder_point:
+            if policy.kind == "sS":
+                quantity = policy.level - position
+            else:
+                quantity = policy.level
+                while position + quantity <= policy.reorder_point:
+                    quantity += policy.level
+            orders.append((day + lead + 1, quantity))
+            total += ordering
+    return total
+
+
+def test_optimise_reorder_policies_improves_on_baseline() -> None:
+    products = [
+        SupermarketProduct("rice", "pantry", daily_demand=4.5, safety_stock=3),
+        SupermarketProduct("荔枝", "produce", daily_demand=12),
+    ]
+    patterns = {"荔枝": (20, 5, 5, 10, 15, 20, 9)}
+    kwargs = dict(
+        lead_time_days=2, days=70, demand_pattern=patterns, holding_cost=0.2, shortage_cost=4.0, order_cost=15.0
+    )
+
+    baseline = optimise_reorder_policies(products, {"rice": 10}, time_budget=0.0, **kwargs)
+    assert all(choice.candidates_evaluated == 1 for choice in baseline.values())
+
+    chosen = optimise_reorder_policies(products, {"rice": 10}, **kwargs)
+    for name, choice in chosen.items():
+        assert choice.candidates_evaluated > 50
+        assert choice.daily_cost <= baseline[name].daily_cost
+
+    demand = [patterns["荔枝"][day % 7] for day in range(70)]
+    assert chosen["荔枝"].daily_cost == pytest.approx(
+        reference_policy_cost(chosen["荔枝"].policy, demand, 0, 2, 0.2, 4.0, 15.0) / 70
+    )
+
+
+def test_optimise_reorder_policies_restricts_kinds() -> None:
+    products = [SupermarketProduct("tofu", "fresh", daily_demand=3)]
+    chosen = optimise_reorder_policies(products, {"tofu": 4}, lead_time_days=1, kinds=("RQ",), days=30)
+    policy = chosen["tofu"].policy
+    assert policy.kind == "RQ"
+    assert chosen["tofu"].daily_cost == pytest.approx(
+        reference_policy_cost(policy, [3] * 30, 4, 1, 0.1, 5.0, 20.0) / 30
+    )
+    with pytest.raises(ValueError):
+        optimise_reorder_policies(products, {}, lead_time_days=1, kinds=("ST",))
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_simulate_chain_writes_every_store(tmp_path, processes) -> None:
+    products = [
+        SupermarketProduct("荔枝", "produce", daily_demand=5),
+        SupermarketProduct("rice noodles", "pantry", daily_demand=2),
+    ]
+    stores = [
+        StoreScenario(
+            f"store-{i}",
+            {"荔枝": 6 + i, "rice noodles": 5},
+            [Delivery("荔枝", day=1, quantity=i)],
+            {"荔枝": (3, 2), "rice noodles": (i % 3,)},
+        )
+        for i in range(5)
+    ]
+    stores.append(StoreScenario("empty", {}))
+
+    chain = simulate_chain(products, stores, days=4, output=tmp_path / "chain.npy", processes=processes)
+
+    assert chain.stores == tuple(store.name for store in stores)
+    assert chain.products == ("荔枝", "rice noodles")
+    assert chain.days == 4
+    for store in stores:
+        expected = simulate_inventory(
+            products, store.initial_stock, store.deliveries, store.demand_pattern, days=4
+        )
+        assert chain.store(store.name).as_dict() == expected
+    assert ChainHistory(tmp_path / "chain.npy").store("store-3").product("荔枝") == (6, 7, 4, 2)
+    with pytest.raises(KeyError):
+        chain.store("missing")
+
+    data = (tmp_path / "chain.npy").read_bytes()
+    labels = (tmp_path / "chain.labels.json").read_text(encoding="utf-8")
+    (tmp_path / "short.labels.json").write_text(labels, encoding="utf-8")
+    for corrupt in (data[:-8], data + bytes(8)):
+        (tmp_path / "short.npy").write_bytes(corrupt)
+        with pytest.raises(ValueError, match="wrong amount of data"):
+            ChainHistory(tmp_path / "short.npy")
+
+
+def test_plan_restock_columns_matches_plan_restock() -> None:
+    products = [
+        SupermarketProduct("荔枝", "produce", daily_demand=5.2, safety_stock=4),
+        SupermarketProduct("rice noodles", "pantry", daily_demand=2.5, safety_stock=2),
+        SupermarketProduct("tofu", "fresh", daily_demand=1.0),
+    ]
+    stock = {"荔枝": 6, "rice noodles": 3, "tofu": 100}
+    expected = plan_restock(products, stock, lead_time_days=2, planning_days=3)
+
+    quantities = plan_restock_columns(
+        array("d", [5.2, 2.5, 1.0]),
+        array("q", [4, 2, 0]),
+        array("q", [6, 3, 100]),
+        lead_time_days=2,
+        planning_days=3,
+    )
+    assert list(quantities) == list(expected.values()) == [24, 12, 0]
+
+    with pytest.raises(ValueError, match="daily_demand"):
+        plan_restock_columns([1.0, 0.0], [0, 0], [0, 0], lead_time_days=1, planning_days=1)
+    with pytest.raises(ValueError, match="one entry"):
+        plan_restock_columns([1.0], [0, 0], [0], lead_time_days=1, planning_days=1)
+
+
+def test_plan_restock_csv_streams_chunks(tmp_path) -> None:
+    source = tmp_path / "catalogue.csv"
+    target = tmp_path / "orders.csv"
+    source.write_text(
+        "name,daily_demand,current_stock,safety_stock\n"
+        "荔枝,5.2,6,4\n"
+        "\n"
+        "rice noodles,2.5,3,2\n"
+        "tofu,1,,\n",
+        encoding="utf-8",
+    )
+
+    assert plan_restock_csv(source, target, lead_time_days=2, planning_days=3, chunk_size=2) == 3
+    assert target.read_text(encoding="utf-8").splitlines() == [
+        "name,restock",
+        "荔枝,24",
+        "rice noodles,12",
+        "tofu,5",
+    ]
+
+    source.write_text("name,daily_demand\na,1\nb,x\n", encoding="utf-8")
+    with pytest.raises(ValueError, match=":3: daily_demand"):
+        plan_restock_csv(source, target, lead_time_days=0, planning_days=1)
+    source.write_text("name,daily_demand\na,1\nb,-1\n", encoding="utf-8")
+    with pytest.raises(ValueError, match=":3: daily_demand must be positive"):
+        plan_restock_csv(source, target, lead_time_days=0, planning_days=1)
+    source.write_text("name,daily_demand,safety_stock\na,1,0\nb,1,1\nc,1,-2\n", encoding="utf-8")
+    with pytest.raises(ValueError, match=":4: safety_stock cannot be negative"):
+        plan_restock_csv(source, target, lead_time_days=0, planning_days=1, chunk_size=8)
+    source.write_text("name,daily_demand\na,1\nb,inf\n", encoding="utf-8")
+    with pytest.raises(ValueError, match=":3: daily_demand is not finite"):
+        plan_restock_csv(source, target, lead_time_days=0, planning_days=1)
+    with pytest.raises(ValueError, match="finite"):
+        plan_restock_columns([float("inf")], [0], [0], lead_time_days=0, planning_days=1)
+    source.write_text("name,daily_demand\n\na,1\nb,x\n", encoding="utf-8")
+    with pytest.raises(ValueError, match=":4: daily_demand"):
+        plan_restock_csv(source, target, lead_time_days=0, planning_days=1)
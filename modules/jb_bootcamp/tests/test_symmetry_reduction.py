@@ -1,15 +1,22 @@
 """Tests for symmetry-aware dimensionality reduction utilities."""
 
 import math
+import pathlib
 
 import pytest
 
+from jb_bootcamp.folding_energy import imaginary_potential_barriers
 from jb_bootcamp.symmetry_reduction import (
     analyze_complex_symmetry,
     analyze_fly_landscape,
+    analyze_pdb_symmetry,
+    analyze_point_symmetry,
     project_landscape,
+    rolling_complex_symmetry,
 )
 
+DATA_DIR = pathlib.Path(__file__).resolve().parents[3] / "data"
+
 
 def test_fly_landscape_has_asymmetric_axis_ratio():
     result = analyze_fly_landscape(40)
@@ -40,3 +47,85 @@ def test_requires_multiple_points():
     with pytest.raises(ValueError):
         analyze_fly_landscape(1)
 
+
+def test_point_symmetry_matches_complex_analysis_in_two_dimensions():
+    sequence = [complex(math.cos(t) * 3.0, math.sin(t)) for t in range(12)]
+    planar = analyze_complex_symmetry(sequence)
+    general = analyze_point_symmetry([(z.real, z.imag) for z in sequence])
+
+    for axis_2d, axis_nd in zip(planar.principal_axes, general.principal_axes):
+        assert axis_nd.eigenvalue == pytest.approx(axis_2d.eigenvalue)
+        assert axis_nd.direction == pytest.approx(axis_2d.direction, abs=1e-9)
+    assert general.axis_ratios == pytest.approx((planar.axis_ratio,))
+
+
+def test_point_symmetry_recovers_ellipsoid_axes():
+    points = []
+    for sx in (-1.0, 1.0):
+        for sy in (-1.0, 1.0):
+            for sz in (-1.0, 1.0):
+                points.append((4.0 * sx, 2.0 * sy, 1.0 * sz))
+    result = analyze_point_symmetry(points)
+
+    assert [axis.direction for axis in result.principal_axes] == [
+        pytest.approx((1.0, 0.0, 0.0), abs=1e-12),
+        pytest.approx((0.0, 1.0, 0.0), abs=1e-12),
+        pytest.approx((0.0, 0.0, 1.0), abs=1e-12),
+    ]
+    assert result.axis_ratios == pytest.approx((2.0, 4.0))
+    assert result.radius_of_gyration == pytest.approx(math.sqrt(16.0 + 4.0 + 1.0))
+    assert sum(result.variance_explained()) == pytest.approx(1.0)
+
+
+def test_point_symmetry_handles_rotated_cloud_and_sampling():
+    angle = 0.4
+    c, s = math.cos(angle), math.sin(angle)
+    points = [(5.0 * t * c, 5.0 * t * s, 0.1 * ((-1) ** i)) for i, t in enumerate(range(-50, 51))]
+    result = analyze_point_symmetry(points)
+    assert result.principal_axes[0].direction == pytest.approx((c, s, 0.0), abs=1e-9)
+
+    sampled = analyze_point_symmetry(points, max_points=40, seed=7)
+    assert sampled.sample_size == 40
+    assert sampled == analyze_point_symmetry(points, max_points=40, seed=7)
+    assert sampled.principal_axes[0].direction == pytest.approx((c, s, 0.0), abs=1e-3)
+
+
+def test_pdb_symmetry_uses_selected_atoms(tmp_path):
+    source = tmp_path / "2ERK.pdb"
+    source.write_bytes((DATA_DIR / "2ERK.pdb").read_bytes())
+
+    result = analyze_pdb_symmetry(source, atom_names=["CA"])
+    assert len(result.centroid) == 3
+    assert result.radius_of_gyration > 10.0
+    assert all(ratio >= 1.0 for ratio in result.axis_ratios)
+
+
+def test_point_symmetry_validates_input():
+    with pytest.raises(ValueError):
+        analyze_point_symmetry([(0.0, 0.0, 0.0)])
+    with pytest.raises(ValueError):
+        analyze_point_symmetry([(0.0, 0.0), (1.0, 0.0, 0.0)])
+    with pytest.raises(ValueError):
+        analyze_point_symmetry([(0.0,), (1.0,)], max_points=1)
+
+
+def test_rolling_symmetry_matches_windowed_recomputation():
+    sequence = imaginary_potential_barriers(60)
+    window = 12
+    rolling = rolling_complex_symmetry(sequence, window)
+    assert len(rolling) == len(sequence) - window + 1
+
+    for start in range(len(rolling)):
+        expected = analyze_complex_symmetry(sequence[start : start + window])
+        lx, ly = expected.principal_axes[0].direction
+        assert rolling.angles[start] == pytest.approx(math.atan2(ly, lx), rel=1e-7)
+        assert rolling.axis_ratios[start] == pytest.approx(expected.axis_ratio, rel=1e-7)
+
+
+def test_rolling_symmetry_validates_window():
+    sequence = [complex(n, 0.0) for n in range(5)]
+    with pytest.raises(ValueError):
+        rolling_complex_symmetry(sequence, 1)
+    with pytest.raises(ValueError):
+        rolling_complex_symmetry(sequence, 6)
+    assert len(rolling_complex_symmetry(sequence, 5)) == 1
@@ -2,13 +2,18 @@
 
 from __future__ import annotations
 
+import math
+
 import pytest
 
 from jb_bootcamp.tamagawa_network import (
     RailwayNetwork,
+    EquivariantTamagawaIndex,
     Station,
     Track,
+    TravelTimeMatrix,
     compute_equivariant_tamagawa_index,
+    find_symmetry_orbits,
 )
 
 
@@ -75,3 +80,315 @@ def test_invalid_orbit_configuration():
     with pytest.raises(ValueError):
         compute_equivariant_tamagawa_index(network, [[]])
 
+
+def test_travel_times_from_returns_every_destination():
+    network = build_sample_network()
+    times = network.travel_times_from("A")
+    assert times == {
+        "A": 0.0,
+        "B": pytest.approx(10.0 / 300.0),
+        "C": pytest.approx(10.0 / 300.0 + 10.0 / 200.0),
+    }
+    times["B"] = -1.0
+    assert network.travel_time("A", "B") == pytest.approx(10.0 / 300.0)
+
+
+def test_route_cache_is_lru_and_invalidated_by_mutation():
+    network = RailwayNetwork(cache_size=2)
+    for name, x in (("A", 0.0), ("B", 1.0), ("C", 2.0)):
+        network.add_station(Station(name, (x, 0.0)))
+    network.add_track(Track("A", "B", length_km=10.0, design_speed_kph=100.0))
+    network.add_track(Track("B", "C", length_km=10.0, design_speed_kph=100.0))
+
+    network.travel_time("A", "C")
+    network.travel_time("B", "C")
+    network.travel_time("A", "B")
+    network.travel_time("C", "A")
+    assert list(network._tree_cache) == [0, 2]
+
+    network.add_track(Track("A", "C", length_km=5.0, design_speed_kph=100.0))
+    assert not network._tree_cache
+    assert network.travel_time("A", "C") == pytest.approx(0.05)
+
+    network.add_station(Station("D", (3.0, 0.0)))
+    with pytest.raises(ValueError):
+        network.travel_time("A", "D")
+
+
+def test_uncached_network_matches_cached_results():
+    cached = build_sample_network()
+    uncached = RailwayNetwork(cache_size=0)
+    for station in cached.stations():
+        uncached.add_station(station)
+    for track in cached._tracks:
+        uncached.add_track(track)
+
+    for origin in "ABC":
+        assert uncached.travel_times_from(origin) == pytest.approx(cached.travel_times_from(origin))
+    assert not uncached._tree_cache
+    with pytest.raises(ValueError):
+        RailwayNetwork(cache_size=-1)
+
+
+def build_grid_network(width: int, height: int) -> RailwayNetwork:
+    network = RailwayNetwork()
+    for x in range(width):
+        for y in range(height):
+            network.add_station(Station(f"{x}-{y}", (float(x), float(y))))
+    for x in range(width):
+        for y in range(height):
+            if x + 1 < width:
+                network.add_track(
+                    Track(f"{x}-{y}", f"{x + 1}-{y}", length_km=10.0 + y, design_speed_kph=200.0)
+                )
+            if y + 1 < height:
+                network.add_track(
+                    Track(
+                        f"{x}-{y}",
+                        f"{x}-{y + 1}",
+                        length_km=12.0 + x,
+                        design_speed_kph=250.0,
+                        bidirectional=(x % 2 == 0),
+                    )
+                )
+    return network
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"backend": "auto"},
+        {"backend": "dijkstra", "processes": 1},
+        {"backend": "dijkstra", "processes": 2},
+        {"backend": "floyd-warshall"},
+    ],
+)
+def test_all_pairs_travel_time_matches_pairwise_queries(options):
+    network = build_grid_network(4, 3)
+    matrix = network.all_pairs_travel_time(**options)
+    names = [station.name for station in network.stations()]
+    assert matrix.stations == tuple(names)
+    assert matrix.shape == (12, 12)
+
+    for origin in names:
+        reachable = network.travel_times_from(origin)
+        for destination in names:
+            expected = reachable.get(destination, math.inf)
+            assert matrix[origin, destination] == pytest.approx(expected)
+
+
+def test_travel_time_matrix_save_and_memory_map(tmp_path):
+    network = build_sample_network()
+    network.add_station(Station("D", (5.0, 5.0)))
+    matrix = network.all_pairs_travel_time()
+    path = tmp_path / "od.npy"
+    matrix.save(path)
+
+    assert (tmp_path / "od.stations.json").exists()
+    for memory_map in (True, False):
+        loaded = TravelTimeMatrix.load(path, memory_map=memory_map)
+        assert loaded.stations == matrix.stations
+        assert loaded.row("A") == matrix.row("A")
+        assert loaded["A", "D"] == math.inf
+    with pytest.raises(KeyError):
+        matrix["A", "Z"]
+    with pytest.raises(ValueError):
+        network.all_pairs_travel_time(backend="bellman-ford")
+
+
+def test_itinerary_time_uses_fastest_parallel_track():
+    network = build_sample_network()
+    network.add_track(Track("B", "C", length_km=10.0, design_speed_kph=400.0, bidirectional=False))
+    assert network.itinerary_time(["B", "C"]) == pytest.approx(10.0 / 400.0)
+    assert network.itinerary_time(["C", "B"]) == pytest.approx(10.0 / 200.0)
+    assert network.itinerary_time(["A"]) == 0.0
+
+
+def test_itinerary_times_batches_indirect_legs():
+    network = build_grid_network(4, 3)
+    itineraries = [
+        ["0-0", "1-0", "3-2"],
+        ["3-2", "0-0"],
+        ["2-1", "2-1", "1-1"],
+        ["0-1"],
+    ]
+    expected = [network.itinerary_time(stops) for stops in itineraries]
+    network._tree_cache.clear()
+
+    assert network.itinerary_times(itineraries) == pytest.approx(expected)
+    assert sorted(network._tree_cache) == [3, 11]
+
+    with pytest.raises(KeyError):
+        network.itinerary_times([["0-0", "nowhere"]])
+    with pytest.raises(KeyError):
+        network.itinerary_time(["nowhere", "nowhere"])
+    with pytest.raises(KeyError):
+        network.itinerary_times([["nowhere", "nowhere"]])
+
+    network.add_station(Station("island", (9.0, 9.0)))
+    with pytest.raises(ValueError):
+        network.itinerary_times([["0-0", "island"]])
+
+
+def build_ring(names, *, speed=300.0, length=10.0, weight=1.0) -> list:
+    stations = [Station(name, (float(index), 0.0), weight) for index, name in enumerate(names)]
+    tracks = [
+        Track(start, end, length_km=length, design_speed_kph=speed)
+        for start, end in zip(names, names[1:] + names[:1])
+    ]
+    return stations + tracks
+
+
+def network_from(*parts) -> RailwayNetwork:
+    network = RailwayNetwork()
+    items = [item for part in parts for item in part]
+    for item in items:
+        if isinstance(item, Station):
+            network.add_station(item)
+    for item in items:
+        if isinstance(item, Track):
+            network.add_track(item)
+    return network
+
+
+def test_colour_refinement_finds_mirror_orbits():
+    network = build_sample_network()
+    assert find_symmetry_orbits(network) == [["A"], ["B"], ["C"]]
+
+    path = RailwayNetwork()
+    for name, x in (("A", 0.0), ("B", 1.0), ("C", 2.0), ("D", 3.0)):
+        path.add_station(Station(name, (x, 0.0)))
+    for start, end in ("AB", "BC", "CD"):
+        path.add_track(Track(start, end, length_km=10.0, design_speed_kph=250.0))
+    assert find_symmetry_orbits(path) == [["A", "D"], ["B", "C"]]
+    assert find_symmetry_orbits(path, exact=True) == [["A", "D"], ["B", "C"]]
+
+    path.add_track(Track("A", "C", length_km=15.0, design_speed_kph=250.0, bidirectional=False))
+    assert find_symmetry_orbits(path) == [["A"], ["B"], ["C"], ["D"]]
+
+
+def test_exact_orbits_split_regular_components():
+    hexagon = build_ring([f"h{index}" for index in range(6)])
+    triangle_one = build_ring(["t0", "t1", "t2"])
+    triangle_two = build_ring(["u0", "u1", "u2"])
+    network = network_from(hexagon, triangle_one, triangle_two)
+
+    assert len(find_symmetry_orbits(network)) == 1
+    exact = find_symmetry_orbits(network, exact=True)
+    assert sorted(sorted(orbit) for orbit in exact) == [
+        [f"h{index}" for index in range(6)],
+        ["t0", "t1", "t2", "u0", "u1", "u2"],
+    ]
+
+    heavy = network_from(build_ring(["a", "b", "c"]), build_ring(["x", "y", "z"], weight=2.0))
+    assert find_symmetry_orbits(heavy, exact=True) == [["a", "b", "c"], ["x", "y", "z"]]
+
+
+def test_exact_orbits_respect_parallel_tracks():
+    network = RailwayNetwork()
+    for index, weight in enumerate([1.0, 2.0, 1.0, 1.0, 1.0]):
+        network.add_station(Station(f"s{index}", (float(index), 0.0), weight=weight))
+    network.add_track(Track("s3", "s1", length_km=10.0, design_speed_kph=200.0))
+    for _ in range(2):
+        network.add_track(
+            Track("s0", "s1", length_km=10.0, design_speed_kph=200.0, bidirectional=False)
+        )
+
+    exact = find_symmetry_orbits(network, exact=True)
+    assert sorted(sorted(orbit) for orbit in exact) == [["s0"], ["s1"], ["s2", "s4"], ["s3"]]
+
+
+def test_index_uses_detected_orbits_by_default():
+    network = network_from(build_ring(["a", "b", "c", "d"]), [Station("spur", (9.0, 9.0))])
+    network.add_track(Track("a", "spur", length_km=5.0, design_speed_kph=100.0))
+    orbits = find_symmetry_orbits(network, exact=True)
+    assert compute_equivariant_tamagawa_index(network) == pytest.approx(
+        compute_equivariant_tamagawa_index(network, orbits)
+    )
+
+
+def test_log_space_index_avoids_overflow():
+    names = [f"s{index}" for index in range(400)]
+    network = network_from(build_ring(names, speed=1000.0, length=0.001))
+    singletons = [[name] for name in names]
+
+    assert compute_equivariant_tamagawa_index(network, singletons) == math.inf
+    log_index = compute_equivariant_tamagawa_index(network, singletons, log_space=True, weight_exponent=2.0)
+    factor = network.local_tamagawa_factors()["s0"]
+    assert log_index == pytest.approx(2.0 * 400 * math.log(factor))
+    assert compute_equivariant_tamagawa_index(network, log_space=True) == pytest.approx(math.log(factor))
+
+    zero = network_from([Station("z", (0.0, 0.0), weight=0.0)])
+    with pytest.raises(ValueError):
+        compute_equivariant_tamagawa_index(zero, log_space=True)
+
+
+def test_local_factors_are_maintained_incrementally() -> None:
+    network = build_sample_network()
+    factors = network.local_tamagawa_factors()
+    assert factors["A"] == pytest.approx(1.0 + 0.5 * 30.0 + 0.5 * 10.0)
+    assert factors["B"] == pytest.approx(1.0 + 0.5 * 30.0 + 0.5 * 20.0)
+
+    factors["A"] = 0.0
+    assert network.local_tamagawa_factors()["A"] != 0.0
+
+    network.add_station(Station("D", (3.0, 0.0), weight=2.0))
+    assert network.local_tamagawa_factors()["D"] == 2.0
+
+
+def test_index_tracker_follows_network_changes() -> None:
+    network = build_sample_network()
+    orbits = [["A", "C"], ["B"]]
+    tracker = EquivariantTamagawaIndex(network, orbits)
+    assert tracker.value == pytest.approx(compute_equivariant_tamagawa_index(network, orbits))
+
+    network.add_station(Station("D", (3.0, 0.0)))
+    network.add_track(Track("C", "D", length_km=20.0, design_speed_kph=250.0))
+    expected = compute_equivariant_tamagawa_index(network, orbits)
+    assert tracker.value == pytest.approx(expected)
+    assert tracker.log_value == pytest.approx(
+        compute_equivariant_tamagawa_index(network, orbits, log_space=True)
+    )
+
+
+def test_factor_journal_is_trimmed_once_trackers_catch_up() -> None:
+    network = build_sample_network()
+    network.add_track(Track("A", "B", length_km=5.0, design_speed_kph=100.0))
+    assert network._factor_journal == []
+
+    orbits = [["A", "C"], ["B"]]
+    first = EquivariantTamagawaIndex(network, orbits)
+    second = EquivariantTamagawaIndex(network, orbits)
+    network.add_track(Track("B", "C", length_km=5.0, design_speed_kph=100.0))
+    assert len(network._factor_journal) == 2
+    first.log_value
+    assert len(network._factor_journal) == 2
+    assert second.value == pytest.approx(compute_equivariant_tamagawa_index(network, orbits))
+    assert network._factor_journal == []
+
+    network.add_station(Station("D", (3.0, 0.0)))
+    del first, second
+    network.add_station(Station("E", (4.0, 0.0)))
+    assert network._factor_journal == []
+
+
+def test_index_tracker_predicts_track_delta_without_mutation() -> None:
+    network = build_sample_network()
+    network.add_station(Station("D", (3.0, 0.0)))
+    orbits = [["A", "C"], ["B"]]
+    tracker = EquivariantTamagawaIndex(network, orbits, weight_exponent=0.5)
+    before = compute_equivariant_tamagawa_index(network, orbits, weight_exponent=0.5)
+    candidate = Track("B", "D", length_km=15.0, design_speed_kph=300.0)
+
+    delta = tracker.delta_for_track(candidate)
+    log_delta = tracker.delta_for_track(candidate, log_space=True)
+    assert network.local_tamagawa_factors()["D"] == 1.0
+
+    network.add_track(candidate)
+    after = compute_equivariant_tamagawa_index(network, orbits, weight_exponent=0.5)
+    assert delta == pytest.approx(after - before)
+    assert log_delta == pytest.approx(math.log(after) - math.log(before))
+    assert tracker.value == pytest.approx(after)
+
+    with pytest.raises(KeyError):
+        tracker.delta_for_track(Track("A", "Z", length_km=1.0, design_speed_kph=1.0))